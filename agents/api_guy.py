@@ -1 +1,23 @@
-# api_guy.py - placeholder
+# api_guy.py - API_Guy persona: HTTP status codes and API basics
+
+import re
+from http import HTTPStatus
+
+TRIGGERS = ("api", "http", "endpoint", "status code", "error code", "rest")
+TIMEOUT = 0.5
+CACHE_TTL = 3600
+
+_CODE = re.compile(r"\b([1-5]\d\d)\b")
+
+
+def respond(command, twin):
+    match = _CODE.search(command)
+    if match:
+        try:
+            status = HTTPStatus(int(match.group(1)))
+        except ValueError:
+            return f"API_Guy here. {match.group(1)} is not a standard HTTP status code.", 0.7
+        return f"API_Guy here. HTTP {status.value} means {status.phrase}: {status.description}.", 0.95
+    if "api" in command.lower() or "endpoint" in command.lower():
+        return "API_Guy here. Give me a status code or endpoint and I'll explain it.", 0.5
+    return None
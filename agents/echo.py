@@ -1 +1,22 @@
-# echo.py - placeholder
+# echo.py - Echo persona: orchestrator and fallback voice of the twin
+#
+# Answers directly when addressed by name; as the manifest fallback it also
+# gives the "don't know how to handle" reply when no other persona is sure,
+# and repeats the last answer from the conversation context when asked.
+
+TRIGGERS = ("echo", "glenn")
+TIMEOUT = 0.25
+
+REPEAT_PHRASES = ("repeat that", "say that again", "what did you say")
+
+
+def respond(command, twin):
+    lowered = command.lower()
+    conversation = twin.get('conversation')
+    if conversation is not None and any(phrase in lowered for phrase in REPEAT_PHRASES):
+        last = conversation.last()
+        if last is not None:
+            return f"I said: {last.response}", 1.0
+    if any(word in lowered for word in TRIGGERS):
+        return f"Echo here. You said: '{command}'", 1.0
+    return f"I heard you, but I don't yet know how to handle: '{command}'", 0.1
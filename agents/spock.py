@@ -1 +1,59 @@
-# spock.py - placeholder
+# spock.py - Spock persona: arithmetic and plain logic
+#
+# Evaluates simple arithmetic found in the command ("what is 12 * 7") with a
+# whitelist AST walk; never calls eval(). Without a clear math cue (a word such
+# as "calculate" or "plus", or + and *) the answer is low-confidence, and
+# phone numbers and dates (555-1234, 2024-01-05, 10/12) are not arithmetic.
+
+import ast
+import operator
+import re
+
+TRIGGERS = ("calculate", "compute", "logic", "+", "*", "times", "plus", "minus", "multiplied by", "divided by")
+TIMEOUT = 0.5
+CACHE_TTL = 3600
+
+_OPERATORS = {
+    ast.Add: operator.add, ast.Sub: operator.sub, ast.Mult: operator.mul,
+    ast.Div: operator.truediv, ast.FloorDiv: operator.floordiv, ast.Mod: operator.mod,
+    ast.Pow: operator.pow, ast.USub: operator.neg, ast.UAdd: operator.pos,
+}
+_WORDS = {"plus": "+", "minus": "-", "times": "*", "multiplied by": "*", "divided by": "/", "over": "/"}
+_WORD_PATTERN = re.compile(r"\b(?:" + "|".join(re.escape(word) for word in _WORDS) + r")\b")
+_EXPRESSION = re.compile(r"[(\s]*-?[(\s]*\d[\d.()\s]*(?:(?:\*\*|[-+*/%])[\d.()\s]+)+")
+_NOT_ARITHMETIC = re.compile(r"\d+(?:[-/]\d+)+")  # Unspaced 555-1234, 2024-01-05, 10/12
+_CUE = re.compile(r"\b(?:calculate|compute)\b|[+*]")
+
+
+def _evaluate(node):
+    if isinstance(node, ast.Expression):
+        return _evaluate(node.body)
+    if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)):
+        return node.value
+    if isinstance(node, ast.BinOp) and type(node.op) in _OPERATORS:
+        left, right = _evaluate(node.left), _evaluate(node.right)
+        if isinstance(node.op, ast.Pow) and abs(right) > 64:
+            raise ValueError("exponent too large")
+        return _OPERATORS[type(node.op)](left, right)
+    if isinstance(node, ast.UnaryOp) and type(node.op) in _OPERATORS:
+        return _OPERATORS[type(node.op)](_evaluate(node.operand))
+    raise ValueError("unsupported expression")
+
+
+def respond(command, twin):
+    text = command.lower()
+    cued = bool(_CUE.search(text) or _WORD_PATTERN.search(text))
+    text = _WORD_PATTERN.sub(lambda m: _WORDS[m.group(0)], text)
+    match = _EXPRESSION.search(text)
+    if not match:
+        return None
+    expression = match.group(0).strip()
+    if not cued and _NOT_ARITHMETIC.fullmatch(expression):
+        return None
+    try:
+        value = _evaluate(ast.parse(expression, mode="eval"))
+    except (SyntaxError, ValueError, ZeroDivisionError, OverflowError):
+        return "Spock here. That expression is not logically evaluable.", 0.6 if cued else 0.3
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return f"Spock here. {expression} = {value}", 0.95 if cued else 0.5
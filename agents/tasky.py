@@ -1 +1,31 @@
-# tasky.py - placeholder
+# tasky.py - Tasky persona: answers questions about the task queue
+#
+# Read-only: adding tasks stays with `command_interface.py tasky action=add`.
+
+import json
+import os
+
+from commands.tasky import DATA_PATH
+
+TRIGGERS = ("task", "todo", "to-do", "remind")
+TIMEOUT = 0.5
+CACHE_TTL = 5  # The queue changes when tasks are added
+
+
+def _tasks():
+    if not os.path.exists(DATA_PATH):
+        return []
+    with open(DATA_PATH, "r", encoding="utf-8") as f:
+        return json.load(f).get("tasks", [])
+
+
+def respond(command, twin):
+    lowered = command.lower()
+    if any(word in lowered for word in ("add", "create", "remind me")):
+        return "Tasky here. To add a task, use: python command_interface.py tasky action=add task=\"...\"", 0.8
+
+    tasks = _tasks()
+    if not tasks:
+        return "Tasky here. Your task queue is empty.", 0.9
+    recent = "; ".join(t["task"] for t in tasks[-3:])
+    return f"Tasky here. You have {len(tasks)} task(s). Most recent: {recent}", 0.9
@@ -1,62 +1,35 @@
 # command_interface.py
 # Drop-in router: argparse, --list/--debug, aliases, safe key=value parsing
 # Single catch-all to avoid "unreachable except" warning.
+# --serve keeps modules loaded in a daemon; plain invocations forward to it
+# when it is running and fall back to in-process execution otherwise.
+# Routes are discovered from commands/ (see core/command_registry.py); adding
+# a module with ROUTE/ALIASES and run() or execute() is enough to expose it.
+# --metrics-port (or GLENN_METRICS_PORT) exposes Prometheus metrics for
+# long-running --serve/--batch processes (see core/metrics.py).
 
-import importlib
 import sys
 import argparse
-from typing import Dict, Any, Tuple
-
-# Central routing table (extend as needed)
-COMMAND_ROUTES: Dict[str, str] = {
-    "audit.start": "commands.audit",
-    "recall.last": "commands.memory",
-    "kunda.mode": "commands.kunda",
-    "tasky.queue": "commands.tasky",
-    "status.report": "commands.status",
-}
-
-# Optional short aliases for convenience
-ALIASES: Dict[str, str] = {
-    "status": "status.report",
-    "audit": "audit.start",
-    "recall": "recall.last",
-    "tasky": "tasky.queue",
-    "kunda": "kunda.mode",
-}
-
-def resolve_command(name: str) -> str:
-    """Resolve aliases and confirm the command exists."""
-    route = ALIASES.get(name, name)
-    if route not in COMMAND_ROUTES:
-        raise KeyError(f"Unknown command '{name}'. Use --list to see options.")
-    return route
-
-def parse_kv_pairs(pairs) -> Dict[str, Any]:
-    """
-    Parse key=value pairs. Values keep '=' if present (split only on first '=').
-    Example: foo=bar=baz -> {'foo': 'bar=baz'}
-    """
-    out: Dict[str, Any] = {}
-    for raw in pairs or []:
-        if "=" not in raw:
-            raise ValueError(f"Invalid param '{raw}'. Expected key=value.")
-        k, v = raw.split("=", 1)
-        k = k.strip()
-        if not k:
-            raise ValueError(f"Empty key in '{raw}'.")
-        out[k] = v
-    return out
-
-def execute_command(command: str, params: Dict[str, Any], debug: bool = False):
-    """Import module and run its `run(**kwargs)` entrypoint."""
-    module_path = COMMAND_ROUTES[command]
+from typing import Any, Dict, Tuple
+
+# Routing tables and helpers live in core so core modules share them with the CLI
+from core.command_registry import (  # noqa: F401  (re-exported)
+    ALIASES, COMMAND_INDEX, COMMAND_ROUTES, invoke_command, parse_kv_pairs, reload_routes, resolve_command,
+)
+
+def execute_command(command: str, params: Dict[str, Any], debug: bool = False, timeout=None):
+    """Run a resolved command with its deadline and print its result."""
     if debug:
-        print(f"[Glenn.AI][debug] route={command} -> module={module_path}; params={params}")
-    module = importlib.import_module(module_path)
-    if not hasattr(module, "run"):
-        raise AttributeError(f"No 'run(**kwargs)' in {module_path}")
-    result = module.run(**params)  # modules may print or return data
+        print(f"[Glenn.AI][debug] route={command} -> module={COMMAND_ROUTES[command]}; params={params}")
+    if COMMAND_INDEX.get(command, {}).get("interactive"):
+        # Interactive sessions own the terminal (and Ctrl+C); no deadline
+        result = invoke_command(command, params)
+    else:
+        from core.command_runner import run_command
+        if timeout is None:
+            result = run_command(command, params)
+        else:
+            result = run_command(command, params, timeout=timeout)
     if result is not None:
         print(result)
 
@@ -85,12 +58,64 @@ def build_parser() -> argparse.ArgumentParser:
         action="store_true",
         help="Enable debug output."
     )
+    p.add_argument(
+        "--timeout", "-t",
+        type=float,
+        help="Seconds before a command is abandoned (default: the module's TIMEOUT, else none; 0 = none)."
+    )
+    p.add_argument(
+        "--profile",
+        action="store_true",
+        help="Report wall/CPU time for route resolution, module import and run()."
+    )
+    p.add_argument(
+        "--profile-out",
+        metavar="DIR",
+        help="With --profile, also write a .prof file and a collapsed-stack file to DIR."
+    )
+    p.add_argument(
+        "--batch",
+        metavar="FILE",
+        help="Run one 'route key=value ...' per line from FILE ('-' for stdin); prints JSONL results."
+    )
+    p.add_argument(
+        "--order",
+        choices=("ordered", "completed"),
+        default="ordered",
+        help="Batch output order: input order (default) or as commands complete."
+    )
+    p.add_argument(
+        "--jobs", "-j",
+        type=int,
+        default=8,
+        help="Worker threads for side-effect-free batch commands (default 8)."
+    )
+    p.add_argument(
+        "--serve",
+        action="store_true",
+        help="Run the command daemon (keeps modules imported; later invocations forward to it)."
+    )
+    p.add_argument(
+        "--no-daemon",
+        action="store_true",
+        help="Always execute in-process, even if a daemon is running."
+    )
+    p.add_argument(
+        "--metrics-port",
+        type=int,
+        metavar="PORT",
+        help="With --serve/--batch: serve Prometheus metrics on http://127.0.0.1:PORT/metrics."
+    )
     return p
 
 def print_commands():
     print("Available commands:")
     for route in sorted(COMMAND_ROUTES.keys()):
-        print(f"  - {route}")
+        info = COMMAND_INDEX.get(route, {})
+        summary = f" — {info['summary']}" if info.get("summary") else ""
+        print(f"  - {route}{summary}")
+        if info.get("signature"):
+            print(f"      {info['signature']}")
     if ALIASES:
         print("\nAliases:")
         for short, full in sorted(ALIASES.items()):
@@ -100,18 +125,35 @@ def main(argv: Tuple[str, ...] | None = None):
     parser = build_parser()
     args = parser.parse_args(argv)
 
+    if args.metrics_port and (args.serve or args.batch):
+        from core.metrics import start_http_server
+        start_http_server(args.metrics_port)
+
+    if args.serve:
+        from core.command_daemon import serve
+        return serve(main)
+
     if args.list:
         print_commands()
         return 0
 
+    if args.batch:
+        from core.command_batch import run_batch_file
+        return run_batch_file(args.batch, jobs=args.jobs, order=args.order, timeout=args.timeout)
+
     if not args.command:
         parser.print_help()
         return 2
 
     try:
+        if args.profile or args.profile_out:
+            from core.profiling import profile_command
+            profile_command(args.command.strip(), args.params, out_dir=args.profile_out)
+            return 0
+
         route = resolve_command(args.command.strip())
         params = parse_kv_pairs(args.params)
-        execute_command(route, params, debug=args.debug)
+        execute_command(route, params, debug=args.debug, timeout=args.timeout)
         return 0
     except Exception as e:
         # One catch-all to avoid "unreachable except" warning.
@@ -121,5 +163,26 @@ def main(argv: Tuple[str, ...] | None = None):
         print(f"[Glenn.AI] {msg}")
         return 1
 
+def _is_interactive(argv) -> bool:
+    """True if argv names a command that needs this process's terminal."""
+    name = next((a for a in argv if not a.startswith("-")), None)
+    route = ALIASES.get(name, name)
+    return bool(COMMAND_INDEX.get(route, {}).get("interactive"))
+
+def client_main(argv=None) -> int:
+    """Forward to a running daemon if there is one, otherwise run in-process."""
+    argv = list(sys.argv[1:] if argv is None else argv)
+    # Batches already amortize startup and may read stdin, so they run locally;
+    # profiles must measure (and write files from) this process, not the daemon
+    local_only = {"--serve", "--no-daemon", "--batch", "--profile", "--profile-out"}
+    options = {a.split("=", 1)[0] for a in argv if a.startswith("--")}
+    if not local_only.intersection(options) and not _is_interactive(argv):
+        # forward() returns None only if the command was never sent
+        from core.command_daemon import forward
+        code = forward(argv)
+        if code is not None:
+            return code
+    return main(argv)
+
 if __name__ == "__main__":
-    sys.exit(main())
+    sys.exit(client_main())
@@ -1,5 +1,8 @@
 ﻿import os, time
 
+ROUTE = "audit.start"
+ALIASES = ("audit",)
+
 LOG_DIR = "logs"
 LOG_PATH = os.path.join(LOG_DIR, "audit.log")
 
@@ -4,14 +4,19 @@ Advanced self-awareness and state management for Glenn.AI
 """
 
 import logging
-import json
 import sqlite3
 from pathlib import Path
 from typing import Optional, Dict, Any
 from datetime import datetime
 
+from core.profile_cache import load_json
+
 logger = logging.getLogger(__name__)
 
+ROUTE = "awareness.report"
+ALIASES = ("awareness",)
+SIDE_EFFECT_FREE = True
+
 def execute(args: Optional[Any] = None):
     """
     Execute self-awareness operations.
@@ -40,8 +45,8 @@ def load_twin_identity():
     twin_path = project_root / "data" / "digital_twin.json"
     
     try:
-        with open(twin_path, 'r', encoding='utf-8') as f:
-            twin_data = json.load(f)
+        # Cached; re-parsed only when the profile changes on disk
+        twin_data = load_json(twin_path)
         logger.info("Twin identity loaded successfully")
         return twin_data
     except FileNotFoundError:
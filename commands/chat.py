@@ -4,13 +4,23 @@ Interactive conversational interface for Glenn.AI
 """
 
 import logging
-import json
 import sqlite3
 from pathlib import Path
 from typing import Optional, Any
 
+from core import interaction_log, metrics
+from core.conversation import Conversation, SpillWriter
+from core.intent_matcher import classify_intent
+from core.twin_loader import load_twin_manifest
+
 logger = logging.getLogger(__name__)
 
+ROUTE = "chat.session"
+ALIASES = ("chat",)
+INTERACTIVE = True  # Reads stdin; always runs in-process
+
+ROUTE_SECONDS = metrics.histogram("glenn_persona_route_seconds", "Persona routing time", ["router"])
+
 def execute(args: Optional[Any] = None):
     """
     Execute interactive chat session.
@@ -19,6 +29,7 @@ def execute(args: Optional[Any] = None):
         args: Command line arguments or parameters
     """
     logger.info("Starting Glenn.AI chat session")
+    metrics.start_from_env()
     
     print("🤖 Glenn.AI Interactive Mode")
     print("=" * 40)
@@ -32,6 +43,7 @@ def execute(args: Optional[Any] = None):
         
     # Initialize memory logging
     init_memory_table()
+    conversation = Conversation("chat", spill=SpillWriter(log_interactions))
     
     # Chat loop
     while True:
@@ -44,9 +56,9 @@ def execute(args: Optional[Any] = None):
             if not command:
                 continue
                 
-            response = route_command(command, twin)
+            response = route_command(command, twin, conversation)
             print(f"[Glenn]: {response}")
-            log_interaction(command, twin['default'], response)
+            conversation.add(command, twin['default'], response)
             
         except KeyboardInterrupt:
             print("\n[Glenn]: Chat session interrupted. Goodbye!")
@@ -54,6 +66,9 @@ def execute(args: Optional[Any] = None):
         except Exception as e:
             logger.error(f"Chat error: {e}")
             print(f"[Glenn]: Sorry, I encountered an error: {e}")
+    
+    # Write out turns still queued for memory_log
+    conversation.close()
 
 def load_twin_config():
     """Load twin configuration from manifest."""
@@ -61,14 +76,7 @@ def load_twin_config():
     manifest_path = project_root / "manifests" / "glenn_manifest.json"
     
     try:
-        with open(manifest_path, 'r') as f:
-            manifest = json.load(f)
-            
-        twin = {
-            'id': manifest.get('twinID'),
-            'personas': manifest.get('personas'),
-            'default': manifest.get('defaultPersona')
-        }
+        twin = load_twin_manifest(manifest_path)
         logger.info(f"Loaded twin: {twin['id']}")
         return twin
         
@@ -79,20 +87,23 @@ def load_twin_config():
         logger.error(f"Failed to load twin config: {e}")
         return None
 
-def route_command(command: str, twin: dict) -> str:
-    """Route command to appropriate handler."""
-    command_lower = command.lower()
+@ROUTE_SECONDS.labels(router="chat").time()
+def route_command(command: str, twin: dict, conversation: Optional[Conversation] = None) -> str:
+    """Route command to appropriate handler, with the session's recent turns as context."""
+    intent = classify_intent("chat", command)
     
     # Command routing logic
-    if any(word in command_lower for word in ['task', 'todo', 'remind']):
+    if intent == "task":
         return handle_task_command(command)
-    elif any(word in command_lower for word in ['memory', 'remember', 'recall']):
+    elif intent == "memory":
         return handle_memory_command(command)
-    elif any(word in command_lower for word in ['status', 'health', 'how are you']):
+    elif intent == "status":
         return handle_status_command()
-    elif any(word in command_lower for word in ['hello', 'hi', 'hey']):
+    elif intent == "greeting":
+        if conversation is not None and len(conversation):
+            return "Hello again! What else can I do for you?"
         return f"Hello! I'm {twin['default']}, your digital twin. How can I assist you today?"
-    elif 'echo' in command_lower or 'glenn' in command_lower:
+    elif intent == "echo":
         return f"Echo here. You said: '{command}'"
     else:
         return f"I heard you, but I don't yet know how to handle: '{command}'. Try asking about tasks, memory, or status."
@@ -141,19 +152,11 @@ def init_memory_table():
 
 def log_interaction(user_input: str, persona: str, response: str):
     """Log interaction to memory database."""
-    db_path = get_db_path()
-    try:
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-        cursor.execute("""
-            INSERT INTO memory_log (user_input, persona, response)
-            VALUES (?, ?, ?)
-        """, (user_input, persona, response))
-        conn.commit()
-        conn.close()
-        logger.debug("Interaction logged to memory")
-    except Exception as e:
-        logger.error(f"Memory log error: {e}")
+    interaction_log.log_interaction(get_db_path(), user_input, persona, response, source="chat")
+
+def log_interactions(rows: list):
+    """Write a batch of (timestamp, user_input, persona, response) rows; raises on failure."""
+    interaction_log.log_interactions(get_db_path(), rows, source="chat")
 
 def get_db_path():
     """Get the database path."""
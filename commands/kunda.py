@@ -4,10 +4,29 @@ Kunda AI operations for Glenn.AI
 """
 
 import logging
-from typing import Optional, Dict, Any
+import mmap
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Optional, Dict, Any, Callable, Iterator, Tuple
 
 logger = logging.getLogger(__name__)
 
+ROUTE = "kunda.mode"
+ALIASES = ("kunda",)
+SIDE_EFFECT_FREE = True
+
+# Streaming analysis defaults
+DEFAULT_CHUNK_SIZE = 4 * 1024 * 1024  # Bytes handed to each worker
+DEFAULT_WORKERS = max(1, min(8, os.cpu_count() or 1))
+
+MAX_SPAN_FACTOR = 2  # A chunk runs to the next newline, but never past this many chunk sizes
+
+# Markers counted by the context analysis (matched case-insensitively)
+LOG_LEVELS = ("critical", "error", "warning", "info", "debug")
+SECURITY_KEYWORDS = ("failed", "denied", "unauthorized", "forbidden", "timeout", "exception")
+_LEAD_BYTES = max(len(marker) for marker in LOG_LEVELS + SECURITY_KEYWORDS) - 1
+
 def execute(args: Optional[Dict[str, Any]] = None):
     """
     Execute Kunda AI operations.
@@ -29,20 +48,225 @@ def show_kunda_status():
     print("  Model: GPT-4")
     print("  Capabilities: Text Generation, Analysis, Reasoning")
     
-def process_query(query: str):
-    """Process a query through Kunda AI."""
+def process_query(query: str) -> Iterator[str]:
+    """
+    Process a query through Kunda AI.
+
+    The response is produced incrementally so callers (e.g. the voice
+    pipeline) can start speaking before generation has finished.
+
+    Args:
+        query: The user's query
+
+    Returns:
+        Generator of response text fragments
+    """
     logger.info(f"Processing query: {query}")
-    print(f"🔍 Processing: {query}")
-    # Add Kunda AI processing logic here
-    print("✅ Query processed")
-    
-def analyze_context(context: str):
-    """Analyze context using Kunda AI."""
+    return _generate_response(query.strip())
+
+def _generate_response(query: str) -> Iterator[str]:
+    """Yield the Kunda response one word-sized fragment at a time."""
+    yield from _fragments(f"Kunda here, working on '{query}'.")
+
+    path = query.strip("'\"")
+    if path and os.path.isfile(path):
+        # Expensive work happens after the first sentence has been handed out
+        # Threads, not processes: this generator runs on the caller's (e.g. TTS) thread
+        result = analyze_context_file(path, progress=lambda done, total: None, use_processes=False,
+                                      verbose=False)
+        levels = result["levels"]
+        yield from _fragments(
+            f"The file has {result['lines']} lines, with {levels['error'] + levels['critical']} errors "
+            f"and {levels['warning']} warnings."
+        )
+        flags = [f"{count} {name}" for name, count in result["keywords"].items() if count]
+        if flags:
+            yield from _fragments(f"I also flagged {', '.join(flags)}.")
+        yield from _fragments("Context analysis complete.")
+    else:
+        yield from _fragments(
+            "I don't have a language model connected yet. "
+            "Give me the path of a log or evidence file and I'll analyze it for you."
+        )
+
+def _fragments(text: str) -> Iterator[str]:
+    for word in text.split(" "):
+        yield word + " "
+
+def analyze_context(context: str, stream: bool = False, **options) -> Dict[str, Any]:
+    """
+    Analyze context using Kunda AI.
+
+    Args:
+        context: Context text, or a file path when stream=True
+        stream: Read the file at `context` in chunks instead of holding it in memory
+        **options: Streaming options passed to analyze_context_file
+
+    Returns:
+        Merged analysis result
+    """
+    if stream:
+        return analyze_context_file(context, **options)
+
     logger.info("Analyzing context")
     print("🧠 Analyzing context...")
-    # Add context analysis logic here
+    result = _analyze_bytes(context.encode("utf-8"))
+    _print_analysis(result)
     print("✅ Context analysis complete")
+    return result
+
+def analyze_context_file(path: str,
+                         chunk_size: int = DEFAULT_CHUNK_SIZE,
+                         workers: int = DEFAULT_WORKERS,
+                         progress: Optional[Callable[[int, int], None]] = None,
+                         use_processes: bool = True,
+                         verbose: bool = True) -> Dict[str, Any]:
+    """
+    Analyze a large context file with bounded memory.
+
+    The file is split into line-aligned chunks of roughly `chunk_size` bytes;
+    a line longer than MAX_SPAN_FACTOR chunks is split, and words or markers
+    cut in two are counted once, in the chunk where they end.
+    Each worker memory-maps only its own chunk, analyzes it and returns a small
+    partial result; partials are folded together with `_merge_results` as they
+    arrive. At most two chunks per worker are in flight at any time, so peak
+    memory depends on chunk size and worker count, not on the file size.
+
+    Args:
+        path: File to analyze
+        chunk_size: Approximate bytes per chunk
+        workers: Number of parallel workers
+        progress: Callback receiving (bytes_done, bytes_total); defaults to printing percentages
+        use_processes: Use worker processes (True) or threads (False)
+        verbose: Print the header and summary
+
+    Returns:
+        Merged analysis result
+    """
+    total = os.path.getsize(path)
+    logger.info(f"Streaming context analysis: {path} ({total} bytes)")
+    if verbose:
+        print(f"🧠 Analyzing context file {path}...")
+
+    if progress is None:
+        progress = _print_progress
+
+    result = _empty_result()
+    done = 0
+    pool_cls = ProcessPoolExecutor if use_processes and workers > 1 else ThreadPoolExecutor
+    max_in_flight = max(1, workers) * 2
+
+    with pool_cls(max_workers=max(1, workers)) as pool:
+        pending = set()
+        for start, end in _iter_chunk_spans(path, total, chunk_size):
+            pending.add(pool.submit(_analyze_span, path, start, end, end == total))
+            if len(pending) >= max_in_flight:
+                finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    partial = future.result()
+                    result = _merge_results(result, partial)
+                    done += partial["bytes"]
+                    progress(done, total)
+        for future in pending:
+            partial = future.result()
+            result = _merge_results(result, partial)
+            done += partial["bytes"]
+            progress(done, total)
+
+    if verbose:
+        _print_analysis(result)
+        print("✅ Context analysis complete")
+    return result
+
+def _iter_chunk_spans(path: str, total: int, chunk_size: int) -> Iterator[Tuple[int, int]]:
+    """Yield (start, end) byte spans that end on a newline unless the line is too long."""
+    if total == 0:
+        return
+    chunk_size = max(1, chunk_size)
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        start = 0
+        while start < total:
+            end = min(start + chunk_size, total)
+            if end < total:
+                limit = min(start + chunk_size * MAX_SPAN_FACTOR, total)
+                newline = mm.find(b"\n", end - 1, limit)
+                end = limit if newline == -1 else newline + 1
+            yield start, end
+            start = end
+
+def _analyze_span(path: str, start: int, end: int, final: bool = True) -> Dict[str, Any]:
+    """Map one span of the file (and the bytes just before it) and analyze it (runs inside a worker)."""
+    lead_start = max(0, start - _LEAD_BYTES)
+    # mmap offsets must be aligned to the allocation granularity
+    offset = lead_start - (lead_start % mmap.ALLOCATIONGRANULARITY)
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), end - offset, access=mmap.ACCESS_READ, offset=offset) as mm:
+        return _analyze_bytes(mm[start - offset:end - offset], before=mm[lead_start - offset:start - offset],
+                              final=final)
+
+def _analyze_bytes(data: bytes, before: bytes = b"", final: bool = True) -> Dict[str, Any]:
+    """
+    Analyze one block of text and return a partial result.
+
+    Args:
+        data: The block
+        before: Bytes preceding the block in the file, when it continues a
+            line; a word or marker running across the boundary is counted here
+        final: The block ends the text (an unterminated last line counts)
+    """
+    lowered = data.lower()
+    result = _empty_result()
+    result["bytes"] = len(data)
+    result["chunks"] = 1
+    result["lines"] = data.count(b"\n") + (1 if final and data and not data.endswith(b"\n") else 0)
+    result["words"] = len(data.split())
+    if before[-1:] and not before[-1:].isspace() and data[:1] and not data[:1].isspace():
+        result["words"] -= 1  # Continues the previous block's last word
+    before, head = before.lower(), lowered[:_LEAD_BYTES]
+    for group, markers in (("levels", LOG_LEVELS), ("keywords", SECURITY_KEYWORDS)):
+        for marker in markers:
+            needle = marker.encode()
+            across = (before + head).count(needle) - before.count(needle) - head.count(needle)
+            result[group][marker] = lowered.count(needle) + across
+    return result
+
+def _empty_result() -> Dict[str, Any]:
+    return {
+        "bytes": 0,
+        "chunks": 0,
+        "lines": 0,
+        "words": 0,
+        "levels": {level: 0 for level in LOG_LEVELS},
+        "keywords": {keyword: 0 for keyword in SECURITY_KEYWORDS},
+    }
+
+def _merge_results(left: Dict[str, Any], right: Dict[str, Any]) -> Dict[str, Any]:
+    """Combine two partial results (associative, so merge order does not matter)."""
+    merged = _empty_result()
+    for key in ("bytes", "chunks", "lines", "words"):
+        merged[key] = left[key] + right[key]
+    for group in ("levels", "keywords"):
+        for name in merged[group]:
+            merged[group][name] = left[group].get(name, 0) + right[group].get(name, 0)
+    return merged
+
+def _print_progress(done: int, total: int):
+    percent = 100 if total == 0 else int(done * 100 / total)
+    sys.stdout.write(f"\r  ⏳ {percent:3d}% ({done}/{total} bytes)")
+    if done >= total:
+        sys.stdout.write("\n")
+    sys.stdout.flush()
+
+def _print_analysis(result: Dict[str, Any]):
+    print(f"  Size: {result['bytes']} bytes in {result['chunks']} chunk(s)")
+    print(f"  Lines: {result['lines']}  Words: {result['words']}")
+    levels = ", ".join(f"{name}={count}" for name, count in result["levels"].items() if count)
+    print(f"  Log levels: {levels or 'none'}")
+    keywords = ", ".join(f"{name}={count}" for name, count in result["keywords"].items() if count)
+    print(f"  Flags: {keywords or 'none'}")
 
 if __name__ == "__main__":
     # For standalone testing
-    execute()
+    if len(sys.argv) > 1:
+        analyze_context(sys.argv[1], stream=True)
+    else:
+        execute()
@@ -1,4 +1,8 @@
-﻿import os, sqlite3
+﻿import os, sqlite3, threading
+
+ROUTE = "recall.last"
+ALIASES = ("recall",)
+SIDE_EFFECT_FREE = True
 
 # We’ll try both locations so it works with your current scaffold or older layout
 DB_CANDIDATES = [
@@ -6,12 +10,31 @@ DB_CANDIDATES = [
     "glenn_memory.db",                        # legacy root
 ]
 
+# Open connections are kept for the life of the process so a long-running
+# daemon pays the connect cost once; the lock serializes cross-thread use.
+_connections = {}
+_db_lock = threading.Lock()
+
 def _find_db():
     for p in DB_CANDIDATES:
         if os.path.exists(p):
             return p
     return None
 
+def _connect(db_path):
+    conn = _connections.get(db_path)
+    if conn is None:
+        conn = sqlite3.connect(db_path, check_same_thread=False)
+        _connections[db_path] = conn
+    return conn
+
+def warm():
+    """Open the memory DB ahead of time (called by the command daemon)."""
+    db_path = _find_db()
+    if db_path:
+        with _db_lock:
+            _connect(db_path)
+
 def _fetch_last(conn, n=5, persona=None):
     q = "SELECT id, timestamp, user_input, persona, response FROM memory_log"
     args = []
@@ -43,18 +66,17 @@ def run(n="5", persona=None, **kwargs):
     except ValueError:
         n_int = 5
 
-    try:
-        conn = sqlite3.connect(db_path)
-    except Exception as e:
-        return f"recall.last: failed to open DB: {e}"
+    with _db_lock:
+        try:
+            conn = _connect(db_path)
+        except Exception as e:
+            return f"recall.last: failed to open DB: {e}"
 
-    try:
-        rows = _fetch_last(conn, n=n_int, persona=persona)
-    except sqlite3.OperationalError as e:
-        # Probably missing table
-        return f"recall.last: memory_log table not found in {db_path} ({e})"
-    finally:
-        conn.close()
+        try:
+            rows = _fetch_last(conn, n=n_int, persona=persona)
+        except sqlite3.OperationalError as e:
+            # Probably missing table
+            return f"recall.last: memory_log table not found in {db_path} ({e})"
 
     if not rows:
         return f"recall.last: no entries found (db={db_path}, persona={persona or 'any'})"
@@ -2,6 +2,10 @@ from datetime import datetime
 import platform
 import os
 
+ROUTE = "status.report"
+ALIASES = ("status",)
+SIDE_EFFECT_FREE = True
+
 def run(**kwargs):
     """
     Minimal status command for Glenn.AI.
@@ -1,4 +1,8 @@
 ﻿import json, os, time
+
+ROUTE = "tasky.queue"
+ALIASES = ("tasky",)
+
 DATA_PATH = os.path.join("data","tasky.json")
 
 def _load():
@@ -4,7 +4,6 @@ Advanced voice-enabled interactive interface for Glenn.AI
 """
 
 import logging
-import json
 import sqlite3
 import speech_recognition as sr
 import pyttsx3
@@ -13,14 +12,27 @@ import time
 from pathlib import Path
 from typing import Optional, Any
 
+from core.intent_matcher import classify_intent
+from voice.audio_capture import acquire_capture
+from voice.keyword_spotter import KeywordSpotter
+from voice.wake_words import WAKE_PHRASE_LIMIT, command_after_wake_word
+from voice import vad
+from core.twin_loader import load_twin_manifest
+
 logger = logging.getLogger(__name__)
 
+ROUTE = "voice.shell"
+ALIASES = ("voice",)
+INTERACTIVE = True  # Reads stdin; always runs in-process
+
 class GlennVoiceShell:
     def __init__(self):
         self.is_listening = False
         self.is_speaking = False
         self.recognizer = None
         self.microphone = None
+        self.spotter = None  # Local wake-word detection when templates are enrolled
+        self.vad = None  # Drops captured noise before recognition (needs NumPy)
         self.tts_engine = None
         self.twin_data = None
         
@@ -29,7 +41,14 @@ class GlennVoiceShell:
         try:
             # Initialize speech recognition
             self.recognizer = sr.Recognizer()
-            self.microphone = sr.Microphone()
+            # Shared stream: wake and command listens no longer reopen the device
+            capture = acquire_capture()
+            self.microphone = capture.source()
+            # Saved threshold, adapted in the background (no per-listen calibration)
+            capture.calibrate(self.recognizer)
+            self.spotter = KeywordSpotter.load(capture.sample_rate, capture.sample_width)
+            if vad.is_available():
+                self.vad = vad.VoiceActivityDetector(capture.sample_rate, capture.sample_width)
             logger.info("Speech recognition initialized successfully")
             
             # Try to initialize text-to-speech
@@ -83,15 +102,21 @@ class GlennVoiceShell:
             return None
             
         try:
-            with self.microphone as source:
-                # Adjust for ambient noise
-                self.recognizer.adjust_for_ambient_noise(source, duration=0.5)
-            
             print("🎧 Listening for wake word ('Glenn' or 'Hey Glenn')...")
             
             with self.microphone as source:
+                if self.spotter:
+                    # Enrolled wake words are matched locally, no recognizer round trip
+                    hit = self.spotter.listen(source, 1, energy_threshold=self.recognizer.energy_threshold,
+                                              vad=self.vad)
+                    return hit[0] if hit else None
                 # Listen for wake word with shorter timeout
-                audio = self.recognizer.listen(source, timeout=1, phrase_time_limit=3)
+                audio = self.recognizer.listen(source, timeout=1, phrase_time_limit=WAKE_PHRASE_LIMIT)
+            
+            if self.vad:
+                audio = self.vad.trim(audio, self.recognizer.energy_threshold)
+                if audio is None:
+                    return None
             
             # Recognize speech
             text = self.recognizer.recognize_google(audio).lower()
@@ -120,6 +145,12 @@ class GlennVoiceShell:
                 # Listen for command with longer timeout
                 audio = self.recognizer.listen(source, timeout=5, phrase_time_limit=10)
             
+            if self.vad:
+                audio = self.vad.trim(audio, self.recognizer.energy_threshold)
+                if audio is None:
+                    self.speak("I didn't hear anything. Try again.")
+                    return None
+            
             # Recognize speech
             command = self.recognizer.recognize_google(audio)
             print(f"[You 🎤]: {command}")
@@ -138,20 +169,20 @@ class GlennVoiceShell:
     
     def process_voice_command(self, command: str) -> str:
         """Process voice command and return response."""
-        command_lower = command.lower()
+        intent = classify_intent("voice", command)
         
         # Voice-specific commands
-        if any(word in command_lower for word in ['stop listening', 'exit voice', 'disable voice']):
+        if intent == "exit":
             return "VOICE_EXIT"
-        elif any(word in command_lower for word in ['who are you', 'introduce yourself']):
+        elif intent == "identity":
             return self.get_introduction()
-        elif any(word in command_lower for word in ['status', 'how are you', 'system status']):
+        elif intent == "status":
             return self.get_voice_status()
-        elif any(word in command_lower for word in ['task', 'todo', 'remind']):
+        elif intent == "task":
             return self.handle_voice_task(command)
-        elif any(word in command_lower for word in ['memory', 'remember', 'recall']):
+        elif intent == "memory":
             return self.handle_voice_memory(command)
-        elif any(word in command_lower for word in ['time', 'date', 'what time']):
+        elif intent == "time":
             from datetime import datetime
             return f"It's {datetime.now().strftime('%I:%M %p on %A, %B %d, %Y')}"
         else:
@@ -212,15 +243,7 @@ class GlennVoiceShell:
         try:
             project_root = Path(__file__).parent.parent
             manifest_path = project_root / "manifests" / "glenn_manifest.json"
-            
-            with open(manifest_path, 'r') as f:
-                manifest = json.load(f)
-                
-            return {
-                'id': manifest.get('twinID'),
-                'personas': manifest.get('personas'),
-                'default': manifest.get('defaultPersona')
-            }
+            return load_twin_manifest(manifest_path)
         except Exception as e:
             logger.error(f"Failed to load twin config: {e}")
             return None
@@ -278,8 +301,12 @@ def execute(args: Optional[Any] = None):
             if wake_result:
                 print(f"🎧 Wake word detected: {wake_result}")
                 
-                # Listen for command
-                command = voice_shell.listen_for_command()
+                # A command in the same phrase ("Hey Glenn, what time is it") needs no second listen
+                command = command_after_wake_word(wake_result)
+                if command:
+                    print(f"[You 🎤]: {command}")
+                else:
+                    command = voice_shell.listen_for_command()
                 
                 if command:
                     # Process command
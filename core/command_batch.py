@@ -0,0 +1,159 @@
+# command_batch.py - run many routed commands in one process
+#
+# Input: one `route key=value ...` per line (shell-style quoting, '#' comments).
+# Output: one JSON object per line with the line number, route, exit status,
+# returned result and captured stdout.
+#
+# Commands whose module declares SIDE_EFFECT_FREE = True run concurrently on a
+# thread pool. Any other command is a barrier: everything before it finishes
+# first, then it runs alone, so writes keep their order relative to reads.
+# A barrier that times out may still be running; until it stops, the lines
+# after it are reported as not run instead of racing it.
+
+import io
+import json
+import shlex
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Any, Dict, Iterable, List, Optional, TextIO, Tuple
+
+from core import command_registry
+from core.command_runner import CommandHandle, submit_command
+from core.stdio import redirect_thread_output
+
+
+class _Emitter:
+    """Writes results as JSONL, either in input order or as they complete."""
+
+    def __init__(self, out: TextIO, ordered: bool):
+        self._out = out
+        self._ordered = ordered
+        self._lock = threading.Lock()
+        self._buffered: Dict[int, Dict[str, Any]] = {}
+        self._next_seq = 0
+        self.failures = 0
+
+    def emit(self, seq: int, result: Dict[str, Any]):
+        with self._lock:
+            if result["exit"] != 0:
+                self.failures += 1
+            if not self._ordered:
+                self._write(result)
+                return
+            self._buffered[seq] = result
+            while self._next_seq in self._buffered:
+                self._write(self._buffered.pop(self._next_seq))
+                self._next_seq += 1
+
+    def _write(self, result: Dict[str, Any]):
+        self._out.write(json.dumps(result) + "\n")
+        self._out.flush()
+
+
+BARRIER_GRACE = 1.0  # Seconds a timed-out barrier gets to stop after its cancel_event is set
+
+
+def _error_text(e: Exception) -> str:
+    """Message for the JSONL error field (str() of a KeyError adds quotes)."""
+    if isinstance(e, KeyError) and e.args:
+        return str(e.args[0])
+    return str(e) or e.__class__.__name__
+
+
+def _parse_line(text: str):
+    """Split a batch line into (route, params); raises on bad input."""
+    tokens = shlex.split(text)
+    route = command_registry.resolve_command(tokens[0])
+    params = command_registry.parse_kv_pairs(tokens[1:])
+    return route, params
+
+
+def _run_one(lineno: int, route: str, params: Dict[str, Any],
+             timeout: Optional[float] = None) -> Tuple[Dict[str, Any], Optional[CommandHandle]]:
+    """Execute one command (with its deadline) and this thread's stdout captured."""
+    captured = io.StringIO()
+    started = time.perf_counter()
+    result: Dict[str, Any] = {"line": lineno, "route": route}
+    handle = None
+    try:
+        with redirect_thread_output(captured):
+            if timeout is None:
+                handle = submit_command(route, params)
+            else:
+                handle = submit_command(route, params, timeout=timeout)
+            value = handle.result()
+        result["exit"] = 0
+        result["result"] = None if value is None else str(value)
+    except Exception as e:
+        result["exit"] = 1
+        result["error"] = _error_text(e)
+    result["output"] = captured.getvalue()
+    result["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 3)
+    return result, handle
+
+
+def run_batch(lines: Iterable[str], jobs: int = 8, order: str = "ordered",
+              out: Optional[TextIO] = None, timeout: Optional[float] = None) -> int:
+    """
+    Execute batch lines and write JSONL results to `out`.
+
+    Returns 0 if every command succeeded, 1 otherwise.
+    """
+    emitter = _Emitter(out or sys.stdout, ordered=(order == "ordered"))
+    pending: List = []
+    seq = 0
+    running_barrier: Optional[Tuple[int, CommandHandle]] = None  # Timed-out write still running
+
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as pool:
+        for lineno, raw in enumerate(lines, 1):
+            text = raw.strip()
+            if not text or text.startswith("#"):
+                continue
+
+            this_seq, seq = seq, seq + 1
+            try:
+                route, params = _parse_line(text)
+                info = command_registry.COMMAND_INDEX.get(route, {})
+                if info.get("interactive"):
+                    raise ValueError(f"'{route}' is interactive and cannot run in a batch")
+            except Exception as e:
+                emitter.emit(this_seq, {"line": lineno, "route": None, "exit": 2,
+                                        "error": _error_text(e)})
+                continue
+
+            if running_barrier is not None:
+                barrier_line, barrier = running_barrier
+                if not barrier.finished.is_set():
+                    emitter.emit(this_seq, {"line": lineno, "route": route, "exit": 1,
+                                            "error": f"Not run: line {barrier_line} ('{barrier.route}') "
+                                                     f"timed out and is still running"})
+                    continue
+                running_barrier = None
+
+            if info.get("side_effect_free"):
+                future = pool.submit(_run_one, lineno, route, params, timeout)
+                future.add_done_callback(lambda f, s=this_seq: emitter.emit(s, f.result()[0]))
+                pending.append(future)
+            else:
+                # Barrier: let earlier reads finish, then run the write alone
+                wait(pending)
+                pending = []
+                result, handle = _run_one(lineno, route, params, timeout)
+                emitter.emit(this_seq, result)
+                if handle is not None and not handle.finished.wait(BARRIER_GRACE):
+                    running_barrier = (lineno, handle)
+
+        wait(pending)
+
+    return 1 if emitter.failures else 0
+
+
+def run_batch_file(path: str, jobs: int = 8, order: str = "ordered",
+                   timeout: Optional[float] = None) -> int:
+    """Run a batch from a file path, or from stdin when path is '-'."""
+    if path == "-":
+        return run_batch(sys.stdin, jobs=jobs, order=order, timeout=timeout)
+    with open(path, "r", encoding="utf-8") as f:
+        return run_batch(f, jobs=jobs, order=order, timeout=timeout)
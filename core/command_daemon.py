@@ -0,0 +1,259 @@
+# command_daemon.py - persistent command server for command_interface.py
+#
+# `python command_interface.py --serve` keeps every routed command module
+# imported (and lets modules warm up shared resources such as the memory DB),
+# then answers requests on a Unix socket. Regular invocations try the socket
+# first and fall back to in-process execution when no daemon is listening.
+#
+# Wire protocol: one JSON line per message.
+#   client -> {"argv": [...]}
+#   server -> {"out": "..."} / {"err": "..."} (streamed), then {"exit": <int>}
+
+import hashlib
+import importlib
+import io
+import json
+import logging
+import os
+import signal
+import socket
+import socketserver
+import sys
+import tempfile
+from typing import Callable, List, Optional
+
+from core import command_registry, metrics
+from core.stdio import redirect_thread_output
+
+logger = logging.getLogger(__name__)
+
+SOCKET_ENV = "GLENN_DAEMON_SOCKET"
+CONNECT_TIMEOUT = 0.5  # Seconds to wait for the daemon to accept
+READ_TIMEOUT = 600.0   # Seconds without any message from the daemon before giving up
+
+
+def _uid() -> int:
+    return os.getuid() if hasattr(os, "getuid") else 0
+
+
+def _socket_dir() -> str:
+    """Per-user directory for sockets: $XDG_RUNTIME_DIR, else a 0700 directory in the temp dir."""
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir and os.path.isdir(runtime_dir):
+        directory = os.path.join(runtime_dir, "glenn-ai")
+    else:
+        directory = os.path.join(tempfile.gettempdir(), f"glenn-ai-{_uid()}")
+    try:
+        os.mkdir(directory, 0o700)
+    except FileExistsError:
+        pass
+    st = os.lstat(directory)
+    # Someone else may have created the directory first to receive our commands
+    if not os.path.isdir(directory) or os.path.islink(directory) or st.st_uid != _uid() or st.st_mode & 0o077:
+        raise PermissionError(f"Daemon socket directory {directory} is not private to this user")
+    return directory
+
+
+def socket_path() -> str:
+    """Socket for this working directory (commands resolve data/ relative to cwd)."""
+    override = os.environ.get(SOCKET_ENV)
+    if override:
+        return override
+    digest = hashlib.sha1(os.getcwd().encode("utf-8")).hexdigest()[:12]
+    return os.path.join(_socket_dir(), f"{digest}.sock")
+
+
+def _owned_by_us(path: str) -> bool:
+    try:
+        return os.stat(path).st_uid == _uid()
+    except OSError:
+        return False
+
+
+def is_supported() -> bool:
+    return hasattr(socket, "AF_UNIX")
+
+
+class _SocketWriter(io.TextIOBase):
+    """Text stream that forwards each write to the client as a JSON message."""
+
+    def __init__(self, wfile, key: str):
+        self._wfile = wfile
+        self._key = key
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, text: str) -> int:
+        if text:
+            self._wfile.write(json.dumps({self._key: text}).encode("utf-8") + b"\n")
+            self._wfile.flush()
+        return len(text)
+
+
+class _CommandRequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        line = self.rfile.readline()
+        if not line:
+            return
+        try:
+            argv = json.loads(line)["argv"]
+        except (ValueError, KeyError, TypeError):
+            self._send({"err": "[Glenn.AI] Malformed daemon request\n"})
+            self._send({"exit": 2})
+            return
+
+        stdout = _SocketWriter(self.wfile, "out")
+        stderr = _SocketWriter(self.wfile, "err")
+        try:
+            with redirect_thread_output(stdout, stderr):
+                code = self.server.run_argv(argv)
+        except SystemExit as e:  # argparse errors / --help
+            code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+        except BrokenPipeError:
+            return  # Client went away
+        except Exception as e:
+            self._send({"err": f"[Glenn.AI] daemon error: {e}\n"})
+            code = 1
+        self._send({"exit": code or 0})
+
+    def _send(self, message: dict):
+        try:
+            self.wfile.write(json.dumps(message).encode("utf-8") + b"\n")
+            self.wfile.flush()
+        except BrokenPipeError:
+            pass
+
+
+class _CommandServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, path: str, run_argv: Callable[[List[str]], int]):
+        self.run_argv = run_argv
+        super().__init__(path, _CommandRequestHandler)
+
+
+def preload(routes) -> List[str]:
+    """Import every routed module and call its optional warm() hook."""
+    loaded = []
+    for module_path in sorted(set(routes.values())):
+        try:
+            module = importlib.import_module(module_path)
+            warm = getattr(module, "warm", None)
+            if callable(warm):
+                warm()
+            loaded.append(module_path)
+        except Exception as e:
+            logger.warning(f"Preload failed for {module_path}: {e}")
+            print(f"[Glenn.AI] preload skipped {module_path}: {e}")
+    return loaded
+
+
+def serve(run_argv: Callable[[List[str]], int], path: Optional[str] = None) -> int:
+    """
+    Run the command daemon until interrupted.
+
+    Args:
+        run_argv: The CLI entry point; called with each request's argv, returns the exit code
+        path: Socket path (default: socket_path())
+    """
+    if not is_supported():
+        print("[Glenn.AI] Unix sockets are not available on this platform; daemon mode disabled.")
+        return 1
+
+    path = path or socket_path()
+    if os.path.exists(path):
+        if forward_ping(path):
+            print(f"[Glenn.AI] daemon already running on {path}")
+            return 1
+        os.unlink(path)  # Stale socket from a previous daemon
+
+    loaded = preload(command_registry.COMMAND_ROUTES)
+    metrics.start_from_env()
+    # Interactive prompts must not block on the daemon's own terminal
+    sys.stdin = io.StringIO("")
+
+    def _stop(signum, frame):
+        raise KeyboardInterrupt
+
+    signal.signal(signal.SIGTERM, _stop)
+    server = _CommandServer(path, run_argv)
+    os.chmod(path, 0o600)
+    print(f"[Glenn.AI] daemon listening on {path} ({len(loaded)} modules preloaded)")
+    sys.stdout.flush()
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n[Glenn.AI] daemon stopping")
+    finally:
+        server.server_close()
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+    return 0
+
+
+def _connect(path: str) -> Optional[socket.socket]:
+    if not is_supported() or not os.path.exists(path):
+        return None
+    if not _owned_by_us(path):
+        logger.warning(f"Ignoring daemon socket {path}: owned by another user")
+        return None
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(CONNECT_TIMEOUT)
+    try:
+        sock.connect(path)
+    except OSError:
+        sock.close()
+        return None
+    sock.settimeout(READ_TIMEOUT)
+    return sock
+
+
+def forward_ping(path: str) -> bool:
+    """True if a daemon is accepting connections on `path`."""
+    sock = _connect(path)
+    if sock is None:
+        return False
+    sock.close()
+    return True
+
+
+def forward(argv: List[str], path: Optional[str] = None) -> Optional[int]:
+    """
+    Run argv on the daemon, streaming its output to this process.
+
+    Returns the command's exit code, or None when no daemon is available
+    (the caller should then execute in-process).
+    """
+    try:
+        path = path or socket_path()
+    except PermissionError as e:
+        logger.warning(f"Not using the command daemon: {e}")
+        return None
+    sock = _connect(path)
+    if sock is None:
+        return None
+    with sock, sock.makefile("rwb") as stream:
+        try:
+            stream.write(json.dumps({"argv": list(argv)}).encode("utf-8") + b"\n")
+            stream.flush()
+        except OSError:
+            return None
+        try:
+            for raw in stream:
+                message = json.loads(raw)
+                if "out" in message:
+                    sys.stdout.write(message["out"])
+                elif "err" in message:
+                    sys.stderr.write(message["err"])
+                elif "exit" in message:
+                    sys.stdout.flush()
+                    return message["exit"]
+        except socket.timeout:
+            print(f"[Glenn.AI] daemon sent nothing for {READ_TIMEOUT:g}s; giving up")
+            return 1
+    # Connection dropped before an exit status arrived
+    print("[Glenn.AI] daemon connection lost")
+    return 1
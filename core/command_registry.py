@@ -0,0 +1,230 @@
+# command_registry.py - command discovery and cached route index
+#
+# Every module in commands/ is a command. Modules declare their route with
+# module-level constants:
+#
+#   ROUTE = "status.report"     # defaults to "<module>.<entry>"
+#   ALIASES = ("status",)
+#   INTERACTIVE = True          # reads stdin; never forwarded to the daemon
+#   SIDE_EFFECT_FREE = True     # safe to run concurrently in --batch mode
+#   TIMEOUT = 120               # seconds before the runner gives up (0 = none)
+#
+# and expose either `run(**kwargs)` or `execute(args)`. Discovery reads the
+# source with `ast`, so building the index never imports a command module.
+# The index is cached as JSON in commands/__pycache__ and rebuilt whenever
+# the directory mtime or any module's mtime/size changes.
+#
+# The routing tables below are loaded from the index on import and shared by
+# the CLI (command_interface.py re-exports them) and by core modules, which
+# therefore never need to import the top-level script.
+
+import ast
+import importlib
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+COMMANDS_DIR = Path(__file__).parent.parent / "commands"
+INDEX_PATH = COMMANDS_DIR / "__pycache__" / "command_index.json"
+INDEX_VERSION = 3
+
+ENTRY_POINTS = ("run", "execute")
+
+# Module-level declarations captured into the index, with their defaults
+DECLARATIONS: Dict[str, Any] = {
+    "ROUTE": None,
+    "ALIASES": (),
+    "INTERACTIVE": False,
+    "SIDE_EFFECT_FREE": False,
+    "TIMEOUT": None,
+}
+
+
+def _fingerprint(commands_dir: Path) -> list:
+    """Directory mtime plus (name, mtime, size) of every module, from stat only."""
+    entries = []
+    with os.scandir(commands_dir) as it:
+        for entry in it:
+            if _is_command_file(entry.name):
+                st = entry.stat()
+                entries.append([entry.name, st.st_mtime_ns, st.st_size])
+    entries.sort()
+    return [INDEX_VERSION, os.stat(commands_dir).st_mtime_ns, entries]
+
+
+def _is_command_file(name: str) -> bool:
+    return name.endswith(".py") and not name.startswith(("_", "."))
+
+
+def _literal(node: ast.AST) -> Any:
+    try:
+        return ast.literal_eval(node)
+    except (ValueError, SyntaxError):
+        return None
+
+
+def _summary(docstring: Optional[str], route: str) -> str:
+    """First meaningful docstring line (skips a leading 'route:' header)."""
+    for line in (docstring or "").splitlines():
+        line = line.strip()
+        if line and line.rstrip(":") != route:
+            return line
+    return ""
+
+
+def inspect_module(path: Path, package: str = "commands") -> Optional[Dict[str, Any]]:
+    """Describe one command module without importing it."""
+    try:
+        source = path.read_text(encoding="utf-8-sig")
+        tree = ast.parse(source, filename=str(path))
+    except (OSError, SyntaxError, ValueError) as e:
+        logger.warning(f"Skipping {path.name}: {e}")
+        return None
+
+    declared = dict(DECLARATIONS)
+    entry = None
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and len(node.targets) == 1 and isinstance(node.targets[0], ast.Name):
+            name = node.targets[0].id
+            if name in declared:
+                value = _literal(node.value)
+                if value is not None:
+                    declared[name] = value
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)) and node.name in ENTRY_POINTS:
+            # Prefer run() when a module defines both
+            if entry is None or node.name == "run":
+                entry = node
+
+    if entry is None:
+        return None
+
+    module_name = path.stem
+    route = declared["ROUTE"] or f"{module_name}.{entry.name}"
+    info = {
+        "route": route,
+        "module": f"{package}.{module_name}",
+        "entry": entry.name,
+        "signature": f"{entry.name}({ast.unparse(entry.args)})",
+        "doc": ast.get_docstring(entry) or "",
+        "summary": _summary(ast.get_docstring(entry), route) or _summary(ast.get_docstring(tree), route),
+    }
+    for name, value in declared.items():
+        if name != "ROUTE":
+            info[name.lower()] = list(value) if isinstance(value, tuple) else value
+    return info
+
+
+def build_index(commands_dir: Path = COMMANDS_DIR) -> Dict[str, Any]:
+    """Scan commands_dir and build the route/alias index."""
+    commands: Dict[str, Dict[str, Any]] = {}
+    aliases: Dict[str, str] = {}
+    for path in sorted(commands_dir.glob("*.py")):
+        if not _is_command_file(path.name):
+            continue
+        info = inspect_module(path, package=commands_dir.name)
+        if info is None:
+            continue
+        route = info["route"]
+        if route in commands:
+            logger.warning(f"Route '{route}' in {info['module']} already provided by {commands[route]['module']}")
+            continue
+        commands[route] = info
+        for alias in info["aliases"]:
+            if alias in aliases or alias in commands:
+                logger.warning(f"Alias '{alias}' for {route} conflicts; keeping the first definition")
+                continue
+            aliases[alias] = route
+    return {"commands": commands, "aliases": aliases}
+
+
+def load_index(commands_dir: Path = COMMANDS_DIR, index_path: Path = INDEX_PATH) -> Dict[str, Any]:
+    """Return the cached index, rebuilding it if the commands directory changed."""
+    try:
+        # Create the cache dir first so creating it does not change the fingerprint
+        index_path.parent.mkdir(exist_ok=True)
+    except OSError:
+        pass
+    fingerprint = _fingerprint(commands_dir)
+    try:
+        with open(index_path, "r", encoding="utf-8") as f:
+            cached = json.load(f)
+        if cached.get("fingerprint") == fingerprint:
+            return cached
+    except (OSError, ValueError):
+        pass
+
+    index = build_index(commands_dir)
+    index["fingerprint"] = fingerprint
+    tmp_path = index_path.with_name(f"{index_path.name}.{os.getpid()}.tmp")
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(index, f, indent=1)
+        os.replace(tmp_path, index_path)
+    except OSError as e:
+        # Read-only checkout: still works, just rebuilds every time
+        logger.debug(f"Could not write command index: {e}")
+    return index
+
+
+# Discovered command metadata (route -> info), built without importing modules
+COMMAND_INDEX: Dict[str, Dict[str, Any]] = {}
+
+# Central routing table: route -> module path
+COMMAND_ROUTES: Dict[str, str] = {}
+
+# Optional short aliases for convenience
+ALIASES: Dict[str, str] = {}
+
+
+def reload_routes():
+    """(Re)load the routing tables from the cached command index."""
+    index = load_index()
+    COMMAND_INDEX.clear()
+    COMMAND_INDEX.update(index["commands"])
+    COMMAND_ROUTES.clear()
+    COMMAND_ROUTES.update({route: info["module"] for route, info in COMMAND_INDEX.items()})
+    ALIASES.clear()
+    ALIASES.update(index["aliases"])
+
+
+def resolve_command(name: str) -> str:
+    """Resolve aliases and confirm the command exists."""
+    route = ALIASES.get(name, name)
+    if route not in COMMAND_ROUTES:
+        raise KeyError(f"Unknown command '{name}'. Use --list to see options.")
+    return route
+
+
+def parse_kv_pairs(pairs) -> Dict[str, Any]:
+    """
+    Parse key=value pairs. Values keep '=' if present (split only on first '=').
+    Example: foo=bar=baz -> {'foo': 'bar=baz'}
+    """
+    out: Dict[str, Any] = {}
+    for raw in pairs or []:
+        if "=" not in raw:
+            raise ValueError(f"Invalid param '{raw}'. Expected key=value.")
+        k, v = raw.split("=", 1)
+        k = k.strip()
+        if not k:
+            raise ValueError(f"Empty key in '{raw}'.")
+        out[k] = v
+    return out
+
+
+def invoke_command(command: str, params: Dict[str, Any]):
+    """Import module and call its `run(**kwargs)` (or legacy `execute(args)`); returns its result."""
+    module_path = COMMAND_ROUTES[command]
+    module = importlib.import_module(module_path)
+    if hasattr(module, "run"):
+        return module.run(**params)  # modules may print or return data
+    if hasattr(module, "execute"):
+        return module.execute(params or None)
+    raise AttributeError(f"No 'run(**kwargs)' or 'execute(args)' in {module_path}")
+
+
+reload_routes()
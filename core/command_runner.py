@@ -0,0 +1,254 @@
+# command_runner.py - non-blocking command execution with deadlines
+#
+# submit_command() starts a routed command and returns a CommandHandle right
+# away, so a REPL or the voice loop can keep going and several commands can
+# overlap. A command gets a deadline when its module declares TIMEOUT or the
+# caller passes one; otherwise it may run as long as it needs.
+#
+#   - `async def run(...)` modules run as tasks on a shared event loop and are
+#     really cancelled (CancelledError inside the coroutine) on timeout/cancel.
+#   - Plain `run(...)` / `execute(args)` modules run on a daemon thread. Python
+#     cannot kill a thread, so cancellation is cooperative: a module that names
+#     a `cancel_event` parameter receives a threading.Event that is set on
+#     timeout or cancel(). The handle fails with CommandTimeout at the deadline
+#     either way, so callers are never blocked by a hung command;
+#     CommandHandle.finished tells when the command's code has really stopped.
+
+import asyncio
+import concurrent.futures
+import importlib
+import inspect
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from core import command_registry, metrics
+from core.stdio import current_output, redirect_thread_output
+
+_USE_DEFAULT = object()
+
+COMMANDS_TOTAL = metrics.counter("glenn_commands_total", "Routed commands by outcome", ["route", "outcome"])
+COMMAND_SECONDS = metrics.histogram("glenn_command_duration_seconds", "Routed command wall time", ["route"])
+COMMANDS_IN_FLIGHT = metrics.gauge("glenn_commands_in_flight", "Routed commands currently running")
+
+
+class CommandTimeout(TimeoutError):
+    """Raised by CommandHandle.result() when a command misses its deadline."""
+
+
+class CommandHandle:
+    """Handle to a submitted command; wraps a concurrent.futures.Future."""
+
+    def __init__(self, route: str, params: Dict[str, Any], timeout: Optional[float]):
+        self.route = route
+        self.params = params
+        self.timeout = timeout
+        self.started = time.monotonic()
+        self.future: concurrent.futures.Future = concurrent.futures.Future()
+        self.cancel_event = threading.Event()
+        self.finished = threading.Event()  # Set once the command's code stops (may be after a timeout)
+        self._task_future: Optional[concurrent.futures.Future] = None
+
+    def result(self, timeout: Optional[float] = None) -> Any:
+        """Wait for the command's return value (re-raises its exception)."""
+        return self.future.result(timeout)
+
+    def done(self) -> bool:
+        return self.future.done()
+
+    def cancelled(self) -> bool:
+        return self.future.cancelled()
+
+    def cancel(self) -> bool:
+        """Request cancellation; returns False if the command already finished."""
+        if self.future.done():
+            return False
+        self.cancel_event.set()
+        if self._task_future is not None:
+            self._task_future.cancel()
+        return self.future.cancel() or self.future.cancelled()
+
+    def add_done_callback(self, fn: Callable[["CommandHandle"], None]):
+        self.future.add_done_callback(lambda _: fn(self))
+
+    def _expire(self):
+        if self.future.done():
+            return
+        # Settle first so the task's cancellation is not reported as the outcome
+        _settle(self.future, exception=CommandTimeout(
+            f"Command '{self.route}' timed out after {self.timeout:g}s"))
+        self.cancel_event.set()
+        if self._task_future is not None:
+            self._task_future.cancel()
+
+    def __repr__(self):
+        state = "done" if self.done() else "running"
+        return f"<CommandHandle {self.route} {state}>"
+
+
+def _settle(future: concurrent.futures.Future, result: Any = None, exception: Optional[BaseException] = None):
+    """Complete a future unless it was already completed (timeout vs. finish race)."""
+    try:
+        if exception is not None:
+            future.set_exception(exception)
+        else:
+            future.set_result(result)
+    except concurrent.futures.InvalidStateError:
+        pass
+
+
+class CommandRunner:
+    """Runs commands on daemon threads / a background event loop."""
+
+    def __init__(self):
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_lock = threading.Lock()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        """Shared event loop (started on first use) for async commands and deadlines."""
+        with self._loop_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever, name="glenn-command-loop",
+                                 daemon=True).start()
+            return self._loop
+
+    def submit(self, route: str, params: Optional[Dict[str, Any]] = None,
+               timeout: Any = _USE_DEFAULT) -> CommandHandle:
+        """Start `route` and return its handle immediately."""
+        params = dict(params or {})
+        if timeout is _USE_DEFAULT:
+            timeout = route_timeout(route)
+        handle = CommandHandle(route, params, timeout or None)
+
+        fn, call_args, call_kwargs = _prepare_call(route, params, handle.cancel_event)
+        output = current_output()
+        COMMANDS_IN_FLIGHT.inc()
+        handle.add_done_callback(_record_outcome)
+
+        if inspect.iscoroutinefunction(fn):
+            handle._task_future = asyncio.run_coroutine_threadsafe(
+                _run_async(fn, call_args, call_kwargs, output), self.loop)
+            handle._task_future.add_done_callback(lambda f: _copy_outcome(f, handle.future))
+            handle._task_future.add_done_callback(lambda f: handle.finished.set())
+        else:
+            threading.Thread(target=_run_sync, args=(handle, fn, call_args, call_kwargs, output),
+                             name=f"glenn-command-{route}", daemon=True).start()
+
+        if handle.timeout:
+            self.loop.call_soon_threadsafe(self._arm_deadline, handle)
+        return handle
+
+    def _arm_deadline(self, handle: CommandHandle):
+        """Schedule the handle's expiry, cancelled as soon as the command finishes (loop thread)."""
+        timer = self.loop.call_later(handle.timeout, handle._expire)
+        handle.add_done_callback(lambda h: self.loop.call_soon_threadsafe(timer.cancel))
+
+
+def _record_outcome(handle: CommandHandle):
+    COMMANDS_IN_FLIGHT.dec()
+    COMMAND_SECONDS.labels(route=handle.route).observe(time.monotonic() - handle.started)
+    if handle.cancelled():
+        outcome = "cancelled"
+    elif isinstance(handle.future.exception(), CommandTimeout):
+        outcome = "timeout"
+    elif handle.future.exception() is not None:
+        outcome = "error"
+    else:
+        outcome = "ok"
+    COMMANDS_TOTAL.labels(route=handle.route, outcome=outcome).inc()
+
+
+def _prepare_call(route: str, params: Dict[str, Any], cancel_event: threading.Event):
+    """Import the module and build the entry-point call for `route`."""
+    module_path = command_registry.COMMAND_ROUTES[route]
+    module = importlib.import_module(module_path)
+    if hasattr(module, "run"):
+        fn = module.run
+        kwargs = dict(params)
+        if "cancel_event" in inspect.signature(fn).parameters:
+            kwargs["cancel_event"] = cancel_event
+        return fn, (), kwargs
+    if hasattr(module, "execute"):
+        return module.execute, (params or None,), {}
+    raise AttributeError(f"No 'run(**kwargs)' or 'execute(args)' in {module_path}")
+
+
+def _run_sync(handle: CommandHandle, fn, args, kwargs, output):
+    try:
+        if handle.future.done():  # Cancelled before it started
+            return
+        stdout, stderr = output
+        try:
+            if stdout is not None:
+                with redirect_thread_output(stdout, stderr):
+                    value = fn(*args, **kwargs)
+            else:
+                value = fn(*args, **kwargs)
+            _settle(handle.future, result=value)
+        except BaseException as e:
+            _settle(handle.future, exception=e)
+    finally:
+        handle.finished.set()
+
+
+async def _run_async(fn, args, kwargs, output):
+    stdout, stderr = output
+    if stdout is not None:
+        # Each task has its own context, so this redirect does not leak to other tasks
+        with redirect_thread_output(stdout, stderr):
+            return await fn(*args, **kwargs)
+    return await fn(*args, **kwargs)
+
+
+def _copy_outcome(source: concurrent.futures.Future, target: concurrent.futures.Future):
+    if source.cancelled():
+        target.cancel()
+    elif source.exception() is not None:
+        _settle(target, exception=source.exception())
+    else:
+        _settle(target, result=source.result())
+
+
+def route_timeout(route: str) -> Optional[float]:
+    """Deadline for a route from its module's TIMEOUT declaration (None = no limit)."""
+    declared = command_registry.COMMAND_INDEX.get(route, {}).get("timeout")
+    if declared is None:
+        return None
+    return float(declared) or None
+
+
+_default_runner: Optional[CommandRunner] = None
+_default_lock = threading.Lock()
+
+
+def get_runner() -> CommandRunner:
+    global _default_runner
+    with _default_lock:
+        if _default_runner is None:
+            _default_runner = CommandRunner()
+        return _default_runner
+
+
+def submit_command(route: str, params: Optional[Dict[str, Any]] = None,
+                   timeout: Any = _USE_DEFAULT) -> CommandHandle:
+    """Start a command on the shared runner; returns a CommandHandle."""
+    return get_runner().submit(route, params, timeout=timeout)
+
+
+def run_command(route: str, params: Optional[Dict[str, Any]] = None,
+                timeout: Any = _USE_DEFAULT) -> Any:
+    """Run a command and wait for its result (raises CommandTimeout on deadline)."""
+    return submit_command(route, params, timeout=timeout).result()
+
+
+async def run_command_async(route: str, params: Optional[Dict[str, Any]] = None,
+                            timeout: Any = _USE_DEFAULT) -> Any:
+    """Await a command from asyncio code; cancelling the awaiting task cancels the command."""
+    handle = submit_command(route, params, timeout=timeout)
+    try:
+        return await asyncio.wrap_future(handle.future)
+    except asyncio.CancelledError:
+        handle.cancel()
+        raise
@@ -0,0 +1,226 @@
+# conversation.py - bounded in-process conversation context
+#
+# A Conversation keeps the most recent turns of one session in a ring buffer
+# capped both by turn count and by total characters, so a long session uses
+# constant memory and personas can read recent context without querying
+# memory_log:
+#
+#   conversation = Conversation("main", spill=SpillWriter(log_interactions))
+#   conversation.add(command, persona, response)
+#   conversation.render()      # "User: ...\nEcho: ..." (newest turns that fit)
+#   conversation.close()       # Flush pending spills on exit
+#
+# Every turn is also handed to the optional SpillWriter, which writes batches
+# to the persistent store on a background thread; the REPL never waits on
+# SQLite. If the store falls behind by more than max_pending turns, add() waits
+# up to submit_timeout for room and then writes the turn itself, so the REPL
+# slows down with the store instead of losing turns (inline writes are counted
+# in glenn_conversation_spill_total).
+
+import atexit
+import logging
+import queue
+import threading
+import time
+from collections import deque
+from typing import Callable, Deque, Iterator, List, Optional, Tuple
+
+from core import metrics
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_TURNS = 20
+DEFAULT_MAX_CHARS = 8000   # Roughly 2k tokens of context
+MAX_PENDING = 1000         # Turns queued for the store before submit() waits
+SUBMIT_TIMEOUT = 0.25      # Seconds submit() waits for room before writing inline
+BATCH_SIZE = 64            # Turns per store write
+
+SPILL_TOTAL = metrics.counter("glenn_conversation_spill_total", "Conversation turns spilled to the store",
+                              ["outcome"])
+
+# (timestamp "YYYY-MM-DD HH:MM:SS" UTC, user_input, persona, response), as memory_log stores them
+SpillRow = Tuple[str, str, str, str]
+
+
+class Turn:
+    """One exchange: what the user said and which persona answered what."""
+
+    __slots__ = ("timestamp", "user_input", "persona", "response")
+
+    def __init__(self, user_input: str, persona: str, response: str, timestamp: Optional[float] = None):
+        self.timestamp = time.time() if timestamp is None else timestamp
+        self.user_input = user_input
+        self.persona = persona
+        self.response = response
+
+    @property
+    def chars(self) -> int:
+        return len(self.user_input) + len(self.response)
+
+    def as_row(self) -> SpillRow:
+        stamp = time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(self.timestamp))
+        return stamp, self.user_input, self.persona, self.response
+
+    def __repr__(self):
+        return f"<Turn {self.persona}: {self.user_input[:30]!r}>"
+
+
+class SpillWriter:
+    """Writes turns to a persistent store in batches on a daemon thread."""
+
+    def __init__(self, write_rows: Callable[[List[SpillRow]], None], max_pending: int = MAX_PENDING,
+                 batch_size: int = BATCH_SIZE, submit_timeout: float = SUBMIT_TIMEOUT):
+        """
+        write_rows(rows) stores a batch of SpillRows and raises on failure
+        (the batch is then logged and dropped). It must be safe to call from
+        the submitting thread too, which writes overflow turns itself.
+        """
+        self.write_rows = write_rows
+        self.batch_size = batch_size
+        self.submit_timeout = submit_timeout
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max_pending)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def submit(self, turn: Turn) -> bool:
+        """
+        Queue a turn for writing. When the backlog stays full for
+        submit_timeout, the turn is written on the calling thread instead
+        (possibly ahead of queued turns; rows keep their own timestamps).
+
+        Returns:
+            False only if that inline write failed
+        """
+        self._ensure_started()
+        try:
+            self._queue.put(turn, timeout=self.submit_timeout)
+            return True
+        except queue.Full:
+            pass
+        try:
+            self.write_rows([turn.as_row()])
+            SPILL_TOTAL.labels(outcome="inline").inc()
+            return True
+        except Exception as e:
+            logger.error(f"Conversation spill failed (1 turn): {e}")
+            SPILL_TOTAL.labels(outcome="error").inc()
+            return False
+
+    def flush(self, timeout: Optional[float] = 5.0) -> bool:
+        """Wait until everything submitted so far is written; False on timeout."""
+        if self._thread is None:
+            return True
+        done = threading.Event()
+        try:
+            self._queue.put(done, timeout=timeout)
+        except queue.Full:
+            return False
+        return done.wait(timeout)
+
+    close = flush
+
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="glenn-conversation-spill", daemon=True)
+                self._thread.start()
+                atexit.register(self.flush)
+
+    def _run(self):
+        while True:
+            batch, markers = [], []
+            item = self._queue.get()
+            while True:
+                if isinstance(item, threading.Event):
+                    markers.append(item)
+                else:
+                    batch.append(item.as_row())
+                if len(batch) >= self.batch_size:
+                    break
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            if batch:
+                try:
+                    self.write_rows(batch)
+                    SPILL_TOTAL.labels(outcome="written").inc(len(batch))
+                except Exception as e:
+                    logger.error(f"Conversation spill failed ({len(batch)} turns): {e}")
+                    SPILL_TOTAL.labels(outcome="error").inc(len(batch))
+            for marker in markers:
+                marker.set()
+
+
+class Conversation:
+    """Ring buffer of a session's recent turns, bounded by count and characters."""
+
+    def __init__(self, session_id: str = "default", max_turns: int = DEFAULT_MAX_TURNS,
+                 max_chars: int = DEFAULT_MAX_CHARS, spill: Optional[SpillWriter] = None):
+        self.session_id = session_id
+        self.max_chars = max_chars
+        self.spill = spill
+        self._turns: Deque[Turn] = deque(maxlen=max_turns)
+        self._chars = 0
+        self._lock = threading.Lock()
+
+    def add(self, user_input: str, persona: str, response: str) -> Turn:
+        """Record a turn (and spill it); the oldest turns fall out past the limits."""
+        turn = Turn(user_input, persona, response if isinstance(response, str) else str(response))
+        with self._lock:
+            if len(self._turns) == self._turns.maxlen:
+                self._chars -= self._turns[0].chars
+            self._turns.append(turn)
+            self._chars += turn.chars
+            # The newest turn always stays, even if it alone is over budget
+            while self._chars > self.max_chars and len(self._turns) > 1:
+                self._chars -= self._turns.popleft().chars
+        if self.spill is not None:
+            self.spill.submit(turn)
+        return turn
+
+    def recent(self, count: Optional[int] = None) -> List[Turn]:
+        """The last `count` turns (all by default), oldest first."""
+        with self._lock:
+            turns = list(self._turns)
+        return turns if count is None else turns[-count:] if count > 0 else []
+
+    def last(self) -> Optional[Turn]:
+        with self._lock:
+            return self._turns[-1] if self._turns else None
+
+    def render(self, max_chars: Optional[int] = None, user_label: str = "User") -> str:
+        """Recent turns as dialogue text, newest kept first when trimming to `max_chars`."""
+        budget = self.max_chars if max_chars is None else max_chars
+        lines: List[str] = []
+        for turn in reversed(self.recent()):
+            exchange = f"{user_label}: {turn.user_input}\n{turn.persona}: {turn.response}"
+            if lines and budget < len(exchange):
+                break
+            budget -= len(exchange)
+            lines.append(exchange)
+        return "\n".join(reversed(lines))
+
+    @property
+    def chars(self) -> int:
+        return self._chars
+
+    def clear(self):
+        with self._lock:
+            self._turns.clear()
+            self._chars = 0
+
+    def close(self, timeout: Optional[float] = 5.0) -> bool:
+        """Flush pending spills (the in-memory context is kept)."""
+        return self.spill.flush(timeout) if self.spill is not None else True
+
+    def __len__(self):
+        return len(self._turns)
+
+    def __iter__(self) -> Iterator[Turn]:
+        return iter(self.recent())
+
+    def __repr__(self):
+        return f"<Conversation {self.session_id}: {len(self._turns)} turns, {self._chars} chars>"
@@ -0,0 +1,120 @@
+# file_watcher.py - stat-polling file watcher for hot reloads
+#
+#   watcher = FileWatcher()
+#   watcher.watch("manifests/glenn_manifest.json", on_change)
+#   watcher.start()          # Background thread; on_change(path) runs there
+#   ...
+#   watcher.stop()
+#
+# A file counts as changed when its (mtime_ns, size) differs from the last
+# poll, including when it appears or disappears. Polling starts at
+# min_interval and backs off towards max_interval while nothing changes, so
+# an idle watcher costs a few stat() calls per second at most; any change
+# snaps it back to the fast interval (editors often save in several writes).
+#
+# Callbacks should build their new state completely and then swap it in with
+# a single assignment. A callback that raises (e.g. a half-saved JSON file)
+# is logged and the previous state stays in place; the next save retries.
+
+import logging
+import os
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+from core import metrics
+
+logger = logging.getLogger(__name__)
+
+MIN_INTERVAL = 0.25  # Seconds between polls right after a change
+MAX_INTERVAL = 2.0   # Seconds between polls once things are quiet
+BACKOFF = 1.5        # Interval multiplier per quiet poll
+
+RELOADS = metrics.counter("glenn_file_reloads_total", "Watched file change callbacks", ["outcome"])
+
+Signature = Optional[Tuple[int, int]]
+
+
+def file_signature(path: str) -> Signature:
+    """(mtime_ns, size) of a file, or None if it does not exist."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+class FileWatcher:
+    """Calls back when watched files change on disk."""
+
+    def __init__(self, min_interval: float = MIN_INTERVAL, max_interval: float = MAX_INTERVAL,
+                 backoff: float = BACKOFF):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.interval = min_interval
+        self._watches: Dict[str, Tuple[Signature, List[Callable[[str], None]]]] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def watch(self, path, callback: Callable[[str], None]):
+        """Call `callback(path)` whenever `path` changes from its current state."""
+        path = os.path.abspath(os.fspath(path))
+        with self._lock:
+            signature, callbacks = self._watches.get(path, (file_signature(path), []))
+            if callback not in callbacks:
+                self._watches[path] = (signature, callbacks + [callback])
+
+    def unwatch(self, path):
+        with self._lock:
+            self._watches.pop(os.path.abspath(os.fspath(path)), None)
+
+    def check(self) -> int:
+        """Poll every watched file once; returns how many had changed."""
+        with self._lock:
+            watches = list(self._watches.items())
+
+        changed = 0
+        for path, (signature, callbacks) in watches:
+            current = file_signature(path)
+            if current == signature:
+                continue
+            changed += 1
+            with self._lock:
+                if path in self._watches:
+                    self._watches[path] = (current, self._watches[path][1])
+            for callback in callbacks:
+                try:
+                    callback(path)
+                    RELOADS.labels(outcome="ok").inc()
+                except Exception as e:
+                    logger.error(f"Reload of {path} failed, keeping previous state: {e}")
+                    RELOADS.labels(outcome="error").inc()
+
+        if changed:
+            self.interval = self.min_interval
+        else:
+            self.interval = min(self.interval * self.backoff, self.max_interval)
+        return changed
+
+    def start(self):
+        """Poll in a daemon thread until stop()."""
+        if self.is_running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="glenn-file-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=2.0)
+        self._thread = None
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.check()
@@ -0,0 +1,246 @@
+# intent_matcher.py - single-pass keyword intent classification
+#
+# Routers used to test `any(word in text for word in [...])` once per intent,
+# rescanning the utterance for every keyword list. IntentMatcher compiles a
+# declarative intent table into one Aho-Corasick automaton and classifies an
+# utterance in a single left-to-right pass, however many keywords there are.
+#
+#   INTENTS = (
+#       ("task", ("task", "todo", "remind")),
+#       ("status", ("status", "how are you")),
+#   )
+#   matcher = IntentMatcher(INTENTS)
+#   matcher.classify("remind me to call mom")  # -> "task"
+#
+# Semantics match the chains it replaces: keywords are case-insensitive
+# substrings, and when several intents match, the one listed first wins.
+#
+# The routers (chat, the voice shell, persona selection) share one table,
+# INTENTS, and one automaton built from it; each router only looks at its
+# own rows:
+#
+#   classify_intent("chat", "remind me to call mom")  # -> "task"
+#
+# Personas declare their keywords as TRIGGERS in their agent modules, so the
+# persona router adds them with register_intents() as agents load.
+#
+# Benchmark: python -m core.intent_matcher
+
+import threading
+from collections import deque
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Tuple, Union
+
+IntentTable = Union[Mapping[str, Iterable[str]], Sequence[Tuple[str, Iterable[str]]]]
+
+_NO_MATCH = 1 << 30  # Priority sentinel larger than any intent index
+_NO_OUTPUT = frozenset()
+
+# (router, intent, trigger keywords); within a router, earlier rows win ties
+INTENTS: List[Tuple[str, str, Tuple[str, ...]]] = [
+    ("chat", "task", ("task", "todo", "remind")),
+    ("chat", "memory", ("memory", "remember", "recall")),
+    ("chat", "status", ("status", "health", "how are you")),
+    ("chat", "greeting", ("hello", "hi", "hey")),
+    ("chat", "echo", ("echo", "glenn")),
+    # Voice shell; anything unmatched falls through to chat routing
+    ("voice", "exit", ("stop listening", "exit voice", "disable voice")),
+    ("voice", "identity", ("who are you", "introduce yourself")),
+    ("voice", "status", ("status", "how are you", "system status")),
+    ("voice", "task", ("task", "todo", "remind")),
+    ("voice", "memory", ("memory", "remember", "recall")),
+    ("voice", "time", ("time", "date", "what time")),
+]
+
+
+class IntentMatcher:
+    """Aho-Corasick automaton over an ordered intent -> keywords table."""
+
+    def __init__(self, intents: IntentTable):
+        items = list(intents.items()) if isinstance(intents, Mapping) else list(intents)
+        self.intents: List[str] = [name for name, _ in items]
+        self.keyword_count = 0
+
+        # Trie: goto[state] maps char -> state; outputs[state] holds the
+        # priorities (intent indexes) of keywords ending at this state.
+        goto: List[Dict[str, int]] = [{}]
+        outputs: List[frozenset] = [_NO_OUTPUT]
+        for priority, (_, keywords) in enumerate(items):
+            for keyword in keywords:
+                keyword = keyword.lower()
+                if not keyword:
+                    continue
+                self.keyword_count += 1
+                state = 0
+                for ch in keyword:
+                    nxt = goto[state].get(ch)
+                    if nxt is None:
+                        nxt = len(goto)
+                        goto[state][ch] = nxt
+                        goto.append({})
+                        outputs.append(_NO_OUTPUT)
+                    state = nxt
+                outputs[state] = outputs[state] | {priority}
+
+        # Breadth-first: failure links point at the longest proper suffix that
+        # is also a trie path; outputs reachable through them are folded in
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in goto[state].items():
+                if state:
+                    link = fail[state]
+                    while link and ch not in goto[link]:
+                        link = fail[link]
+                    fail[nxt] = goto[link].get(ch, 0)
+                queue.append(nxt)
+            if outputs[fail[state]]:
+                outputs[state] = outputs[state] | outputs[fail[state]]
+
+        self._goto = goto
+        self._fail = fail
+        self._outputs = outputs
+        # classify() only needs the top intent per state
+        self._best = [min(out) if out else _NO_MATCH for out in outputs]
+
+    @property
+    def state_count(self) -> int:
+        return len(self._goto)
+
+    def classify(self, text: str) -> Optional[str]:
+        """Highest-priority intent with a keyword in `text`, or None."""
+        if not text:
+            return None
+        goto, fail, best = self._goto, self._fail, self._best
+        state, found = 0, _NO_MATCH
+        for ch in text.lower():
+            nxt = goto[state].get(ch)
+            while nxt is None and state:
+                state = fail[state]
+                nxt = goto[state].get(ch)
+            state = nxt or 0
+            if best[state] < found:
+                found = best[state]
+                if found == 0:
+                    break  # Nothing can outrank the first intent
+        return self.intents[found] if found != _NO_MATCH else None
+
+    def matches(self, text: str) -> List[str]:
+        """Every intent with a keyword in `text`, in priority order."""
+        return [self.intents[priority] for priority in self.match_indexes(text)]
+
+    def match_indexes(self, text: str) -> List[int]:
+        """Table positions of every intent with a keyword in `text`, ascending."""
+        if not text:
+            return []
+        goto, fail, outputs = self._goto, self._fail, self._outputs
+        state, hits = 0, set()
+        for ch in text.lower():
+            nxt = goto[state].get(ch)
+            while nxt is None and state:
+                state = fail[state]
+                nxt = goto[state].get(ch)
+            state = nxt or 0
+            if outputs[state]:
+                hits.update(outputs[state])
+        return sorted(hits)
+
+    def __repr__(self):
+        return f"<IntentMatcher {len(self.intents)} intents, {self.keyword_count} keywords>"
+
+
+_shared: Optional[IntentMatcher] = None
+_shared_lock = threading.Lock()
+
+
+def shared_matcher() -> IntentMatcher:
+    """The automaton over INTENTS (rebuilt after register_intents())."""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = IntentMatcher([((router, intent), keywords) for router, intent, keywords in INTENTS])
+        return _shared
+
+
+def register_intents(router: str, intents: Iterable[Tuple[str, Iterable[str]]]):
+    """
+    Add or replace intents of `router` in the shared table.
+
+    Args:
+        router: Router the intents belong to
+        intents: (intent, keywords) pairs; new intents rank below existing ones
+    """
+    global _shared
+    with _shared_lock:
+        changed = False
+        for intent, keywords in intents:
+            row = (router, intent, tuple(keywords))
+            for index, (r, i, _) in enumerate(INTENTS):
+                if (r, i) == (router, intent):
+                    if INTENTS[index] != row:
+                        INTENTS[index] = row
+                        changed = True
+                    break
+            else:
+                INTENTS.append(row)
+                changed = True
+        if changed:
+            _shared = None
+
+
+def classify_intent(router: str, text: str) -> Optional[str]:
+    """Highest-priority intent of `router` with a keyword in `text`, or None."""
+    for owner, intent in shared_matcher().matches(text):
+        if owner == router:
+            return intent
+    return None
+
+
+def matching_intents(router: str, text: str) -> List[str]:
+    """Every intent of `router` with a keyword in `text`, in priority order."""
+    return [intent for owner, intent in shared_matcher().matches(text) if owner == router]
+
+
+def _benchmark():
+    import random
+    import string
+    import time
+
+    rng = random.Random(7)
+    words = ["".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(4, 9)))
+             for _ in range(10000)]
+    phrases = ["remind me to call the office", "what is the system status right now",
+               "please recall what i said yesterday", "tell me something i do not know"]
+
+    print(f"{'keywords':>9} {'intents':>8} {'states':>8} {'any() us':>10} {'automaton us':>13}")
+    for keyword_count in (20, 200, 2000, 10000):
+        per_intent = max(1, keyword_count // 20)
+        table = [(f"intent{i}", words[i * per_intent:(i + 1) * per_intent])
+                 for i in range(keyword_count // per_intent)]
+        matcher = IntentMatcher(table)
+        utterances = [f"{p} {rng.choice(words[:keyword_count])}" if n % 2 else p
+                      for n, p in enumerate(phrases * 25)]
+
+        def chained(text):
+            lowered = text.lower()
+            for name, keywords in table:
+                if any(word in lowered for word in keywords):
+                    return name
+            return None
+
+        for text in utterances:  # Same answers as the chains it replaces
+            assert matcher.classify(text) == chained(text), text
+
+        timings = []
+        for classify in (chained, matcher.classify):
+            started = time.perf_counter()
+            for _ in range(5):
+                for text in utterances:
+                    classify(text)
+            timings.append((time.perf_counter() - started) / (5 * len(utterances)) * 1e6)
+        print(f"{matcher.keyword_count:>9} {len(table):>8} {matcher.state_count:>8} "
+              f"{timings[0]:>10.2f} {timings[1]:>13.2f}")
+
+
+if __name__ == "__main__":
+    _benchmark()
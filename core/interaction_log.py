@@ -0,0 +1,84 @@
+# interaction_log.py - writes to the memory_log table shared by the REPLs
+#
+# main.py and the chat command both log every exchange to a SQLite
+# memory_log table (each to its own database file). The writers and their
+# metrics live here so both report the same series, labelled by source:
+#
+#   log_interaction(db_path, "hi", "Echo", "Hello!", source="main")
+#   spill = SpillWriter(functools.partial(log_interactions, db_path, source="chat"))
+
+import logging
+import sqlite3
+import time
+from typing import Iterable, Sequence
+
+from core import metrics
+
+logger = logging.getLogger(__name__)
+
+DB_WRITES = metrics.counter("glenn_db_writes_total", "Interaction log writes", ["source", "outcome"])
+DB_WRITE_SECONDS = metrics.histogram("glenn_db_write_seconds", "Interaction log write time", ["source"])
+
+_CREATE_TABLE = """
+    CREATE TABLE IF NOT EXISTS memory_log (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+        user_input TEXT,
+        persona TEXT,
+        response TEXT
+    )
+"""
+
+
+def log_interaction(db_path, user_input: str, persona: str, response: str, source: str) -> bool:
+    """
+    Write one exchange, creating the table if needed.
+
+    Failures are logged and counted, never raised: the REPL keeps going.
+
+    Returns:
+        True if the row was written
+    """
+    started = time.perf_counter()
+    try:
+        conn = sqlite3.connect(db_path)
+        with conn:
+            conn.execute(_CREATE_TABLE)
+            conn.execute("""
+                INSERT INTO memory_log (user_input, persona, response)
+                VALUES (?, ?, ?)
+            """, (user_input, persona, response))
+        conn.close()
+        DB_WRITES.labels(source=source, outcome="ok").inc()
+        return True
+    except Exception as e:
+        logger.error(f"Memory log error: {e}")
+        DB_WRITES.labels(source=source, outcome="error").inc()
+        return False
+    finally:
+        DB_WRITE_SECONDS.labels(source=source).observe(time.perf_counter() - started)
+
+
+def log_interactions(db_path, rows: Iterable[Sequence[str]], source: str):
+    """
+    Write a batch of (timestamp, user_input, persona, response) rows in one
+    transaction; raises on failure (the conversation spill counts the batch).
+    """
+    rows = list(rows)
+    started = time.perf_counter()
+    try:
+        conn = sqlite3.connect(db_path)
+        with conn:
+            conn.execute(_CREATE_TABLE)
+            conn.executemany("""
+                INSERT INTO memory_log (timestamp, user_input, persona, response)
+                VALUES (?, ?, ?, ?)
+            """, rows)
+        conn.close()
+        logger.debug(f"{len(rows)} interactions logged to memory")
+        DB_WRITES.labels(source=source, outcome="ok").inc(len(rows))
+    except Exception:
+        DB_WRITES.labels(source=source, outcome="error").inc(len(rows))
+        raise
+    finally:
+        DB_WRITE_SECONDS.labels(source=source).observe(time.perf_counter() - started)
@@ -1,5 +1,221 @@
-def route_command(command, twin):
-    # Simple keyword trigger to Echo
-    if 'echo' in command.lower() or 'glenn' in command.lower():
-        return f"Echo here. You said: '{command}'"
-    return f"I heard you, but I don't yet know how to handle: '{command}'"
+# persona_router.py - fan a command out to the twin's personas
+#
+# Each persona in the manifest maps to an agent module (agents/<name>.py, or
+# the persona's "module" key) exposing:
+#
+#   TRIGGERS = ("task", "todo")   # Keywords that make it eligible (empty = always)
+#   TIMEOUT = 0.5                 # Seconds it may take (manifest "timeout" wins)
+#   CACHE_TTL = 60                # Optional: seconds its answers may be reused
+#   def respond(command, twin):   # -> (text, confidence 0..1) or None to pass
+#
+# twin["conversation"], when the caller has one, is the session's
+# core.conversation.Conversation (recent turns, no DB round trip). Personas
+# whose answers depend on it should not declare CACHE_TTL.
+#
+# Eligible personas run concurrently on a shared thread pool. With the
+# "first_confident" strategy the first answer at or above the confidence
+# threshold is returned immediately, so a slow persona never delays a fast
+# one; "merge" collects every confident answer that arrives before its
+# persona's deadline. When nobody is confident, the persona marked
+# "fallback": true in the manifest answers.
+#
+# Final responses are cached by normalized utterance for the shortest
+# CACHE_TTL of the personas that produced them (see core/response_cache.py).
+
+import importlib
+import logging
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Dict, List, Optional, Tuple
+
+from core import metrics
+from core.intent_matcher import matching_intents, register_intents
+from core.response_cache import MISSING, ResponseCache, normalize_utterance
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_STRATEGY = "first_confident"   # or "merge"
+DEFAULT_CONFIDENCE = 0.6               # Minimum confidence to win/merge
+DEFAULT_PERSONA_TIMEOUT = 1.0          # Seconds, when neither manifest nor agent sets one
+MAX_WORKERS = 8
+
+ROUTE_SECONDS = metrics.histogram("glenn_persona_route_seconds", "Persona routing time", ["router"])
+PERSONA_SECONDS = metrics.histogram("glenn_persona_seconds", "Time for one persona to answer", ["persona"])
+PERSONA_RESULTS = metrics.counter("glenn_persona_results_total", "Persona outcomes", ["persona", "outcome"])
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+_agents: Dict[str, object] = {}
+
+RESPONSE_CACHE = ResponseCache("persona")
+_cached_personas = None  # Persona table the cached responses came from
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """Thread pool shared by every routing call."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="glenn-persona")
+        return _executor
+
+
+def _load_agent(name: str, config: dict):
+    """Import the agent module for a persona (cached); None if it has no respond()."""
+    module_path = config.get("module") or f"agents.{name.lower()}"
+    if module_path not in _agents:
+        try:
+            module = importlib.import_module(module_path)
+            _agents[module_path] = module if hasattr(module, "respond") else None
+        except Exception as e:
+            logger.warning(f"Persona '{name}' unavailable ({module_path}): {e}")
+            _agents[module_path] = None
+    return _agents[module_path]
+
+
+def _eligible(command: str, personas: Dict[str, dict]) -> List[Tuple[str, object, float]]:
+    """(name, agent, timeout) for non-fallback personas triggered by the command."""
+    loaded = []
+    for name, config in personas.items():
+        if (config or {}).get("fallback"):
+            continue  # Fallback personas only answer when nobody else is confident
+        agent = _load_agent(name, config or {})
+        if agent is not None:
+            loaded.append((name, config or {}, agent))
+
+    # Triggers join the shared intent table (no rebuild unless they changed);
+    # personas without triggers always run
+    register_intents("persona", [(name, getattr(agent, "TRIGGERS", ())) for name, _, agent in loaded])
+    triggered = set(matching_intents("persona", command))
+
+    eligible = []
+    for name, config, agent in loaded:
+        if name in triggered or not getattr(agent, "TRIGGERS", ()):
+            timeout = config.get("timeout", getattr(agent, "TIMEOUT", DEFAULT_PERSONA_TIMEOUT))
+            eligible.append((name, agent, float(timeout)))
+    return eligible
+
+
+def _ask(name: str, agent, command: str, twin: dict):
+    started = time.perf_counter()
+    try:
+        answer = agent.respond(command, twin)
+    finally:
+        PERSONA_SECONDS.labels(persona=name).observe(time.perf_counter() - started)
+    return answer
+
+
+def _fallback(command: str, twin: dict, personas: Dict[str, dict]) -> Optional[Tuple[str, str]]:
+    for name, config in personas.items():
+        if (config or {}).get("fallback"):
+            agent = _load_agent(name, config)
+            if agent is None:
+                continue
+            try:
+                answer = _ask(name, agent, command, twin)
+            except Exception as e:
+                logger.error(f"Fallback persona '{name}' failed: {e}")
+                continue
+            if answer:
+                PERSONA_RESULTS.labels(persona=name, outcome="fallback").inc()
+                return name, answer[0]
+    return None
+
+
+def _cache_ttl(names: List[str], personas: Dict[str, dict]) -> Optional[float]:
+    """Shortest declared CACHE_TTL of the answering personas (None if any lacks one)."""
+    ttls = []
+    for name in names:
+        config = personas.get(name) or {}
+        ttl = config.get("cache_ttl", getattr(_load_agent(name, config), "CACHE_TTL", None))
+        if not ttl:
+            return None
+        ttls.append(float(ttl))
+    return min(ttls) if ttls else None
+
+
+def fan_out(command: str, twin: dict) -> List[Tuple[str, str, float]]:
+    """
+    Ask eligible personas concurrently.
+
+    Returns (persona, text, confidence) for confident answers, in manifest
+    order for "merge", or the single first confident answer otherwise.
+    """
+    personas = twin.get('personas') or {}
+    routing = twin.get('routing') or {}
+    strategy = routing.get('strategy', DEFAULT_STRATEGY)
+    threshold = float(routing.get('confidence', DEFAULT_CONFIDENCE))
+
+    eligible = _eligible(command, personas)
+    if not eligible:
+        return []
+
+    executor = get_executor()
+    started = time.monotonic()
+    pending = {}
+    for order, (name, agent, timeout) in enumerate(eligible):
+        future = executor.submit(_ask, name, agent, command, twin)
+        pending[future] = (order, name, started + timeout)
+
+    answers = []
+    while pending:
+        now = time.monotonic()
+        for future, (_, name, deadline) in list(pending.items()):
+            if deadline <= now and not future.done():
+                # Cannot stop the thread; just stop waiting for it
+                PERSONA_RESULTS.labels(persona=name, outcome="timeout").inc()
+                del pending[future]
+        if not pending:
+            break
+        next_deadline = min(deadline for _, _, deadline in pending.values())
+        done, _ = wait(pending, timeout=max(0.0, next_deadline - now), return_when=FIRST_COMPLETED)
+        for future in done:
+            order, name, _ = pending.pop(future)
+            try:
+                answer = future.result()
+            except Exception as e:
+                logger.error(f"Persona '{name}' failed: {e}")
+                PERSONA_RESULTS.labels(persona=name, outcome="error").inc()
+                continue
+            if not answer or answer[1] < threshold:
+                PERSONA_RESULTS.labels(persona=name, outcome="declined").inc()
+                continue
+            PERSONA_RESULTS.labels(persona=name, outcome="answered").inc()
+            answers.append((order, name, answer[0], answer[1]))
+            if strategy != "merge":
+                return [(name, answer[0], answer[1])]
+
+    answers.sort()
+    return [(name, text, confidence) for _, name, text, confidence in answers]
+
+
+@ROUTE_SECONDS.labels(router="core").time()
+def route_command(command, twin, conversation=None):
+    global _cached_personas
+    if conversation is not None:
+        twin = {**twin, 'conversation': conversation}
+    personas = twin.get('personas') or {}
+    if personas is not _cached_personas:
+        # New or reloaded manifest: answers from the old personas are stale
+        RESPONSE_CACHE.invalidate()
+        _cached_personas = personas
+    key = (twin.get('id'), normalize_utterance(command))
+    cached = RESPONSE_CACHE.get(key)
+    if cached is not MISSING:
+        return cached
+
+    answers = fan_out(command, twin)
+    if len(answers) == 1:
+        response = answers[0][1]
+    elif answers:
+        response = "\n".join(f"[{name}] {text}" for name, text, _ in answers)
+    else:
+        fallback = _fallback(command, twin, personas)
+        if fallback is None:
+            return f"I heard you, but I don't yet know how to handle: '{command}'"
+        answers = [(fallback[0], fallback[1], 0.0)]
+        response = fallback[1]
+
+    RESPONSE_CACHE.put(key, response, _cache_ttl([name for name, _, _ in answers], personas))
+    return response
@@ -0,0 +1,206 @@
+# profiling.py - `command_interface.py --profile` support
+#
+# Breaks one invocation into phases (index load, route resolution, module
+# import, run) with wall and CPU time, reports a per-module import breakdown
+# in the style of `python -X importtime`, and can write a cProfile `.prof`
+# file plus a collapsed-stack text file (one "frame;frame;frame count" line
+# per stack, the format flamegraph tools read) for the run phase.
+
+import cProfile
+import importlib
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Any, List, Optional, Tuple
+
+from core import command_registry
+
+SAMPLE_INTERVAL = 0.001  # Seconds between stack samples
+
+
+class _Phase:
+    __slots__ = ("name", "wall", "cpu")
+
+    def __init__(self, name: str, wall: float, cpu: float):
+        self.name = name
+        self.wall = wall
+        self.cpu = cpu
+
+
+class ImportTimer:
+    """Times every module executed while active (self and cumulative)."""
+
+    def __init__(self):
+        # (module, depth, self_seconds, cumulative_seconds) in completion order
+        self.records: List[Tuple[str, int, float, float]] = []
+        self._stack: List[list] = []
+        self._finder = _TimingFinder(self)
+
+    def __enter__(self):
+        sys.meta_path.insert(0, self._finder)
+        return self
+
+    def __exit__(self, *exc):
+        try:
+            sys.meta_path.remove(self._finder)
+        except ValueError:
+            pass
+
+    def _start(self, name: str):
+        self._stack.append([name, time.perf_counter(), 0.0])
+
+    def _stop(self):
+        name, started, children = self._stack.pop()
+        cumulative = time.perf_counter() - started
+        if self._stack:
+            self._stack[-1][2] += cumulative
+        self.records.append((name, len(self._stack), cumulative - children, cumulative))
+
+
+class _TimingFinder:
+    """Meta path hook that wraps the real loader of each found module."""
+
+    def __init__(self, timer: ImportTimer):
+        self._timer = timer
+
+    def find_spec(self, fullname, path, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is None:
+                continue
+            if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+                spec.loader = _TimingLoader(spec.loader, self._timer)
+            return spec
+        return None
+
+
+class _TimingLoader:
+    def __init__(self, loader, timer: ImportTimer):
+        self._loader = loader
+        self._timer = timer
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        self._timer._start(module.__name__)
+        try:
+            self._loader.exec_module(module)
+        finally:
+            self._timer._stop()
+
+    def __getattr__(self, attr):
+        return getattr(self._loader, attr)
+
+
+class StackSampler:
+    """Samples one thread's Python stack at a fixed interval into collapsed stacks."""
+
+    def __init__(self, thread_id: int, interval: float = SAMPLE_INTERVAL):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="glenn-stack-sampler", daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            names = []
+            while frame is not None:
+                code = frame.f_code
+                names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if names:
+                self.stacks[";".join(reversed(names))] += 1
+
+    def write(self, path: str):
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+def _measure(name: str, phases: List[_Phase], fn, *args):
+    wall, cpu = time.perf_counter(), time.process_time()
+    try:
+        return fn(*args)
+    finally:
+        phases.append(_Phase(name, time.perf_counter() - wall, time.process_time() - cpu))
+
+
+def profile_command(name: str, raw_params, out_dir: Optional[str] = None) -> Any:
+    """
+    Resolve, import and run one command with timing instrumentation.
+
+    The command runs synchronously on the calling thread (no runner deadline)
+    so cProfile and the stack sampler see the real work.
+    """
+    phases: List[_Phase] = []
+    # What every invocation pays: stat the commands and read the cached index
+    _measure("index load", phases, command_registry.reload_routes)
+    route = _measure("route resolution", phases, command_registry.resolve_command, name)
+    params = command_registry.parse_kv_pairs(raw_params)
+
+    timer = ImportTimer()
+    with timer:
+        _measure("module import", phases, importlib.import_module, command_registry.COMMAND_ROUTES[route])
+
+    profiler = cProfile.Profile()
+    sampler = StackSampler(threading.get_ident())
+    error: Optional[BaseException] = None
+    result = None
+    wall, cpu = time.perf_counter(), time.process_time()
+    with sampler:
+        profiler.enable()
+        try:
+            result = command_registry.invoke_command(route, params)
+        except Exception as e:
+            error = e
+        finally:
+            profiler.disable()
+    phases.append(_Phase("run()", time.perf_counter() - wall, time.process_time() - cpu))
+
+    if result is not None:
+        print(result)
+    _print_report(route, phases, timer)
+    if out_dir:
+        _write_dumps(route, profiler, sampler, out_dir)
+    if error is not None:
+        raise error
+    return result
+
+
+def _print_report(route: str, phases: List[_Phase], timer: ImportTimer):
+    print(f"\n[profile] {route}")
+    print(f"  {'phase':<18} {'wall ms':>10} {'cpu ms':>10}")
+    for phase in phases:
+        print(f"  {phase.name:<18} {phase.wall * 1000:>10.3f} {phase.cpu * 1000:>10.3f}")
+    total = sum(p.wall for p in phases)
+    print(f"  {'total':<18} {total * 1000:>10.3f}")
+
+    if timer.records:
+        print("\n[profile] imports (self us | cumulative us | module)")
+        for module, depth, self_s, cumulative in timer.records:
+            print(f"  {self_s * 1e6:>10.0f} | {cumulative * 1e6:>10.0f} | {'  ' * depth}{module}")
+    else:
+        print("\n[profile] imports: module already loaded")
+
+
+def _write_dumps(route: str, profiler: cProfile.Profile, sampler: StackSampler, out_dir: str):
+    os.makedirs(out_dir, exist_ok=True)
+    stem = os.path.join(out_dir, f"{route}-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}")
+    profiler.dump_stats(f"{stem}.prof")
+    sampler.write(f"{stem}.collapsed.txt")
+    print(f"\n[profile] wrote {stem}.prof and {stem}.collapsed.txt")
@@ -0,0 +1,119 @@
+# response_cache.py - LRU + TTL cache for routed responses
+#
+# Spoken requests repeat a lot ("status", "who are you"), and each repeat
+# re-runs routing and the handler (often a JSON load). Routers look the
+# normalized utterance up here first; handlers opt in by declaring how long
+# their answer stays valid (persona agents: CACHE_TTL = seconds; voice
+# handlers: register_handler(..., cache_ttl=seconds)). Answers that quote
+# the raw input or change every call simply do not declare a TTL.
+
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+from core import metrics
+
+DEFAULT_MAX_ENTRIES = 256
+
+MISSING = object()  # get() result for absent or expired keys
+
+# Words that carry no meaning for routing
+FILLER_WORDS = frozenset({"um", "uh", "uhm", "erm", "er", "ah", "hmm", "please", "okay", "ok",
+                          "so", "well", "hey", "just", "kindly"})
+
+_SENTENCE_PUNCTUATION = re.compile(r"[.,!?;:]+(?=\s|$)|[\"“”‘’`]")
+
+CACHE_RESULTS = metrics.counter("glenn_response_cache_total", "Response cache lookups and evictions",
+                                ["cache", "result"])
+
+
+def normalize_utterance(text: str) -> str:
+    """
+    Canonical form of an utterance for cache keys.
+
+    Lowercases, drops sentence punctuation (but keeps "1.5" and "6*7"
+    intact), removes filler words and collapses whitespace.
+    """
+    text = _SENTENCE_PUNCTUATION.sub(" ", text.lower())
+    return " ".join(word for word in text.split() if word not in FILLER_WORDS)
+
+
+class ResponseCache:
+    """Thread-safe LRU cache whose entries expire after a per-entry TTL."""
+
+    def __init__(self, name: str, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.name = name
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()  # key -> (value, expires_at)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._hit = CACHE_RESULTS.labels(cache=name, result="hit")
+        self._miss = CACHE_RESULTS.labels(cache=name, result="miss")
+        self._evict = CACHE_RESULTS.labels(cache=name, result="eviction")
+
+    def get(self, key: Hashable) -> Any:
+        """Cached value for `key`, or MISSING."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[1] > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    self._hit.inc()
+                    return entry[0]
+                del self._entries[key]
+                self.expirations += 1
+            self.misses += 1
+        self._miss.inc()
+        return MISSING
+
+    def put(self, key: Hashable, value: Any, ttl: Optional[float]):
+        """Store `value` for `ttl` seconds (no-op when ttl is falsy)."""
+        if not ttl or ttl <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+                self._evict.inc()
+
+    def invalidate(self, key: Hashable = MISSING):
+        """Drop one key, or everything when called without a key."""
+        with self._lock:
+            if key is MISSING:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def invalidate_where(self, predicate: Callable[[Hashable], bool]) -> int:
+        """Drop every key for which `predicate(key)` is true; returns how many."""
+        with self._lock:
+            stale = [key for key in self._entries if predicate(key)]
+            for key in stale:
+                del self._entries[key]
+        return len(stale)
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current size."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "name": self.name,
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,69 @@
+# stdio.py - per-thread stdout/stderr redirection
+#
+# contextlib.redirect_stdout swaps sys.stdout for the whole process, which
+# breaks as soon as two commands run at the same time (daemon clients, batch
+# workers). install() replaces sys.stdout/sys.stderr once with proxies that
+# forward to a per-thread target, falling back to the real stream. Targets
+# are context variables, so asyncio tasks sharing one thread are isolated too.
+
+import sys
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional, TextIO, Tuple
+
+_targets = {
+    "stdout": ContextVar("glenn_stdout", default=None),
+    "stderr": ContextVar("glenn_stderr", default=None),
+}
+_install_lock = threading.Lock()
+
+
+class _ThreadLocalStream:
+    """File-like proxy writing to the current thread's target stream."""
+
+    def __init__(self, name: str, fallback: TextIO):
+        self._name = name
+        self._fallback = fallback
+
+    def _target(self) -> TextIO:
+        return _targets[self._name].get() or self._fallback
+
+    def write(self, text: str) -> int:
+        return self._target().write(text)
+
+    def flush(self):
+        self._target().flush()
+
+    def isatty(self) -> bool:
+        return False
+
+    def __getattr__(self, attr):
+        return getattr(self._target(), attr)
+
+
+def install():
+    """Install the thread-local proxies on sys.stdout/sys.stderr (idempotent)."""
+    with _install_lock:
+        if not isinstance(sys.stdout, _ThreadLocalStream):
+            sys.stdout = _ThreadLocalStream("stdout", sys.stdout)
+        if not isinstance(sys.stderr, _ThreadLocalStream):
+            sys.stderr = _ThreadLocalStream("stderr", sys.stderr)
+
+
+def current_output() -> Tuple[Optional[TextIO], Optional[TextIO]]:
+    """This thread's redirect targets (None when writing to the real streams)."""
+    return _targets["stdout"].get(), _targets["stderr"].get()
+
+
+@contextmanager
+def redirect_thread_output(stdout: TextIO, stderr: Optional[TextIO] = None):
+    """Send this thread's prints to `stdout` (and `stderr`) for the duration of the block."""
+    install()
+    out_token = _targets["stdout"].set(stdout)
+    err_token = _targets["stderr"].set(stderr or stdout)
+    try:
+        yield stdout
+    finally:
+        _targets["stderr"].reset(err_token)
+        _targets["stdout"].reset(out_token)
@@ -1,7 +1,18 @@
+from pathlib import Path
+
+from core.profile_cache import load_json
+
+MANIFEST_PATH = Path(__file__).parent.parent / "manifests" / "glenn_manifest.json"
+
 def load_twin(manifest):
     twin = {
         'id': manifest.get('twinID'),
         'personas': manifest.get('personas'),
-        'default': manifest.get('defaultPersona')
+        'default': manifest.get('defaultPersona'),
+        'routing': manifest.get('routing', {})
     }
     return twin
+
+def load_twin_manifest(path=MANIFEST_PATH):
+    # Parsed once; re-read only when the manifest file changes
+    return load_twin(load_json(path))
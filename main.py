@@ -1,37 +1,22 @@
-import json
-import sqlite3
 import sys
-from core.twin_loader import load_twin
+from core import interaction_log, metrics
+from core.conversation import Conversation, SpillWriter
+from core.twin_loader import load_twin_manifest
 from core.persona_router import route_command
 
 DB_PATH = 'glenn_memory.db'
 
 def log_interaction(user_input, persona, response):
-    try:
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-        
-        # Create table if it doesn't exist
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS memory_log (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
-                user_input TEXT,
-                persona TEXT,
-                response TEXT
-            )
-        """)
-        
-        cursor.execute("""
-            INSERT INTO memory_log (user_input, persona, response)
-            VALUES (?, ?, ?)
-        """, (user_input, persona, response))
-        conn.commit()
-        conn.close()
-    except Exception as e:
-        print(f"[MemoryLog ERROR] {e}")
+    interaction_log.log_interaction(DB_PATH, user_input, persona, response, source="main")
+
+def log_interactions(rows):
+    # Batched writer for the conversation spill: rows of (timestamp, user_input, persona, response)
+    interaction_log.log_interactions(DB_PATH, rows, source="main")
 
 def main():
+    # Serve the metrics (interaction log writes, routing) when GLENN_METRICS_PORT is set
+    metrics.start_from_env()
+
     # Check for voice activation command line argument
     if len(sys.argv) > 1 and sys.argv[1].lower() in ['voice', '--voice', '-v']:
         print("🎧 Activating voice mode...")
@@ -44,12 +29,12 @@ def main():
     
     # Regular text-based interface
     manifest_path = 'manifests/glenn_manifest.json'
+    # Recent turns for personas; written to memory_log in the background
+    conversation = Conversation("main", spill=SpillWriter(log_interactions))
     try:
-        with open(manifest_path, 'r') as f:
-            manifest = json.load(f)
+        twin = load_twin_manifest(manifest_path)
 
         print("Glenn.Ai is online. Type 'exit' to quit or 'voice' for voice mode.\n")
-        twin = load_twin(manifest)
         
         while True:
             command = input("[You]: ").strip()
@@ -69,14 +54,22 @@ def main():
                     print("❌ Voice system not available. Continuing in text mode...")
                     continue
             
-            response = route_command(command, twin)
+            # Manifest edits apply from the next command (a stat() unless it changed)
+            try:
+                twin = load_twin_manifest(manifest_path)
+            except (OSError, ValueError) as e:
+                print(f"[WARN] Manifest reload failed, keeping the previous one: {e}")
+            
+            response = route_command(command, twin, conversation)
             print(f"[Glenn]: {response}")
-            log_interaction(command, twin['default'], response)
+            conversation.add(command, twin['default'], response)
             
     except FileNotFoundError:
         print("[ERROR] Manifest file not found.")
     except Exception as e:
         print(f"[ERROR] {e}")
+    finally:
+        conversation.close()
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,12 @@
+"""
+🧪 Glenn.AI Test Configuration
+Makes the project root importable for the test modules
+"""
+
+import sys
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
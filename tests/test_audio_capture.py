@@ -0,0 +1,158 @@
+"""Shared microphone capture: ring buffer, readers and device sharing."""
+
+import functools
+import struct
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("speech_recognition")
+pytest.importorskip("pyttsx3")
+
+from voice import audio_capture  # noqa: E402
+from voice.audio_capture import AudioCapture, acquire_capture, frame_rms  # noqa: E402
+
+CHUNK = 4
+
+
+def _chunk(value):
+    return struct.pack(f"<{CHUNK}h", *([value] * CHUNK))
+
+
+class _FakeMicrophone:
+    """sr.Microphone stand-in whose stream yields numbered chunks, then silence."""
+
+    SAMPLE_RATE = 16000
+    SAMPLE_WIDTH = 2
+    CHUNK = CHUNK
+    opened = 0
+    fail_reads = 0
+
+    def __init__(self, device_index=None):
+        self.device_index = device_index
+        self.stream = self
+        self.count = 0
+
+    def __enter__(self):
+        _FakeMicrophone.opened += 1
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+    def read(self, frames):
+        if _FakeMicrophone.fail_reads:
+            _FakeMicrophone.fail_reads -= 1
+            raise OSError("Input overflowed")
+        time.sleep(0.001)
+        self.count += 1
+        return _chunk(self.count if self.count <= 20 else 0)
+
+
+@pytest.fixture
+def microphone(monkeypatch):
+    _FakeMicrophone.opened = 0
+    _FakeMicrophone.fail_reads = 0
+    monkeypatch.setattr(audio_capture.sr, "Microphone", _FakeMicrophone)
+    monkeypatch.setattr(audio_capture, "REOPEN_DELAY", 0.01)
+    return _FakeMicrophone
+
+
+def _wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.005)
+
+
+def test_frame_rms():
+    assert frame_rms(_chunk(300)) == 300.0
+    assert frame_rms(struct.pack("<2h", 3, -4) + b"\x01") == pytest.approx(3.5355, abs=1e-3)
+    assert frame_rms(b"") == 0.0
+
+
+def test_readers_see_every_chunk_in_order(microphone):
+    capture = AudioCapture()
+    capture.start()
+    try:
+        first, second = capture.source(), capture.source()
+        with first, second:
+            first.seek(0)
+            second.seek(0)
+            assert [first.stream.read(CHUNK) for _ in range(5)] == [_chunk(n) for n in range(1, 6)]
+            assert second.stream.read(CHUNK) == _chunk(1)  # Independent positions
+    finally:
+        capture.stop()
+    assert capture.read(capture.head) == (b"", capture.head)  # Stopped: no waiting
+
+
+def test_slow_reader_skips_to_oldest_buffered_chunk(microphone):
+    capture = AudioCapture(buffer_seconds=3 * CHUNK / 16000)
+    capture.start()
+    try:
+        _wait_for(lambda: capture.head > 10)
+        chunk, position = capture.read(0)
+        assert position > 1
+        assert chunk == _chunk(position if position <= 20 else 0)
+    finally:
+        capture.stop()
+
+
+def test_has_speech_since(microphone):
+    capture = AudioCapture()
+    capture.start()
+    try:
+        _wait_for(lambda: capture.head > 25)
+        assert capture.has_speech_since(0, energy_threshold=10)
+        assert not capture.has_speech_since(22, energy_threshold=10)
+    finally:
+        capture.stop()
+
+
+def test_device_errors_reopen_the_stream(microphone):
+    microphone.fail_reads = 2
+    capture = AudioCapture()
+    capture.start()
+    try:
+        chunk, _ = capture.read(0)
+        assert chunk == _chunk(1)
+        assert microphone.opened == 3
+    finally:
+        capture.stop()
+
+
+def test_acquire_shares_one_device(microphone, monkeypatch):
+    monkeypatch.setattr(audio_capture, "_captures", {})
+    first = acquire_capture()
+    second = acquire_capture()
+    assert first is second and microphone.opened == 1
+    first.release()
+    assert first.is_running
+    second.release()
+    assert not first.is_running
+    third = acquire_capture()
+    try:
+        assert third is not first
+    finally:
+        third.release()
+
+
+def test_calibrate_shares_one_calibrator(microphone, monkeypatch, tmp_path):
+    from voice import calibration
+
+    monkeypatch.setattr(calibration, "AmbientCalibrator",
+                        functools.partial(calibration.AmbientCalibrator, path=tmp_path / "voice_calibration.json"))
+    capture = AudioCapture()
+    capture.start()
+    recognizers = [type("Recognizer", (), {})() for _ in range(2)]
+    try:
+        threads = [threading.Thread(target=capture.calibrate, args=(r, 0.001)) for r in recognizers]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert recognizers[0].energy_threshold == recognizers[1].energy_threshold == capture.energy_threshold
+        assert not recognizers[0].dynamic_energy_threshold
+    finally:
+        capture.stop()
@@ -0,0 +1,114 @@
+"""Persisted, adaptive ambient-noise calibration."""
+
+import json
+import struct
+
+import pytest
+
+pytest.importorskip("speech_recognition")
+pytest.importorskip("pyttsx3")
+
+from voice import calibration  # noqa: E402
+from voice.calibration import AmbientCalibrator, load_threshold, save_threshold  # noqa: E402
+
+CHUNK = 160  # 10 ms at 16 kHz
+
+
+def _chunk(level):
+    return struct.pack(f"<{CHUNK}h", *([level] * CHUNK))
+
+
+class _FakeCapture:
+    """AudioCapture stand-in that serves scripted chunk levels, then stops."""
+
+    sample_rate = 16000
+    sample_width = 2
+    chunk_size = CHUNK
+    device_index = None
+    microphone = None  # Device name lookup falls back to "unknown"
+
+    def __init__(self, *runs):
+        self.chunks = [_chunk(level) for level, count in runs for _ in range(count)]
+        self.head = 0
+
+    def read(self, position):
+        if position >= len(self.chunks):
+            return b"", position
+        return self.chunks[position], position + 1
+
+
+class _Recognizer:
+    dynamic_energy_threshold = True
+    energy_threshold = 300
+
+
+@pytest.fixture
+def path(tmp_path):
+    return tmp_path / "voice_calibration.json"
+
+
+def test_threshold_round_trips_per_device(path):
+    assert load_threshold("default:mic", path) is None
+    save_threshold("default:mic", 123.45, path)
+    save_threshold("1:usb", 400, path)
+    assert load_threshold("default:mic", path) == 123.5
+    assert load_threshold("1:usb", path) == 400
+    assert json.loads(path.read_text())["devices"]["1:usb"]["updated"]
+
+
+def test_unreadable_file_is_ignored(path):
+    path.write_text("{not json")
+    assert load_threshold("default:mic", path) is None
+    save_threshold("default:mic", 200, path)  # Replaces the broken file
+    assert load_threshold("default:mic", path) == 200
+
+
+def test_first_start_measures_and_saves(path):
+    calibrator = AmbientCalibrator(_FakeCapture((100, 200)), path)
+    threshold = calibrator.start(duration=0.5)
+    calibrator.stop()
+    assert threshold == pytest.approx(100 * calibration.ENERGY_RATIO)
+    assert load_threshold(calibrator.key, path) == pytest.approx(threshold, abs=0.1)
+
+
+def test_saved_threshold_skips_measuring(path):
+    save_threshold("default:unknown", 900, path)
+    capture = _FakeCapture()  # No audio: measuring would fall back to the minimum
+    calibrator = AmbientCalibrator(capture, path)
+    recognizer = _Recognizer()
+    assert calibrator.start(duration=5.0) == 900
+    assert calibrator.attach(recognizer) == 900
+    calibrator.stop()
+    assert recognizer.energy_threshold == 900
+    assert recognizer.dynamic_energy_threshold is False
+
+
+def test_quiet_audio_lowers_the_threshold(path):
+    save_threshold("default:unknown", 900, path)
+    calibrator = AmbientCalibrator(_FakeCapture((100, 3000)), path)
+    recognizer = _Recognizer()
+    calibrator.start()
+    calibrator.attach(recognizer)
+    calibrator._thread.join(5.0)
+    assert calibrator.threshold == pytest.approx(100 * calibration.ENERGY_RATIO, rel=0.05)
+    assert recognizer.energy_threshold == calibrator.threshold
+    calibrator.stop()
+    assert load_threshold(calibrator.key, path) == pytest.approx(calibrator.threshold, abs=0.1)
+
+
+def test_speech_does_not_raise_the_threshold(path):
+    save_threshold("default:unknown", 300, path)
+    # Two seconds of speech well above the threshold
+    calibrator = AmbientCalibrator(_FakeCapture((5000, 200)), path)
+    calibrator.start()
+    calibrator._thread.join(5.0)
+    assert calibrator.threshold == 300
+
+
+def test_sustained_loudness_becomes_the_noise_floor(path, monkeypatch):
+    monkeypatch.setattr(calibration, "SUSTAINED_SECONDS", 1.0)
+    save_threshold("default:unknown", 300, path)
+    calibrator = AmbientCalibrator(_FakeCapture((1000, 3000)), path)
+    calibrator.start()
+    calibrator._thread.join(5.0)
+    assert calibrator.threshold > 1000
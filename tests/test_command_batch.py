@@ -0,0 +1,104 @@
+"""Batch mode: JSONL results, ordering and error reporting."""
+
+import io
+import json
+import sys
+import threading
+import time
+import types
+
+from core import command_batch
+
+
+def _run(lines, **kwargs):
+    out = io.StringIO()
+    code = command_batch.run_batch(lines, out=out, **kwargs)
+    return code, [json.loads(line) for line in out.getvalue().splitlines()]
+
+
+def test_unknown_command_error_is_not_double_quoted():
+    code, results = _run(["bogus"])
+    assert code == 1
+    assert results[0]["exit"] == 2
+    assert results[0]["error"].startswith("Unknown command 'bogus'")
+
+
+def test_key_error_from_command_is_plain_text():
+    assert command_batch._error_text(KeyError("missing 'x'")) == "missing 'x'"
+    assert command_batch._error_text(ValueError()) == "ValueError"
+
+
+def test_comments_and_blank_lines_are_skipped():
+    code, results = _run(["# comment", "", "bogus"])
+    assert [r["line"] for r in results] == [3]
+
+
+def _fake_route(monkeypatch, route, run, **info):
+    """Register an in-memory command module under `route`."""
+    from core import command_registry
+
+    module = types.ModuleType(f"_fake_{route}")
+    module.run = run
+    monkeypatch.setitem(sys.modules, module.__name__, module)
+    monkeypatch.setitem(command_registry.COMMAND_ROUTES, route, module.__name__)
+    monkeypatch.setitem(command_registry.COMMAND_INDEX, route, info)
+
+
+def test_barrier_waits_for_earlier_reads(monkeypatch):
+    events = []
+
+    def read(n):
+        time.sleep(0.05)
+        events.append(f"read {n}")
+
+    _fake_route(monkeypatch, "fake_read", read, side_effect_free=True)
+    _fake_route(monkeypatch, "fake_write", lambda: events.append("write"))
+    code, results = _run(["fake_read n=1", "fake_read n=2", "fake_write", "fake_read n=3"])
+    assert code == 0
+    assert [r["line"] for r in results] == [1, 2, 3, 4]
+    assert events.index("write") == 2
+    assert events[-1] == "read 3"
+
+
+def test_lines_after_a_timed_out_write_are_not_run(monkeypatch):
+    release = threading.Event()
+    writes = []
+
+    def slow_write():
+        release.wait(5)  # Ignores its cancel_event, like a blocking write
+        writes.append("slow")
+
+    _fake_route(monkeypatch, "fake_slow_write", slow_write)
+    _fake_route(monkeypatch, "fake_write", lambda: writes.append("next"))
+    monkeypatch.setattr(command_batch, "BARRIER_GRACE", 0.05)
+    try:
+        code, results = _run(["fake_slow_write", "fake_write"], timeout=0.1)
+    finally:
+        release.set()
+    assert code == 1
+    assert "timed out" in results[0]["error"]
+    assert results[1]["exit"] == 1
+    assert results[1]["error"].startswith("Not run: line 1 ('fake_slow_write')")
+    assert "next" not in writes
+
+
+def test_undeclared_timeout_means_no_deadline(monkeypatch):
+    from core.command_runner import route_timeout
+
+    _fake_route(monkeypatch, "fake_plain", lambda: None)
+    _fake_route(monkeypatch, "fake_limited", lambda: None, timeout=2)
+    assert route_timeout("fake_plain") is None
+    assert route_timeout("fake_limited") == 2.0
+
+
+def test_deadline_timer_is_cancelled_when_command_finishes(monkeypatch):
+    from core import command_runner
+
+    _fake_route(monkeypatch, "fake_quick", lambda: "ok")
+    runner = command_runner.CommandRunner()
+    handle = runner.submit("fake_quick", timeout=30)
+    assert handle.result(timeout=2) == "ok"
+    deadline = time.monotonic() + 2
+    while runner.loop._scheduled and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert not runner.loop._scheduled
@@ -0,0 +1,109 @@
+"""Daemon socket placement, ownership checks and the serve -> forward round trip."""
+
+import os
+
+import pytest
+
+from core import command_daemon
+
+pytestmark = pytest.mark.skipif(not hasattr(os, "getuid"), reason="POSIX permissions")
+
+
+def test_socket_lives_in_private_directory(tmp_path, monkeypatch):
+    monkeypatch.delenv(command_daemon.SOCKET_ENV, raising=False)
+    monkeypatch.setenv("XDG_RUNTIME_DIR", str(tmp_path))
+    path = command_daemon.socket_path()
+    directory = os.path.dirname(path)
+    assert directory == str(tmp_path / "glenn-ai")
+    assert os.stat(directory).st_mode & 0o777 == 0o700
+
+
+def test_shared_socket_directory_is_refused(tmp_path, monkeypatch):
+    monkeypatch.delenv(command_daemon.SOCKET_ENV, raising=False)
+    monkeypatch.setenv("XDG_RUNTIME_DIR", str(tmp_path))
+    os.mkdir(tmp_path / "glenn-ai", 0o755)
+    os.chmod(tmp_path / "glenn-ai", 0o755)
+    with pytest.raises(PermissionError):
+        command_daemon.socket_path()
+    assert command_daemon.forward(["status"]) is None  # Falls back to in-process
+
+
+def test_socket_owned_by_someone_else_is_not_used(tmp_path, monkeypatch):
+    path = tmp_path / "daemon.sock"
+    path.write_text("")
+    assert command_daemon._owned_by_us(str(path))
+    monkeypatch.setattr(command_daemon, "_uid", lambda: os.getuid() + 1)
+    assert command_daemon._connect(str(path)) is None
+
+
+@pytest.fixture
+def daemon(tmp_path):
+    """A real `command_interface.py --serve` process on a temporary socket."""
+    import subprocess
+    import sys
+    import time
+    from pathlib import Path
+
+    root = Path(__file__).parent.parent
+    path = str(tmp_path / "d.sock")
+    env = dict(os.environ, GLENN_DAEMON_SOCKET=path, PYTHONPATH=str(root))
+    process = subprocess.Popen([sys.executable, str(root / "command_interface.py"), "--serve"], cwd=tmp_path,
+                               env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + 30
+    while not command_daemon.forward_ping(path):
+        assert process.poll() is None, "daemon exited"
+        assert time.monotonic() < deadline, "daemon did not start"
+        time.sleep(0.05)
+    yield path, env
+    process.terminate()
+    process.wait(10)
+
+
+def _forward(argv, path):
+    import io
+
+    from core.stdio import redirect_thread_output
+
+    out = io.StringIO()
+    with redirect_thread_output(out):
+        code = command_daemon.forward(argv, path)
+    return code, out.getvalue()
+
+
+def test_forward_runs_the_command_in_the_daemon(daemon):
+    path, _ = daemon
+    code, output = _forward(["status"], path)
+    assert code == 0
+    assert "[status] System snapshot:" in output and "Status OK" in output
+
+    code, output = _forward(["no-such-command"], path)
+    assert code == 1
+    assert "Unknown command 'no-such-command'" in output
+
+
+def test_concurrent_requests_get_only_their_own_output(daemon):
+    from concurrent.futures import ThreadPoolExecutor
+
+    path, _ = daemon
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        results = list(pool.map(lambda argv: _forward(argv, path), [["status"], ["kunda"]] * 4))
+    for n, (code, output) in enumerate(results):
+        assert code == 0
+        if n % 2 == 0:
+            assert "Status OK" in output and "Kunda" not in output
+        else:
+            assert "Kunda AI Interface" in output and "Status OK" not in output
+
+
+def test_client_falls_back_when_no_daemon_is_running(tmp_path):
+    import subprocess
+    import sys
+    from pathlib import Path
+
+    root = Path(__file__).parent.parent
+    env = dict(os.environ, GLENN_DAEMON_SOCKET=str(tmp_path / "missing.sock"), PYTHONPATH=str(root))
+    assert command_daemon.forward(["status"], env["GLENN_DAEMON_SOCKET"]) is None
+    done = subprocess.run([sys.executable, str(root / "command_interface.py"), "status"],
+                          cwd=tmp_path, env=env, capture_output=True, text=True, timeout=60)
+    assert done.returncode == 0
+    assert "Status OK" in done.stdout
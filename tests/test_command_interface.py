@@ -0,0 +1,56 @@
+"""Command-line client: which invocations go to the daemon."""
+
+import pytest
+
+import command_interface
+
+
+@pytest.mark.parametrize("argv", [
+    ["--profile", "memory"],
+    ["--profile-out", "out", "memory"],
+    ["--profile-out=out", "memory"],
+    ["--batch", "-"],
+    ["--no-daemon", "memory"],
+])
+def test_local_only_options_never_reach_the_daemon(monkeypatch, argv):
+    from core import command_daemon
+
+    monkeypatch.setattr(command_daemon, "forward", lambda argv: pytest.fail("forwarded to daemon"))
+    monkeypatch.setattr(command_interface, "main", lambda argv: 0)
+    assert command_interface.client_main(argv) == 0
+
+
+def test_other_commands_are_forwarded(monkeypatch):
+    from core import command_daemon
+
+    forwarded = []
+    monkeypatch.setattr(command_daemon, "forward", lambda argv: forwarded.append(argv) or 0)
+    assert command_interface.client_main(["memory"]) == 0
+    assert forwarded == [["memory"]]
+
+
+def test_script_run_does_not_import_a_second_copy(tmp_path):
+    import subprocess
+    import sys
+    from pathlib import Path
+
+    root = Path(command_interface.__file__).parent
+    script = (
+        "import runpy, sys\n"
+        "sys.argv = ['command_interface.py', '--no-daemon', 'status']\n"
+        "try:\n"
+        f"    runpy.run_path({str(root / 'command_interface.py')!r}, run_name='__main__')\n"
+        "except SystemExit:\n"
+        "    pass\n"
+        "print('second copy' if 'command_interface' in sys.modules else 'single copy')\n"
+    )
+    done = subprocess.run([sys.executable, "-c", script], cwd=tmp_path, capture_output=True, text=True,
+                          timeout=60, env={"PYTHONPATH": str(root), "PATH": ""})
+    assert done.stdout.strip().splitlines()[-1] == "single copy", done.stderr
+
+
+def test_routing_tables_are_shared_with_core():
+    from core import command_registry
+
+    assert command_interface.COMMAND_ROUTES is command_registry.COMMAND_ROUTES
+    assert command_interface.resolve_command("status") == "status.report"
@@ -0,0 +1,91 @@
+"""Command discovery from source and the cached route index."""
+
+import json
+import os
+import textwrap
+
+from core import command_registry
+
+
+def _write(directory, name, source):
+    path = directory / name
+    path.write_text(textwrap.dedent(source), encoding="utf-8")
+    return path
+
+
+def test_inspect_reads_declarations_without_importing(tmp_path):
+    path = _write(tmp_path, "status.py", '''
+        """Module doc."""
+        raise RuntimeError("imported")
+
+        ROUTE = "status.report"
+        ALIASES = ("status", "st")
+        SIDE_EFFECT_FREE = True
+        TIMEOUT = 30
+
+        def run(verbose=False):
+            """Show the system status."""
+    ''')
+    info = command_registry.inspect_module(path)
+    assert info["route"] == "status.report"
+    assert info["module"] == "commands.status"
+    assert info["entry"] == "run"
+    assert info["signature"] == "run(verbose=False)"
+    assert info["summary"] == "Show the system status."
+    assert info["aliases"] == ["status", "st"]
+    assert info["side_effect_free"] is True
+    assert info["interactive"] is False
+    assert info["timeout"] == 30
+
+
+def test_route_defaults_to_module_and_entry(tmp_path):
+    path = _write(tmp_path, "memory.py", '''
+        def execute(args):
+            pass
+    ''')
+    info = command_registry.inspect_module(path)
+    assert info["route"] == "memory.execute"
+    assert info["timeout"] is None
+
+
+def test_modules_without_entry_point_or_broken_are_skipped(tmp_path):
+    assert command_registry.inspect_module(_write(tmp_path, "helper.py", "X = 1\n")) is None
+    assert command_registry.inspect_module(_write(tmp_path, "broken.py", "def run(:\n")) is None
+
+
+def test_build_index_keeps_first_route_and_alias(tmp_path):
+    _write(tmp_path, "a.py", 'ROUTE = "x"\nALIASES = ("go",)\ndef run(): pass\n')
+    _write(tmp_path, "b.py", 'ROUTE = "x"\ndef run(): pass\n')
+    _write(tmp_path, "c.py", 'ALIASES = ("go",)\ndef run(): pass\n')
+    _write(tmp_path, "_private.py", "def run(): pass\n")
+    index = command_registry.build_index(tmp_path)
+    assert sorted(index["commands"]) == ["c.run", "x"]
+    assert index["commands"]["x"]["module"].endswith(".a")
+    assert index["aliases"] == {"go": "x"}
+
+
+def test_load_index_is_cached_and_rebuilt_on_change(tmp_path):
+    commands_dir = tmp_path / "commands"
+    commands_dir.mkdir()
+    index_path = commands_dir / "__pycache__" / "command_index.json"
+    module = _write(commands_dir, "hello.py", "def run(): pass\n")
+
+    first = command_registry.load_index(commands_dir, index_path)
+    assert list(first["commands"]) == ["hello.run"]
+    assert json.loads(index_path.read_text())["fingerprint"] == first["fingerprint"]
+
+    # An unchanged directory is served from the cache file
+    cached = json.loads(index_path.read_text())
+    cached["commands"]["hello.run"]["summary"] = "from cache"
+    index_path.write_text(json.dumps(cached))
+    assert command_registry.load_index(commands_dir, index_path)["commands"]["hello.run"]["summary"] == "from cache"
+
+    # Editing a module changes its fingerprint
+    module.write_text('ROUTE = "hello"\ndef run(): pass\n')
+    st = module.stat()
+    os.utime(module, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+    assert list(command_registry.load_index(commands_dir, index_path)["commands"]) == ["hello"]
+
+    # So does adding one
+    _write(commands_dir, "bye.py", "def run(): pass\n")
+    assert sorted(command_registry.load_index(commands_dir, index_path)["commands"]) == ["bye.run", "hello"]
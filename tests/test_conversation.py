@@ -0,0 +1,125 @@
+"""Bounded conversation context and its background spill to the store."""
+
+import threading
+
+from core.conversation import Conversation, SpillWriter, Turn
+
+
+def test_oldest_turns_fall_out_past_max_turns():
+    conversation = Conversation(max_turns=3)
+    for n in range(5):
+        conversation.add(f"q{n}", "Echo", f"a{n}")
+    assert len(conversation) == 3
+    assert [turn.user_input for turn in conversation] == ["q2", "q3", "q4"]
+    assert conversation.chars == 12
+    assert conversation.last().response == "a4"
+
+
+def test_character_budget_keeps_newest_turn():
+    conversation = Conversation(max_turns=10, max_chars=10)
+    conversation.add("aaa", "Echo", "bbb")
+    conversation.add("ccc", "Echo", "ddd")
+    assert [turn.user_input for turn in conversation] == ["ccc"]
+    conversation.add("x" * 20, "Echo", "y")  # Over budget alone, but still kept
+    assert [turn.user_input for turn in conversation] == ["x" * 20]
+    assert conversation.chars == 21
+
+
+def test_recent_and_clear():
+    conversation = Conversation()
+    for n in range(3):
+        conversation.add(f"q{n}", "Echo", f"a{n}")
+    assert [turn.user_input for turn in conversation.recent(2)] == ["q1", "q2"]
+    assert conversation.recent(0) == []
+    conversation.clear()
+    assert len(conversation) == 0 and conversation.chars == 0 and conversation.last() is None
+
+
+def test_render_trims_oldest_first():
+    conversation = Conversation()
+    conversation.add("hello", "Echo", "hi")
+    conversation.add("how are you", "Kunda", "fine")
+    assert conversation.render() == "User: hello\nEcho: hi\nUser: how are you\nKunda: fine"
+    assert conversation.render(max_chars=30) == "User: how are you\nKunda: fine"
+
+
+def test_spill_writes_batches_in_order():
+    batches = []
+    spill = SpillWriter(batches.append, batch_size=2)
+    conversation = Conversation(max_turns=2, spill=spill)
+    for n in range(5):
+        conversation.add(f"q{n}", "Echo", f"a{n}")
+    assert conversation.close()
+    rows = [row for batch in batches for row in batch]
+    assert [row[1] for row in rows] == ["q0", "q1", "q2", "q3", "q4"]  # Spill keeps what the buffer drops
+    assert all(len(batch) <= 2 for batch in batches)
+    assert len(rows[0][0]) == len("YYYY-MM-DD HH:MM:SS")
+
+
+def test_spill_writes_inline_when_store_falls_behind():
+    release = threading.Event()
+    written = []
+
+    def slow_store(rows):
+        if threading.current_thread() is not threading.main_thread():
+            release.wait(5.0)  # Only the spill thread is stuck
+        written.extend(rows)
+
+    spill = SpillWriter(slow_store, max_pending=2, batch_size=1, submit_timeout=0.01)
+    results = [spill.submit(Turn(f"q{n}", "Echo", "a")) for n in range(10)]
+    assert all(results)
+    inline = list(written)
+    assert inline  # Overflow went straight to the store instead of being dropped
+    release.set()
+    assert spill.flush()
+    assert sorted(row[1] for row in written) == sorted(f"q{n}" for n in range(10))
+
+
+def test_spill_reports_failed_inline_writes():
+    release = threading.Event()
+
+    def broken_store(rows):
+        if threading.current_thread() is not threading.main_thread():
+            release.wait(5.0)
+        else:
+            raise OSError("disk full")
+
+    spill = SpillWriter(broken_store, max_pending=1, batch_size=1, submit_timeout=0.01)
+    results = [spill.submit(Turn(f"q{n}", "Echo", "a")) for n in range(4)]
+    assert results[0] is True and results[-1] is False
+    release.set()
+    assert spill.flush()
+
+
+def test_spill_errors_do_not_stop_the_writer():
+    calls = []
+
+    def flaky_store(rows):
+        calls.append(rows)
+        if len(calls) == 1:
+            raise OSError("database is locked")
+
+    spill = SpillWriter(flaky_store)
+    spill.submit(Turn("q0", "Echo", "a"))
+    assert spill.flush()
+    spill.submit(Turn("q1", "Echo", "a"))
+    assert spill.flush()
+    assert [rows[0][1] for rows in calls] == ["q0", "q1"]
+
+
+def test_echo_repeats_last_answer():
+    from agents import echo
+
+    conversation = Conversation()
+    conversation.add("what is 2 plus 2", "Spock", "4")
+    assert echo.respond("say that again", {"conversation": conversation}) == ("I said: 4", 1.0)
+
+
+def test_chat_routing_sees_the_conversation():
+    from commands import chat
+
+    twin = {"default": "Glenn"}
+    conversation = Conversation()
+    assert chat.route_command("hello", twin, conversation).startswith("Hello! I'm Glenn")
+    conversation.add("hello", "Glenn", "Hello!")
+    assert chat.route_command("hello", twin, conversation) == "Hello again! What else can I do for you?"
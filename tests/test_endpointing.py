@@ -0,0 +1,144 @@
+"""Endpointer: phrase boundaries from VAD frames and partial transcripts."""
+
+import time
+
+import pytest
+
+pytest.importorskip("speech_recognition")
+pytest.importorskip("pyttsx3")
+np = pytest.importorskip("numpy")
+
+from voice.endpointing import Endpointer  # noqa: E402
+from voice.vad import VoiceActivityDetector  # noqa: E402
+
+RATE = 16000
+THRESHOLD = 300
+
+
+def _voiced(seconds, pitch=150):
+    t = np.arange(int(RATE * seconds)) / RATE
+    return sum(np.sin(2 * np.pi * pitch * k * t) / k for k in range(1, 12)) * 2500
+
+
+def _quiet(seconds):
+    return np.random.default_rng(1).normal(0, 20, int(RATE * seconds))
+
+
+class _FakeSource:
+    """Entered-AudioSource stand-in that serves a fixed signal as fast as it is read."""
+
+    CHUNK = 1024
+    SAMPLE_RATE = RATE
+
+    def __init__(self, *parts):
+        self.pcm = np.concatenate(parts).astype(np.int16).tobytes()
+        self.stream = self
+        self.offset = 0
+
+    def read(self, frames):
+        size = frames * 2
+        chunk, self.offset = self.pcm[self.offset:self.offset + size], self.offset + size
+        return chunk
+
+
+def _endpointer():
+    return Endpointer(VoiceActivityDetector(RATE, 2), trailing_silence=0.5, intent_silence=0.2)
+
+
+def test_phrase_ends_after_trailing_silence():
+    source = _FakeSource(_quiet(0.5), _voiced(0.6), _quiet(2.0))
+    utterance = _endpointer().listen(source, THRESHOLD)
+    assert utterance.reason == "silence"
+    assert utterance.transcript is None
+    # Pre-roll + speech + the trailing silence, not the whole signal
+    assert len(utterance.frame_data) < source.offset < len(source.pcm)
+
+
+def test_no_speech_before_timeout():
+    assert _endpointer().listen(_FakeSource(_quiet(2.0)), THRESHOLD, timeout=1.0) is None
+
+
+def test_complete_partial_ends_the_phrase_early():
+    source = _FakeSource(_voiced(0.6), _quiet(2.0))
+
+    def transcribe(pcm):
+        return "what time is it"
+
+    utterance = _endpointer().listen(source, THRESHOLD, transcribe=transcribe, is_complete=lambda text: True)
+    assert utterance.reason in ("intent", "silence")
+    assert utterance.transcript == "what time is it"
+
+
+def test_slow_partial_does_not_hold_up_the_endpoint():
+    endpointer = _endpointer()
+    source = _FakeSource(_voiced(0.6), _quiet(2.0))
+
+    def slow_transcribe(pcm):
+        time.sleep(2.0)
+        return "too late"
+
+    started = time.monotonic()
+    utterance = endpointer.listen(source, THRESHOLD, transcribe=slow_transcribe, on_partial=lambda text: None)
+    assert time.monotonic() - started < 1.5
+    assert utterance.reason == "silence"
+    assert utterance.transcript is None  # Recognized from the audio instead
+    endpointer.close()
+
+
+def test_trailing_silence_adapts_to_the_speaker():
+    from voice import endpointing
+
+    endpointer = _endpointer()
+    for _ in range(5):  # Short, unbroken commands
+        endpointer.listen(_FakeSource(_voiced(0.6), _quiet(2.0)), THRESHOLD)
+    assert endpointer.trailing_silence < 0.5
+    assert endpointer.trailing_silence >= endpointing.MIN_SILENCE
+
+    lowered = endpointer.trailing_silence
+    for _ in range(5):  # A speaker who pauses between words
+        utterance = endpointer.listen(_FakeSource(_voiced(0.4), _quiet(0.3), _voiced(0.4), _quiet(2.0)), THRESHOLD)
+        assert utterance.reason == "silence"
+    assert endpointer.trailing_silence > lowered
+    assert endpointer.trailing_silence <= endpointing.MAX_SILENCE
+
+
+def test_phrase_time_limit():
+    utterance = _endpointer().listen(_FakeSource(_voiced(3.0), _quiet(1.0)), THRESHOLD, phrase_time_limit=1.0)
+    assert utterance.reason == "limit"
+    assert utterance.transcript is None
+
+
+def test_incomplete_partial_waits_for_trailing_silence():
+    partials = []
+    endpointer = _endpointer()
+    utterance = endpointer.listen(_FakeSource(_voiced(0.6), _quiet(2.0)), THRESHOLD,
+                                  transcribe=lambda pcm: "add a task", is_complete=lambda text: False,
+                                  on_partial=partials.append)
+    endpointer.close()
+    assert utterance.reason == "silence"
+    assert utterance.transcript == "add a task"  # Taken during the final pause, so not recognized again
+    assert partials == ["add a task"]
+
+
+class _FakeDecoder:
+    """Streaming decoder that 'hears' the command once enough audio arrived."""
+
+    def __init__(self):
+        self.received = 0
+
+    def accept(self, chunk):
+        self.received += len(chunk)
+        return "what time is it" if self.received > RATE else None
+
+    def finish(self):
+        return "what time is it"
+
+
+def test_streaming_decoder_ends_complete_commands_early():
+    partials = []
+    endpointer = Endpointer(VoiceActivityDetector(RATE, 2), trailing_silence=1.0, intent_silence=0.2)
+    utterance = endpointer.listen(_FakeSource(_voiced(0.6), _quiet(3.0)), THRESHOLD, decoder=_FakeDecoder(),
+                                  is_complete=lambda text: text == "what time is it", on_partial=partials.append)
+    assert utterance.reason == "intent"
+    assert utterance.transcript == "what time is it"
+    assert partials and set(partials) == {"what time is it"}
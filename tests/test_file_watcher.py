@@ -0,0 +1,98 @@
+"""Stat-polling file watcher used for hot reloads."""
+
+import os
+import threading
+
+from core.file_watcher import FileWatcher, file_signature
+
+
+def _touch(path, text):
+    path.write_text(text, encoding="utf-8")
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+
+def test_callback_runs_once_per_change(tmp_path):
+    path = tmp_path / "manifest.json"
+    path.write_text("{}", encoding="utf-8")
+    seen = []
+    watcher = FileWatcher()
+    watcher.watch(path, seen.append)
+    watcher.watch(path, seen.append)  # Same callback is not added twice
+
+    assert watcher.check() == 0
+    _touch(path, '{"a": 1}')
+    assert watcher.check() == 1
+    assert watcher.check() == 0
+    assert seen == [str(path)]
+
+
+def test_appearing_and_disappearing_files_count(tmp_path):
+    path = tmp_path / "later.json"
+    seen = []
+    watcher = FileWatcher()
+    watcher.watch(path, seen.append)
+    path.write_text("{}", encoding="utf-8")
+    assert watcher.check() == 1
+    path.unlink()
+    assert watcher.check() == 1
+    assert file_signature(str(path)) is None
+    assert len(seen) == 2
+
+
+def test_failing_callback_is_retried_on_next_save(tmp_path):
+    path = tmp_path / "manifest.json"
+    path.write_text("{}", encoding="utf-8")
+    calls = []
+
+    def reload(changed):
+        calls.append(changed)
+        if len(calls) == 1:
+            raise ValueError("half-saved file")
+
+    watcher = FileWatcher()
+    watcher.watch(path, reload)
+    _touch(path, "{")
+    assert watcher.check() == 1  # Logged, not raised
+    _touch(path, "{}")
+    watcher.check()
+    assert len(calls) == 2
+
+
+def test_interval_backs_off_and_snaps_back(tmp_path):
+    path = tmp_path / "manifest.json"
+    path.write_text("{}", encoding="utf-8")
+    watcher = FileWatcher(min_interval=0.1, max_interval=0.4, backoff=2.0)
+    watcher.watch(path, lambda changed: None)
+    for _ in range(5):
+        watcher.check()
+    assert watcher.interval == 0.4
+    _touch(path, '{"a": 1}')
+    watcher.check()
+    assert watcher.interval == 0.1
+
+
+def test_unwatch(tmp_path):
+    path = tmp_path / "manifest.json"
+    path.write_text("{}", encoding="utf-8")
+    watcher = FileWatcher()
+    watcher.watch(path, lambda changed: None)
+    watcher.unwatch(path)
+    _touch(path, '{"a": 1}')
+    assert watcher.check() == 0
+
+
+def test_background_thread_reports_changes(tmp_path):
+    path = tmp_path / "manifest.json"
+    path.write_text("{}", encoding="utf-8")
+    changed = threading.Event()
+    watcher = FileWatcher(min_interval=0.01, max_interval=0.05)
+    watcher.watch(path, lambda p: changed.set())
+    watcher.start()
+    try:
+        assert watcher.is_running
+        _touch(path, '{"a": 1}')
+        assert changed.wait(5.0)
+    finally:
+        watcher.stop()
+    assert not watcher.is_running
@@ -0,0 +1,56 @@
+"""Intent classification: one automaton, first-listed-wins, per-router views."""
+
+from core import intent_matcher
+from core.intent_matcher import IntentMatcher, classify_intent, matching_intents
+
+
+def _chained(table, text):
+    lowered = text.lower()
+    for name, keywords in table:
+        if any(word in lowered for word in keywords):
+            return name
+    return None
+
+
+def test_matches_the_any_chains_it_replaced():
+    table = [("task", ("task", "todo")), ("status", ("status", "how are you")),
+             ("greeting", ("hi", "hey")), ("overlap", ("ask", "atus"))]
+    matcher = IntentMatcher(table)
+    for text in ("Add a TODO", "how are you doing", "this is high", "what's the status of my task",
+                 "masks", "nothing here", ""):
+        assert matcher.classify(text) == _chained(table, text), text
+
+
+def test_first_listed_intent_wins_and_matches_lists_all():
+    matcher = IntentMatcher({"a": ["status"], "b": ["tat"], "c": ["zzz"]})
+    assert matcher.classify("STATUS") == "a"
+    assert matcher.matches("status") == ["a", "b"]
+    assert matcher.match_indexes("nothing") == []
+
+
+def test_keywords_found_through_failure_links():
+    matcher = IntentMatcher([("he", ["he"]), ("she", ["she"]), ("hers", ["hers"])])
+    assert matcher.matches("ushers") == ["he", "she", "hers"]
+
+
+def test_routers_share_one_table():
+    assert classify_intent("chat", "remind me to call mom") == "task"
+    assert classify_intent("voice", "stop listening please") == "exit"
+    assert classify_intent("chat", "stop listening please") is None
+    # Same keyword, different intent per router
+    assert classify_intent("chat", "what time is it") is None
+    assert classify_intent("voice", "what time is it") == "time"
+
+
+def test_register_intents_rebuilds_only_on_change(monkeypatch):
+    monkeypatch.setattr(intent_matcher, "INTENTS", list(intent_matcher.INTENTS))
+    monkeypatch.setattr(intent_matcher, "_shared", None)
+    before = intent_matcher.shared_matcher()
+    intent_matcher.register_intents("persona", [("Tasky", ("task",))])
+    after = intent_matcher.shared_matcher()
+    assert after is not before
+    intent_matcher.register_intents("persona", [("Tasky", ("task",))])
+    assert intent_matcher.shared_matcher() is after
+    assert matching_intents("persona", "new task") == ["Tasky"]
+    intent_matcher.register_intents("persona", [("Tasky", ("todo",))])
+    assert matching_intents("persona", "new task") == []
@@ -0,0 +1,32 @@
+"""memory_log writers shared by main.py and the chat command."""
+
+import sqlite3
+
+import pytest
+
+from core import interaction_log
+
+
+def _rows(path):
+    with sqlite3.connect(path) as conn:
+        return conn.execute("SELECT timestamp, user_input, persona, response FROM memory_log ORDER BY id").fetchall()
+
+
+def test_single_and_batched_writes_share_one_table(tmp_path):
+    path = tmp_path / "memory.db"
+    assert interaction_log.log_interaction(path, "hi", "Echo", "Hello!", source="test")
+    interaction_log.log_interactions(path, [("2024-01-01 00:00:00", "q", "Spock", "a")], source="test")
+    rows = _rows(path)
+    assert [row[1:] for row in rows] == [("hi", "Echo", "Hello!"), ("q", "Spock", "a")]
+    assert rows[1][0] == "2024-01-01 00:00:00"
+
+
+def test_failures_are_counted_by_source(tmp_path):
+    errors = interaction_log.DB_WRITES.labels(source="test-missing", outcome="error")
+    before = errors.value
+    missing = tmp_path / "no" / "such" / "dir.db"
+    assert interaction_log.log_interaction(missing, "hi", "Echo", "Hello!", source="test-missing") is False
+    with pytest.raises(sqlite3.Error):
+        interaction_log.log_interactions(missing, [("2024-01-01 00:00:00", "q", "Spock", "a")], source="test-missing")
+    assert errors.value == before + 2
+
@@ -0,0 +1,98 @@
+"""Offline wake-word spotting: MFCC features, subsequence DTW and templates."""
+
+import pytest
+
+pytest.importorskip("speech_recognition")
+pytest.importorskip("pyttsx3")
+np = pytest.importorskip("numpy")
+
+from voice.keyword_spotter import KeywordSpotter, subsequence_dtw  # noqa: E402
+
+RATE = 16000
+GLENN = [300, 900, 700, 400]
+OTHER = [800, 300, 1200, 600]
+
+
+def _word(formants, seconds=0.6, tempo=1.0):
+    t = np.arange(int(RATE * seconds / tempo)) / RATE
+    track = np.interp(np.linspace(0, 1, len(t)), np.linspace(0, 1, len(formants)), formants)
+    signal = np.sin(2 * np.pi * np.cumsum(track) / RATE) + 0.5 * np.sin(4 * np.pi * np.cumsum(track) / RATE)
+    return (signal * np.hanning(len(t)) * 8000).astype(np.int16)
+
+
+def _noisy(signal, seed=3):
+    return (signal + np.random.default_rng(seed).normal(0, 150, len(signal))).astype(np.int16)
+
+
+@pytest.fixture(scope="module")
+def spotter():
+    spotter = KeywordSpotter(RATE)
+    for tempo in (0.9, 1.0, 1.1):
+        spotter.enroll("glenn", _noisy(_word(GLENN, tempo=tempo)).tobytes())
+    return spotter
+
+
+def _stream(spotter, signal, chunk=2048, **kwargs):
+    spotter.reset()
+    silence = _noisy(np.zeros(RATE, dtype=np.int16), seed=5)
+    audio = np.concatenate((silence, _noisy(signal, seed=7), silence)).tobytes()
+    hits = []
+    for offset in range(0, len(audio), chunk):
+        hit = spotter.process(audio[offset:offset + chunk], **kwargs)
+        if hit:
+            hits.append(hit)
+    return hits
+
+
+def test_subsequence_dtw_finds_template_inside_stream():
+    rng = np.random.default_rng(1)
+    template = rng.normal(size=(8, 12))
+    stream = np.concatenate((rng.normal(size=(20, 12)), template, rng.normal(size=(20, 12))))
+    distance, end = subsequence_dtw(template, stream)
+    assert distance == pytest.approx(0.0, abs=1e-6)
+    assert end == 27
+
+
+def test_enrollment_derives_threshold(spotter):
+    assert spotter.keywords == ["glenn"]
+    assert len(spotter.templates["glenn"]) == 3
+    assert 0 < spotter.threshold < 5
+
+
+def test_detects_enrolled_word_at_another_tempo(spotter):
+    hits = _stream(spotter, _word(GLENN, tempo=0.85), energy_threshold=300)
+    assert [keyword for keyword, _ in hits] == ["glenn"]  # Once per utterance
+    assert hits[0][1] <= spotter.threshold
+
+
+def test_rejects_other_words(spotter):
+    assert _stream(spotter, _word(OTHER), energy_threshold=300) == []
+
+
+def test_silence_skips_matching(spotter):
+    spotter.reset()
+    silence = _noisy(np.zeros(RATE * 2, dtype=np.int16), seed=9).tobytes()
+    checked = []
+    for offset in range(0, len(silence), 2048):
+        spotter.last_check_seconds = 0.0
+        assert spotter.process(silence[offset:offset + 2048], energy_threshold=300) is None
+        checked.append(spotter.last_check_seconds > 0)
+    # Once a whole window has been quiet, no template is matched
+    assert any(checked) and not any(checked[len(checked) // 2:])
+
+
+def test_short_recording_is_refused():
+    with pytest.raises(ValueError):
+        KeywordSpotter(RATE).enroll("glenn", np.zeros(800, dtype=np.int16).tobytes())
+
+
+def test_templates_round_trip(spotter, tmp_path):
+    path = tmp_path / "wake_templates.npz"
+    spotter.save(path)
+    loaded = KeywordSpotter.load(RATE, path=path)
+    assert loaded.keywords == ["glenn"]
+    assert loaded.threshold == pytest.approx(spotter.threshold)
+    assert [keyword for keyword, _ in _stream(loaded, _word(GLENN), energy_threshold=300)] == ["glenn"]
+    # Templates from another sample rate cannot be matched
+    assert KeywordSpotter.load(8000, path=path) is None
+    assert KeywordSpotter.load(RATE, path=tmp_path / "missing.npz") is None
@@ -0,0 +1,96 @@
+"""Kunda context analysis: chunked streaming and streamed responses."""
+
+import pytest
+
+from commands import kunda
+
+LOG = "".join(
+    f"2024-01-01 {level.upper()} request {n} {'denied' if n % 7 == 0 else 'ok'}\n"
+    for n, level in enumerate(["info", "warning", "error", "debug", "critical"] * 40)
+)
+
+
+@pytest.fixture
+def log_file(tmp_path):
+    path = tmp_path / "app.log"
+    path.write_text(LOG + "last line without newline")
+    return path
+
+
+def _in_memory(path):
+    return kunda._analyze_bytes(path.read_bytes())
+
+
+@pytest.mark.parametrize("chunk_size", [1, 64, 1000, 10 ** 6])
+def test_streaming_matches_in_memory_analysis(log_file, chunk_size):
+    expected = _in_memory(log_file)
+    result = kunda.analyze_context_file(str(log_file), chunk_size=chunk_size, workers=2,
+                                        use_processes=False, progress=lambda done, total: None, verbose=False)
+    for key in ("bytes", "lines", "words", "levels", "keywords"):
+        assert result[key] == expected[key], key
+    assert result["chunks"] >= 1
+
+
+def test_worker_processes_give_the_same_answer(log_file):
+    expected = _in_memory(log_file)
+    result = kunda.analyze_context(str(log_file), stream=True, chunk_size=512, workers=2,
+                                   progress=lambda done, total: None, verbose=False)
+    assert result["levels"] == expected["levels"]
+    assert result["lines"] == expected["lines"]
+
+
+def test_chunks_end_on_line_boundaries(log_file):
+    data = log_file.read_bytes()
+    spans = list(kunda._iter_chunk_spans(str(log_file), len(data), 100))
+    assert spans[0][0] == 0 and spans[-1][1] == len(data)
+    for (_, end), (start, _) in zip(spans, spans[1:]):
+        assert end == start
+        assert data[end - 1:end] == b"\n"
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 64, 1000])
+def test_long_lines_are_split_and_counted_once(tmp_path, chunk_size):
+    path = tmp_path / "one-line.log"
+    path.write_text(LOG.replace("\n", " ") + "\n" + "x" * 5000 + " error\nend")
+    data = path.read_bytes()
+    spans = list(kunda._iter_chunk_spans(str(path), len(data), chunk_size))
+    assert len(spans) > 1
+    assert all(end - start <= chunk_size * kunda.MAX_SPAN_FACTOR for start, end in spans)
+
+    result = kunda.analyze_context_file(str(path), chunk_size=chunk_size, workers=2, use_processes=False,
+                                        progress=lambda done, total: None, verbose=False)
+    expected = _in_memory(path)
+    for key in ("bytes", "lines", "words", "levels", "keywords"):
+        assert result[key] == expected[key], key
+
+
+def test_progress_reaches_the_total(log_file):
+    reports = []
+    kunda.analyze_context_file(str(log_file), chunk_size=256, workers=2, use_processes=False,
+                               progress=lambda done, total: reports.append((done, total)), verbose=False)
+    assert reports[-1][0] == reports[-1][1] == log_file.stat().st_size
+    assert [done for done, _ in reports] == sorted(done for done, _ in reports)
+
+
+def test_empty_file(tmp_path):
+    path = tmp_path / "empty.log"
+    path.write_bytes(b"")
+    result = kunda.analyze_context_file(str(path), progress=lambda done, total: None, verbose=False)
+    assert result["bytes"] == 0 and result["chunks"] == 0
+
+
+def test_merge_is_associative():
+    a, b, c = (kunda._analyze_bytes(part) for part in (b"error one\n", b"warning\n", b"failed denied\n"))
+    merge = kunda._merge_results
+    assert merge(merge(a, b), c) == merge(a, merge(b, c))
+
+
+def test_query_response_is_streamed(log_file, monkeypatch):
+    monkeypatch.setattr(kunda, "ProcessPoolExecutor", None)  # Must not fork from the speaking thread
+    response = kunda.process_query(str(log_file))
+    assert not isinstance(response, str)
+    first = next(response)
+    assert first.startswith("Kunda")
+    text = first + "".join(response)
+    assert "The file has 201 lines," in text  # 200 full lines plus the unterminated last one
+    assert "Context analysis complete." in text
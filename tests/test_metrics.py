@@ -0,0 +1,109 @@
+"""Metrics registry, text exposition and the /metrics endpoint."""
+
+import threading
+import urllib.request
+
+import pytest
+
+from core import metrics
+
+
+@pytest.fixture
+def registry():
+    return metrics.MetricsRegistry()
+
+
+def test_counter_and_gauge_series(registry):
+    requests = registry.counter("glenn_test_requests_total", "Requests", ["route"])
+    requests.labels(route="status").inc()
+    requests.labels("status").inc(2)
+    requests.labels(route="memory").inc()
+    assert requests.labels(route="status").value == 3
+    with pytest.raises(ValueError):
+        requests.labels(route="status").inc(-1)
+    with pytest.raises(ValueError):
+        requests.labels(route="status", extra="x")
+
+    in_flight = registry.gauge("glenn_test_in_flight", "In flight")
+    in_flight.inc()
+    in_flight.inc()
+    in_flight.dec()
+    assert in_flight.labels().value == 1
+
+
+def test_registry_is_get_or_create(registry):
+    first = registry.counter("glenn_test_total", "Doc", ["a"])
+    assert registry.counter("glenn_test_total", "Doc", ["a"]) is first
+    with pytest.raises(ValueError):
+        registry.gauge("glenn_test_total", "Doc", ["a"])
+    with pytest.raises(ValueError):
+        registry.counter("glenn_test_total", "Doc", ["b"])
+
+
+def test_metric_base_is_abstract():
+    with pytest.raises(TypeError):
+        metrics._Metric("glenn_test_untyped", "Doc")
+
+
+def test_counter_is_thread_safe(registry):
+    hits = registry.counter("glenn_test_hits_total", "Hits")
+
+    def work():
+        for _ in range(10000):
+            hits.inc()
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert hits.labels().value == 80000
+
+
+def test_histogram_buckets_and_timer(registry):
+    latency = registry.histogram("glenn_test_seconds", "Latency", buckets=(0.1, 1.0))
+    latency.observe(0.05)
+    latency.observe(0.1)  # Bounds are inclusive
+    latency.observe(5.0)
+    with latency.time():
+        pass
+    text = registry.render()
+    assert 'glenn_test_seconds_bucket{le="0.1"} 3' in text
+    assert 'glenn_test_seconds_bucket{le="1.0"} 3' in text
+    assert 'glenn_test_seconds_bucket{le="+Inf"} 4' in text
+    assert "glenn_test_seconds_count 4" in text
+    assert latency.labels().count == 4
+
+
+def test_render_text_format(registry):
+    registry.counter("glenn_b_total", "Second", ["route"]).labels(route='say "hi"\n').inc()
+    registry.gauge("glenn_a", "First").set(2)
+    text = registry.render()
+    assert text.endswith("\n")
+    lines = text.splitlines()
+    assert lines[:3] == ["# HELP glenn_a First", "# TYPE glenn_a gauge", "glenn_a 2.0"]
+    assert "# TYPE glenn_b_total counter" in lines
+    assert 'glenn_b_total{route="say \\"hi\\"\\n"} 1.0' in lines
+
+
+def test_http_endpoint_serves_registry(registry, monkeypatch):
+    monkeypatch.setattr(metrics, "_server", None)
+    registry.counter("glenn_test_served_total", "Served").inc()
+    server = metrics.start_http_server(0, registry=registry)
+    try:
+        assert metrics.start_http_server(0, registry=registry) is server
+        port = server.server_address[1]
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics", timeout=5) as response:
+            assert response.headers["Content-Type"].startswith("text/plain")
+            assert "glenn_test_served_total 1.0" in response.read().decode("utf-8")
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_start_from_env_never_raises(monkeypatch):
+    monkeypatch.delenv(metrics.METRICS_PORT_ENV, raising=False)
+    assert metrics.start_from_env() is None
+    monkeypatch.setattr(metrics, "_server", None)
+    monkeypatch.setenv(metrics.METRICS_PORT_ENV, "not-a-port")
+    assert metrics.start_from_env() is None
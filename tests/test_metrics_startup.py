@@ -0,0 +1,26 @@
+"""Processes that record DB-write metrics also expose them."""
+
+import builtins
+
+from core import metrics
+
+
+def test_main_starts_metrics_endpoint(monkeypatch):
+    import main
+
+    started = []
+    monkeypatch.setattr(metrics, "start_from_env", lambda: started.append(True))
+    monkeypatch.setattr(main.sys, "argv", ["main.py"])
+    monkeypatch.setattr(builtins, "input", lambda prompt="": "exit")
+    main.main()
+    assert started
+
+
+def test_chat_starts_metrics_endpoint(monkeypatch):
+    from commands import chat
+
+    started = []
+    monkeypatch.setattr(metrics, "start_from_env", lambda: started.append(True))
+    monkeypatch.setattr(chat, "load_twin_config", lambda: None)
+    chat.execute()
+    assert started
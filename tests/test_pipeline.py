@@ -0,0 +1,182 @@
+"""Voice pipeline stages: concurrency, slow handlers, back-pressure and barge-in."""
+
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("speech_recognition")
+pytest.importorskip("pyttsx3")
+
+from voice import pipeline  # noqa: E402
+from voice.voice_commands import VoiceCommandHandler  # noqa: E402
+
+
+class _FakeAssistant:
+    """Just enough of GlennVoiceAssistant for the execute/speak/log stages."""
+
+    is_listening = False
+    unconfirmed = None
+
+    def __init__(self):
+        self.command_handler = VoiceCommandHandler()
+        self.spoken = []
+        self.logged = []
+        self.text_to_speech = type("TTS", (), {"stop": lambda self: self.stops.append(1), "stops": []})()
+        self.speech_to_text = type("STT", (), {"capture": None})()
+
+    def _execute_voice_command(self, command_text, speculation=None):
+        info = self.command_handler.parse_command(command_text)
+        return self.command_handler.execute_command(info)
+
+    def speak(self, text):
+        self.spoken.append(text)
+
+    def _observe_turnaround(self, speech_end):
+        pass
+
+    def _log_interaction(self, user_input, response):
+        self.logged.append((user_input, response))
+
+    def stop(self):
+        pass
+
+
+def _wait_for(condition, timeout=3.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+@pytest.fixture
+def voice_pipeline():
+    assistant = _FakeAssistant()
+    voice = pipeline.VoicePipeline(assistant, handler_timeout=0.2)
+    voice.start()
+    yield voice, assistant
+    voice.stop()
+
+
+def test_commands_run_concurrently(voice_pipeline):
+    voice, assistant = voice_pipeline
+    both = threading.Barrier(2, timeout=2)
+    assistant.command_handler.register_handler("status", lambda info: both.wait() is not None and "ok", speculative=True)
+    assistant.command_handler.register_handler("identity", lambda info: both.wait() is not None and "me",
+                                               speculative=True)
+    voice.execute_queue.put(("how are you", None, None))
+    voice.execute_queue.put(("who are you", None, None))
+    # Each handler only returns once the other one is running too
+    assert _wait_for(lambda: sorted(assistant.spoken) == ["me", "ok"])
+
+
+def test_slow_read_is_abandoned(voice_pipeline):
+    voice, assistant = voice_pipeline
+    assistant.command_handler.register_handler("status", lambda info: time.sleep(0.5) or "late", speculative=True)
+    voice.execute_queue.put(("how are you", None, None))
+    assert _wait_for(lambda: assistant.spoken == [pipeline.TOO_SLOW])
+    time.sleep(0.5)
+    assert "late" not in assistant.spoken
+
+
+def test_slow_write_is_never_abandoned(voice_pipeline):
+    voice, assistant = voice_pipeline
+    writes = []
+    assistant.command_handler.register_handler(
+        "add_task", lambda info: time.sleep(0.5) or writes.append(info["parameters"][0]) or "Added")
+    voice.execute_queue.put(("add a task buy milk", None, None))
+    assert _wait_for(lambda: assistant.spoken == [pipeline.STILL_WORKING, "Added"])
+    assert pipeline.TOO_SLOW not in assistant.spoken
+    assert writes == ["buy milk"]
+
+
+def test_fast_command_cancels_its_slow_timer(voice_pipeline):
+    voice, assistant = voice_pipeline
+    voice.execute_queue.put(("how are you", None, None))
+    assert _wait_for(lambda: len(assistant.spoken) == 1)
+    time.sleep(0.3)
+    assert pipeline.TOO_SLOW not in assistant.spoken
+
+
+def test_full_execute_queue_waits_instead_of_dropping():
+    voice = pipeline.VoicePipeline(_FakeAssistant(), queue_size=1)
+    voice._running = True  # Stages not started: nothing drains the queues
+    voice._put(voice.execute_queue, ("first", None, None), "execute")
+    putter = threading.Thread(target=voice._put, args=(voice.execute_queue, ("second", None, None), "execute"))
+    putter.start()
+    time.sleep(0.3)
+    assert putter.is_alive()  # Back-pressure on the caller
+    assert voice.execute_queue.get_nowait()[0] == "first"
+    putter.join(2.0)
+    assert voice.execute_queue.get_nowait()[0] == "second"
+    # Stopping releases a waiting stage
+    for _ in range(voice.log_queue.maxsize):
+        voice.log_queue.put_nowait(("x", None))
+    putter = threading.Thread(target=voice._put, args=(voice.log_queue, ("y", None), "log"))
+    putter.start()
+    voice._running = False
+    putter.join(2.0)
+    assert not putter.is_alive()
+
+
+def test_full_speak_queue_drops_its_oldest_item():
+    voice = pipeline.VoicePipeline(_FakeAssistant(), queue_size=1)
+    first = voice.say("first")
+    voice.say("second")
+    assert first.is_set()  # Dropped, so nobody waits on it
+    assert voice.speak_queue.get_nowait().response == "second"
+
+
+class _FakeCapture:
+    """AudioCapture stand-in replaying a recording, then stopped."""
+
+    sample_rate = 16000
+    sample_width = 2
+    head = 0
+    is_running = True
+
+    def __init__(self, pcm, chunk=1024):
+        self.chunks = [pcm[offset:offset + chunk] for offset in range(0, len(pcm), chunk)]
+
+    def read(self, position):
+        if position >= len(self.chunks):
+            return b"", position
+        return self.chunks[position], position + 1
+
+
+def _recording(voiced_seconds):
+    np = pytest.importorskip("numpy")
+    rate = _FakeCapture.sample_rate
+    quiet = np.random.default_rng(2).normal(0, 20, rate // 2)
+    t = np.arange(int(rate * voiced_seconds)) / rate
+    voiced = sum(np.sin(2 * np.pi * 150 * k * t) / k for k in range(1, 12)) * 2500
+    return np.clip(np.concatenate((quiet, voiced, quiet)), -32768, 32767).astype(np.int16).tobytes()
+
+
+def test_user_speech_cuts_the_response_off():
+    assistant = _FakeAssistant()
+    voice = pipeline.VoicePipeline(assistant)
+    voice._running = True
+    voice._speaking.set()
+    assert voice._watch_for_barge_in(_FakeCapture(_recording(0.5)), energy_threshold=600)
+    assert voice._cancel.is_set() and assistant.text_to_speech.stops
+
+
+def test_quiet_room_does_not_cut_the_response_off():
+    assistant = _FakeAssistant()
+    voice = pipeline.VoicePipeline(assistant)
+    voice._running = True
+    voice._speaking.set()
+    assert not voice._watch_for_barge_in(_FakeCapture(_recording(0.0)), energy_threshold=600)
+    assert not voice._cancel.is_set()
+
+
+def test_barge_in_runs_without_the_wake_word(voice_pipeline):
+    voice, assistant = voice_pipeline
+    recognizer = type("Recognizer", (), {"energy_threshold": 300})()
+    assistant.speech_to_text = type("STT", (), {"capture": _FakeCapture(_recording(1.0)), "recognizer": recognizer})()
+    spoken = threading.Event()
+    assistant.speak = lambda text: spoken.set() or voice._cancel.wait(3.0)
+    voice.say("a long answer")
+    assert spoken.wait(2.0)
+    assert _wait_for(lambda: assistant.text_to_speech.stops)
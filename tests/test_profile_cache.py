@@ -0,0 +1,92 @@
+"""Stat-validated JSON loading for manifests and twin profiles."""
+
+import json
+import os
+
+import pytest
+
+from core import profile_cache
+from core.profile_cache import ProfileCache, freeze, thaw
+
+
+def _write(path, data, bump_ns=0):
+    path.write_text(json.dumps(data), encoding="utf-8")
+    if bump_ns:
+        st = path.stat()
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + bump_ns))
+
+
+def test_parsed_once_while_file_is_unchanged(tmp_path, monkeypatch):
+    path = tmp_path / "manifest.json"
+    _write(path, {"twinID": "glenn"})
+    cache = ProfileCache()
+    first = cache.load(path)
+
+    monkeypatch.setattr(profile_cache.json, "load", lambda f: pytest.fail("parsed again"))
+    assert cache.load(str(path)) is first
+
+
+def test_reloaded_when_mtime_or_size_changes(tmp_path):
+    path = tmp_path / "manifest.json"
+    _write(path, {"defaultPersona": "glenn"})
+    cache = ProfileCache()
+    assert cache.load(path)["defaultPersona"] == "glenn"
+
+    _write(path, {"defaultPersona": "kunda"}, bump_ns=1_000_000_000)  # Same size
+    assert cache.load(path)["defaultPersona"] == "kunda"
+
+    _write(path, {"defaultPersona": "spock!"})
+    assert cache.load(path)["defaultPersona"] == "spock!"
+
+
+def test_invalidate_forces_a_reread(tmp_path):
+    path = tmp_path / "manifest.json"
+    _write(path, {"a": 1})
+    cache = ProfileCache()
+    first = cache.load(path)
+    cache.invalidate(path)
+    assert cache.load(path) is not first
+
+
+def test_values_are_read_only(tmp_path):
+    path = tmp_path / "manifest.json"
+    _write(path, {"personas": ["glenn"], "routing": {"default": "glenn"}})
+    data = ProfileCache().load(path)
+    with pytest.raises(TypeError):
+        data["routing"]["default"] = "kunda"
+    assert data["personas"] == ("glenn",)
+    assert thaw(data) == {"personas": ["glenn"], "routing": {"default": "glenn"}}
+    assert thaw(freeze([{"a": [1]}])) == [{"a": [1]}]
+
+
+def test_large_files_use_a_snapshot(tmp_path, monkeypatch):
+    path = tmp_path / "twin.json"
+    _write(path, {"memories": ["x" * 100] * 50})
+    ProfileCache(snapshot_min_bytes=1).load(path)
+    assert os.path.exists(profile_cache._snapshot_path(str(path)))
+
+    monkeypatch.setattr(profile_cache.json, "load", lambda f: pytest.fail("parsed again"))
+    assert len(ProfileCache(snapshot_min_bytes=1).load(path)["memories"]) == 50
+
+
+def test_stale_snapshot_is_ignored(tmp_path):
+    path = tmp_path / "twin.json"
+    _write(path, {"version": 1})
+    ProfileCache(snapshot_min_bytes=1).load(path)
+    _write(path, {"version": 2}, bump_ns=1_000_000_000)
+    assert ProfileCache(snapshot_min_bytes=1).load(path)["version"] == 2
+
+
+def test_missing_file_raises(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        ProfileCache().load(tmp_path / "missing.json")
+
+
+def test_twin_manifest_follows_file_changes(tmp_path):
+    from core.twin_loader import load_twin_manifest
+
+    path = tmp_path / "glenn_manifest.json"
+    _write(path, {"twinID": "glenn", "defaultPersona": "glenn"})
+    assert load_twin_manifest(path)["default"] == "glenn"
+    _write(path, {"twinID": "glenn", "defaultPersona": "kunda"}, bump_ns=1_000_000_000)
+    assert load_twin_manifest(path)["default"] == "kunda"
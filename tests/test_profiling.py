@@ -0,0 +1,64 @@
+"""--profile support: import timing, stack sampling and the phase report."""
+
+import sys
+import threading
+import time
+
+from core.profiling import ImportTimer, StackSampler, profile_command
+
+
+def test_import_timer_records_fresh_imports(tmp_path, monkeypatch):
+    (tmp_path / "glenn_profiled_outer.py").write_text("import glenn_profiled_inner\n")
+    (tmp_path / "glenn_profiled_inner.py").write_text("import time\ntime.sleep(0.02)\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    for name in ("glenn_profiled_outer", "glenn_profiled_inner"):
+        monkeypatch.delitem(sys.modules, name, raising=False)
+
+    with ImportTimer() as timer:
+        import glenn_profiled_outer  # noqa: F401
+
+    records = {module: (depth, self_s, cumulative) for module, depth, self_s, cumulative in timer.records}
+    assert records["glenn_profiled_inner"][0] == 1
+    assert records["glenn_profiled_outer"][0] == 0
+    assert records["glenn_profiled_inner"][2] >= 0.02
+    # The child's time is the parent's cumulative time, not its own
+    assert records["glenn_profiled_outer"][2] >= records["glenn_profiled_inner"][2]
+    assert records["glenn_profiled_outer"][1] < 0.02
+    assert timer._finder not in sys.meta_path
+
+
+def test_import_timer_ignores_cached_modules():
+    with ImportTimer() as timer:
+        import json  # noqa: F401
+    assert timer.records == []
+
+
+def _busy_profiled_work(seconds):
+    until = time.perf_counter() + seconds
+    while time.perf_counter() < until:
+        pass
+
+
+def test_stack_sampler_collapses_the_sampled_thread(tmp_path):
+    with StackSampler(threading.get_ident(), interval=0.001) as sampler:
+        _busy_profiled_work(0.1)
+    assert sum(sampler.stacks.values()) > 5
+    hot = [stack for stack in sampler.stacks if "_busy_profiled_work (test_profiling.py:" in stack]
+    assert hot
+    assert hot[0].split(";")[-1].startswith("_busy_profiled_work")  # Leaf frame last
+
+    path = tmp_path / "out.collapsed.txt"
+    sampler.write(str(path))
+    lines = path.read_text().splitlines()
+    assert lines and all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
+    assert any("_busy_profiled_work" in line for line in lines)
+
+
+def test_profile_command_reports_every_phase(tmp_path, capsys):
+    profile_command("status", [], out_dir=str(tmp_path))
+    report = capsys.readouterr().out
+    for phase in ("index load", "route resolution", "module import", "run()", "total"):
+        assert f"  {phase}" in report
+    index_load = next(line for line in report.splitlines() if line.strip().startswith("index load"))
+    assert float(index_load.split()[2]) > 0  # Measured now, not copied from an earlier import
+    assert sorted(p.suffix for p in tmp_path.iterdir()) == [".prof", ".txt"]
@@ -0,0 +1,44 @@
+"""Response cache: normalization, LRU order, TTL expiry and invalidation."""
+
+import time
+
+from core.response_cache import MISSING, ResponseCache, normalize_utterance
+
+
+def test_normalize_utterance():
+    assert normalize_utterance("Um, what's the STATUS?") == "what's the status"
+    assert normalize_utterance("please compute 6*7, ok") == "compute 6*7"
+    assert normalize_utterance("version 1.5.") == "version 1.5"
+
+
+def test_ttl_expiry_and_falsy_ttl():
+    cache = ResponseCache("test")
+    cache.put("a", 1, 0.05)
+    cache.put("b", 2, 0)
+    assert cache.get("a") == 1
+    assert cache.get("b") is MISSING
+    time.sleep(0.06)
+    assert cache.get("a") is MISSING
+    assert cache.stats()["expirations"] == 1
+
+
+def test_lru_eviction_keeps_recently_used():
+    cache = ResponseCache("test", max_entries=2)
+    cache.put("a", 1, 60)
+    cache.put("b", 2, 60)
+    cache.get("a")
+    cache.put("c", 3, 60)
+    assert cache.get("b") is MISSING
+    assert cache.get("a") == 1
+    assert cache.stats()["evictions"] == 1
+
+
+def test_invalidate_where():
+    cache = ResponseCache("test")
+    cache.put(("list_tasks", ()), "old list", 60)
+    cache.put(("identity", ()), "Glenn", 60)
+    assert cache.invalidate_where(lambda key: key[0] == "list_tasks") == 1
+    assert cache.get(("list_tasks", ())) is MISSING
+    assert cache.get(("identity", ())) == "Glenn"
+    cache.invalidate()
+    assert len(cache) == 0
@@ -0,0 +1,44 @@
+"""Spock persona: arithmetic only when the command is really arithmetic."""
+
+import pytest
+
+from agents import spock
+
+
+@pytest.mark.parametrize("command, answer", [
+    ("what is 12 * 7", "12 * 7 = 84"),
+    ("calculate (2 + 3) * 4", "(2 + 3) * 4 = 20"),
+    ("what is 5 minus 2", "5 - 2 = 3"),
+    ("compute 10/4", "10/4 = 2.5"),
+    ("9 divided by 3", "9 / 3 = 3"),
+])
+def test_arithmetic_with_a_math_cue_is_confident(command, answer):
+    text, confidence = spock.respond(command, {})
+    assert text.endswith(answer)
+    assert confidence == 0.95
+
+
+@pytest.mark.parametrize("command", [
+    "call me at 555-1234",
+    "the meeting is on 2024-01-05",
+    "it's due 10/12",
+    "hand it over to 2 people",
+    "what's the weather",
+])
+def test_phone_numbers_dates_and_prose_are_not_arithmetic(command):
+    assert spock.respond(command, {}) is None
+
+
+def test_operator_words_are_replaced_only_as_whole_words():
+    text, _ = spock.respond("sometimes 3 times 4", {})
+    assert text.endswith("3 * 4 = 12")
+
+
+def test_no_cue_means_low_confidence():
+    _, confidence = spock.respond("what is 10 - 3", {})
+    assert confidence < 0.6
+
+
+def test_bare_punctuation_and_what_is_do_not_trigger():
+    for trigger in ("-", "/", "what is", "what's"):
+        assert trigger not in spock.TRIGGERS
@@ -0,0 +1,144 @@
+"""Speech backends: circuit breakers, failover and partial requests."""
+
+import threading
+import time
+import types
+
+import pytest
+
+sr = pytest.importorskip("speech_recognition")
+pytest.importorskip("pyttsx3")
+
+from voice import stt_backends  # noqa: E402
+from voice.stt_backends import BackendManager, CircuitBreaker  # noqa: E402
+
+
+@pytest.fixture
+def backends(monkeypatch):
+    """Register fake backends; returns a dict of name -> behaviour to set per test."""
+    behaviour = {}
+
+    def make(name):
+        def recognize(recognizer, audio):
+            return behaviour[name](audio)
+        return recognize
+
+    monkeypatch.setattr(stt_backends, "_REGISTRY", {})
+    hang_release.clear()
+    for name in ("fast", "backup"):
+        stt_backends.register_backend(name, make(name))
+    yield behaviour
+    hang_release.set()
+
+
+hang_release = threading.Event()
+
+
+def _hanging(audio):
+    hang_release.wait(10)
+    return "too late"
+
+
+def _manager(names=("fast", "backup"), **kwargs):
+    return BackendManager(types.SimpleNamespace(operation_timeout=None), list(names), **kwargs)
+
+
+def _failing(audio):
+    raise sr.RequestError("down")
+
+
+def test_recognize_one_skips_an_open_circuit(backends):
+    backends["fast"] = _failing
+    manager = _manager()
+    for _ in range(stt_backends.FAILURE_THRESHOLD):
+        assert manager.recognize_one("fast", b"") is None
+    assert manager.breakers["fast"].state == "open"
+    backends["fast"] = lambda audio: pytest.fail("called while its circuit is open")
+    assert manager.recognize_one("fast", b"") is None
+    manager.close()
+
+
+def test_breaker_opens_after_threshold_and_recovers_after_a_trial():
+    breaker = CircuitBreaker("test", failure_threshold=2, cooldown=0.05)
+    for _ in range(2):
+        assert breaker.allow()
+        breaker.release()
+        breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow()
+    time.sleep(0.06)
+    assert breaker.state == "half_open"
+    assert breaker.allow()
+    assert not breaker.allow()  # Only one trial at a time
+    breaker.release()
+    breaker.record_success()
+    assert breaker.state == "closed"
+
+
+def test_no_trial_while_earlier_requests_are_running():
+    breaker = CircuitBreaker("test", failure_threshold=1, cooldown=0.01)
+    assert breaker.allow()  # Still running when the circuit opens
+    breaker.record_failure()
+    time.sleep(0.02)
+    assert not breaker.allow()
+    breaker.release()
+    assert breaker.allow()
+
+
+def test_failover_on_error(backends):
+    backends["fast"] = _failing
+    backends["backup"] = lambda audio: "hello"
+    manager = _manager()
+    assert manager.recognize(b"") == "hello"
+    assert manager.last_backend == "backup"
+    assert manager.breakers["fast"].failures == 1
+    manager.close()
+
+
+def test_no_words_is_an_answer(backends):
+    def no_words(audio):
+        raise sr.UnknownValueError()
+
+    backends["fast"] = no_words
+    backends["backup"] = lambda audio: pytest.fail("no failover after an answer")
+    manager = _manager()
+    assert manager.recognize(b"") is None
+    assert manager.last_backend == "fast"
+    manager.close()
+
+
+def test_operation_timeout_defaults_to_request_timeout():
+    recognizer = types.SimpleNamespace(operation_timeout=None)
+    BackendManager(recognizer, ["google"], timeout=2.5).close()
+    assert recognizer.operation_timeout == 2.5
+    recognizer = types.SimpleNamespace(operation_timeout=1.0)
+    BackendManager(recognizer, ["google"], timeout=2.5).close()
+    assert recognizer.operation_timeout == 1.0
+
+
+def test_hanging_backend_does_not_take_down_the_other(backends):
+    backends["fast"] = _hanging
+    backends["backup"] = lambda audio: "backup text"
+    manager = _manager(timeout=0.1)
+    for breaker in manager.breakers.values():
+        breaker.cooldown = 0.05
+    results = []
+    for _ in range(12):
+        results.append(manager.recognize(b""))
+        time.sleep(0.03)
+    assert results == ["backup text"] * 12
+    assert manager.breakers["backup"].state == "closed"
+    assert manager.breakers["backup"].failures == 0
+    # Never more hung requests than the backend has workers
+    assert manager.breakers["fast"].in_flight <= stt_backends.WORKERS_PER_BACKEND
+    manager.close()
+
+
+def test_hedged_request_races_a_slow_backend(backends):
+    backends["fast"] = lambda audio: time.sleep(0.5) or "slow"
+    backends["backup"] = lambda audio: "quick"
+    manager = _manager(hedge_delay=0.05)
+    started = time.monotonic()
+    assert manager.recognize(b"") == "quick"
+    assert time.monotonic() - started < 0.4
+    manager.close()
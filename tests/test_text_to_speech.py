@@ -0,0 +1,55 @@
+"""Sentence streaming for spoken responses."""
+
+import threading
+
+import pytest
+
+pytest.importorskip("speech_recognition")
+pytest.importorskip("pyttsx3")
+
+from voice.text_to_speech import TextToSpeech, iter_sentences  # noqa: E402
+
+
+def test_sentences_are_emitted_as_soon_as_they_end():
+    seen = []
+
+    def fragments():
+        for word in "Hello there. How are you? ".split(" "):
+            seen.append(word)
+            yield word + " "
+
+    sentences = iter_sentences(fragments())
+    assert next(sentences) == "Hello there."
+    assert "you?" not in seen  # Second sentence not generated yet
+    assert list(sentences) == ["How are you?"]
+
+
+def test_abbreviations_do_not_end_a_sentence():
+    assert list(iter_sentences(["Ask Dr. Smith, e.g. today. ", "Done"])) == ["Ask Dr. Smith, e.g. today.", "Done"]
+
+
+def test_no_ends_a_sentence_unless_a_number_follows():
+    assert list(iter_sentences(["I said no. ", "Then I left."])) == ["I said no.", "Then I left."]
+    assert list(iter_sentences(["Room no. ", "5 is free. ", "Ok"])) == ["Room no. 5 is free.", "Ok"]
+    assert list(iter_sentences(["The answer is no. "])) == ["The answer is no."]
+
+
+def test_long_unpunctuated_text_is_flushed_at_a_word():
+    sentences = list(iter_sentences(["word " * 100], max_chars=50))
+    assert all(len(sentence) <= 50 for sentence in sentences)
+    assert " ".join(sentences).split() == ["word"] * 100
+
+
+def test_speak_stream_speaks_each_sentence_and_stops_on_cancel():
+    tts = TextToSpeech()
+    spoken = []
+    cancel = threading.Event()
+
+    def speak(text, blocking=True):
+        spoken.append(text)
+        cancel.set()  # Barge-in during the first sentence
+        return True
+
+    tts.speak = speak
+    assert tts.speak_stream(iter(["One. ", "Two. ", "Three."]), cancel=cancel) == "One."
+    assert spoken == ["One."]
@@ -0,0 +1,90 @@
+"""Voice activity detection: frame classification, smoothing and trimming."""
+
+import pytest
+
+sr = pytest.importorskip("speech_recognition")
+pytest.importorskip("pyttsx3")
+np = pytest.importorskip("numpy")
+
+from voice.vad import VoiceActivityDetector, smooth  # noqa: E402
+
+RATE = 16000
+THRESHOLD = 300.0
+
+
+def _t(seconds):
+    return np.arange(int(RATE * seconds)) / RATE
+
+
+def _voiced(seconds, pitch=150):
+    t = _t(seconds)
+    return sum(np.sin(2 * np.pi * pitch * k * t) / k for k in range(1, 12)) * 2500
+
+
+def _pcm(*parts):
+    return np.clip(np.concatenate(parts), -32768, 32767).astype(np.int16).tobytes()
+
+
+def _quiet(seconds):
+    return np.random.default_rng(2).normal(0, 20, int(RATE * seconds))
+
+
+def _speech_share(signal):
+    vad = VoiceActivityDetector(RATE)
+    return float(np.mean(vad.speech_frames(_pcm(signal), THRESHOLD)))
+
+
+def test_voice_passes():
+    assert _speech_share(_voiced(1.0)) > 0.9
+
+
+@pytest.mark.parametrize("noise", ["hiss", "hum", "quiet"])
+def test_noise_is_not_speech(noise):
+    rng = np.random.default_rng(4)
+    signal = {
+        "hiss": rng.normal(0, 900, RATE),
+        "hum": 1500 * np.sin(2 * np.pi * 50 * _t(1.0)),
+        "quiet": _quiet(1.0),
+    }[noise]
+    assert _speech_share(signal) < 0.05
+
+
+def test_smoothing_needs_onset_and_keeps_hangover():
+    smoothed, _, _ = smooth([True, False, True, True, True, False, False], onset=3, hangover=2)
+    assert smoothed == [False, False, False, False, True, True, False]
+    # A single click never opens a segment
+    assert not any(smooth([True, False] * 10, onset=3)[0])
+
+
+def test_streaming_carries_partial_frames():
+    vad = VoiceActivityDetector(RATE)
+    pcm = _pcm(_quiet(0.5), _voiced(0.5))
+    frames = [vad.speech_frames(pcm[offset:offset + 333], THRESHOLD) for offset in range(0, len(pcm), 333)]
+    assert sum(len(f) for f in frames) == len(pcm) // (vad.frame_length * 2)
+
+
+def test_is_speech_stays_open_through_short_pauses():
+    vad = VoiceActivityDetector(RATE)
+    chunk = 1024 * 2
+    pcm = _pcm(_quiet(0.5), _voiced(0.4), _quiet(0.1), _voiced(0.4), _quiet(1.0))
+    states = [vad.is_speech(pcm[offset:offset + chunk], THRESHOLD) for offset in range(0, len(pcm), chunk)]
+    assert not states[0] and not states[-1]
+    opened = states.index(True)
+    closed = len(states) - states[::-1].index(True)
+    assert all(states[opened:closed])  # The 100 ms gap between words is bridged
+
+
+def test_trim_cuts_to_padded_speech():
+    vad = VoiceActivityDetector(RATE)
+    audio = sr.AudioData(_pcm(_quiet(1.0), _voiced(0.5), _quiet(1.0)), RATE, 2)
+    trimmed = vad.trim(audio, THRESHOLD)
+    seconds = len(trimmed.frame_data) / (RATE * 2)
+    assert 0.5 <= seconds <= 1.0  # Speech plus hangover and padding, not the 2 s of quiet
+    assert trimmed.sample_rate == RATE
+
+
+def test_trim_drops_audio_without_speech():
+    vad = VoiceActivityDetector(RATE)
+    assert vad.trim(sr.AudioData(_pcm(_quiet(2.0)), RATE, 2), THRESHOLD) is None
+    # Too short to be worth a recognizer call
+    assert vad.speech_bounds(_pcm(_quiet(0.5), _voiced(0.04), _quiet(0.5)), THRESHOLD) is None
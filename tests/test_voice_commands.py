@@ -0,0 +1,180 @@
+"""Voice command parsing: literal prefilter and fuzzy fallback."""
+
+import pytest
+
+# Importing voice.* loads the whole voice package
+pytest.importorskip("speech_recognition")
+pytest.importorskip("pyttsx3")
+
+from voice.fuzzy_match import FuzzyMatcher, expand_literals, substring_distance  # noqa: E402
+from voice.voice_commands import (  # noqa: E402
+    VoiceCommandHandler, _PatternIndex, _pattern_literals, _required_literals, sre_parse)
+
+
+def _literals(pattern):
+    return _required_literals(sre_parse.parse(pattern))
+
+
+def test_required_literals():
+    assert _literals(r"what time is it") == {"what time is it"}
+    assert _literals(r"add (?:a )?task (.+)") == {"task "}  # Longest guaranteed run
+    assert _literals(r"(?:show|list) (?:my )?tasks") == {"tasks"}
+    assert _literals(r"(?:stop|exit) listening") == {" listening"}
+    assert _literals(r"(.+)") is None
+    assert _pattern_literals("(unbalanced", 0) is None
+
+
+def test_expand_literals():
+    assert expand_literals(r"(?:show|list) (?:my )?tasks") == (
+        ("show tasks", False), ("list tasks", False), ("show my tasks", False), ("list my tasks", False))
+    assert expand_literals(r"remind me to (.+)") == (("remind me to", True),)
+
+
+def test_substring_distance():
+    assert substring_distance("task", "add a tusk now", 1) == (1, 10)
+    assert substring_distance("task", "nothing", 1) == (2, -1)
+
+
+def test_parse_prefers_exact_patterns():
+    handler = VoiceCommandHandler()
+    info = handler.parse_command("Please add a task buy milk")
+    assert info["command"] == "add_task"
+    assert info["parameters"] == ["buy milk"]
+    assert info["confidence"] == 1.0
+
+
+def test_fuzzy_fallback_for_read_only_commands():
+    info = VoiceCommandHandler().parse_command("whats the tyme")
+    assert info["command"] == "time"
+    assert info["fuzzy"] is True
+    assert 0.75 <= info["confidence"] < 1.0
+
+
+def test_fuzzy_write_commands_match_with_lower_confidence():
+    handler = VoiceCommandHandler()
+    info = handler.parse_command("add a tusk buy milk")
+    assert info["command"] == "add_task"
+    assert info["parameters"] == ["buy milk"]
+    assert info["fuzzy"] is True
+    assert handler.write_fuzzy_threshold <= info["confidence"] < 1.0
+    assert handler.needs_confirmation(info)
+    assert handler.confirmation_prompt(info) == "Did you mean 'add a task buy milk'? Say yes to go ahead."
+    assert not handler.needs_confirmation(handler.parse_command("add a task buy milk"))
+    assert not handler.needs_confirmation(handler.parse_command("whats the tyme"))
+
+
+def test_fuzzy_write_commands_need_a_closer_match():
+    handler = VoiceCommandHandler()
+    handler.write_fuzzy_threshold = 0.95
+    assert handler.parse_command("add a tusk buy milk") is None
+    assert handler.parse_command("whats the tyme")["command"] == "time"
+
+
+def test_fuzzy_matcher_per_command_threshold():
+    import re
+
+    matcher = FuzzyMatcher([("exit", re.compile("goodbye")), ("help", re.compile("help me out"))])
+    assert matcher.match("good bye everyone")["command"] == "exit"
+    assert matcher.match("good bye everyone", threshold_for=lambda name: 0.9 if name == "exit" else 0.75) is None
+
+
+def test_assistant_runs_near_miss_writes_only_when_confirmed():
+    from voice.assistant import GlennVoiceAssistant
+
+    assistant = GlennVoiceAssistant()
+    added = []
+    assistant.command_handler.register_handler("add_task", lambda info: added.append(info["parameters"][0]) or "Added")
+    assert assistant._execute_voice_command("add a tusk buy milk").startswith("Did you mean")
+    assert assistant._execute_voice_command("yes please") == "Added"
+    assert added == ["buy milk"]
+    # Anything but a yes drops the question
+    assistant._execute_voice_command("add a tusk call mom")
+    assistant._execute_voice_command("what time is it")
+    assert assistant.unconfirmed is None
+    assistant._execute_voice_command("yes")
+    assert added == ["buy milk"]
+
+
+def test_side_effect_commands_invalidate_state_answers():
+    handler = VoiceCommandHandler()
+    tasks = ["buy milk"]
+    handler.register_handler("list_tasks", lambda info: ", ".join(tasks), cache_ttl=10.0, speculative=True)
+    handler.register_handler("add_task", lambda info: tasks.append(info["parameters"][0]) or "Added")
+    list_tasks = handler.parse_command("list my tasks")
+    assert handler.execute_command(list_tasks) == "buy milk"
+    handler.execute_command(handler.parse_command("add a task call mom"))
+    assert handler.execute_command(list_tasks) == "buy milk, call mom"
+
+
+def test_read_only_commands_keep_state_answers_cached():
+    handler = VoiceCommandHandler()
+    calls = []
+    handler.register_handler("list_tasks", lambda info: calls.append(1) or "none", cache_ttl=10.0, speculative=True)
+    list_tasks = handler.parse_command("list my tasks")
+    handler.execute_command(list_tasks)
+    handler.execute_command(handler.parse_command("what time is it"))
+    handler.execute_command(list_tasks)
+    assert len(calls) == 1
+
+
+def _linear_parse(handler, text):
+    for command_name, patterns in handler.command_patterns.items():
+        for pattern in patterns:
+            if pattern.search(text):
+                return command_name
+    return None
+
+
+@pytest.mark.parametrize("text", [
+    "what time is it", "remind me to check the memory status", "ask kunda about the logs",
+    "create a memory backup", "create a task water plants", "help me list commands",
+    "how's my memory", "nothing to see here",
+])
+def test_prefilter_keeps_registration_priority(text):
+    handler = VoiceCommandHandler()
+    for n in range(50):
+        handler.add_custom_command(f"custom_{n}", [rf"(?:start|run) job{n} (.+)", rf"job{n} status"])
+    info = handler.parse_command(text)
+    if info is None or not info.get("fuzzy"):
+        assert (info or {}).get("command") == _linear_parse(handler, text)
+
+
+def test_prefilter_skips_patterns_without_their_literals():
+    index = _PatternIndex(VoiceCommandHandler().command_patterns)
+    candidates = [name for name, _ in index.candidates("what time is it")]
+    assert "time" in candidates
+    assert not {"memory_backup", "add_task", "status"} & set(candidates)
+    # Non-ASCII text may case-fold onto ASCII literals, so it tries everything
+    assert len(list(index.candidates("ſomething"))) == len(index.entries)
+
+
+def test_registration_rebuilds_index():
+    handler = VoiceCommandHandler()
+    assert handler.parse_command("lights on please") is None
+    handler.add_custom_command("lights", [r"lights (on|off)"])
+    assert handler.parse_command("lights on please")["parameters"] == ["on"]
+
+
+def test_is_complete_command():
+    handler = VoiceCommandHandler()
+    assert handler.is_complete_command("what time is it")
+    assert not handler.is_complete_command("what time is it in")
+    assert not handler.is_complete_command("add a task buy")  # Still dictating
+    assert not handler.is_complete_command("")
+
+
+def test_manifest_commands_reload_and_override():
+    handler = VoiceCommandHandler()
+    assert handler.load_manifest_commands({
+        "lights": {"patterns": [r"lights (on|off)"], "response": "Done"},
+        "time": {"patterns": [r"clock please"]},
+        "broken": {"patterns": []},
+    }) == 2
+    assert handler.execute_command(handler.parse_command("lights on")) == "Done"
+    assert handler.parse_command("clock please")["command"] == "time"
+    assert handler.parse_command("what time is it") is None  # Overridden by the manifest
+
+    # Removing the section restores the built-in patterns
+    assert handler.load_manifest_commands({}) == 0
+    assert handler.parse_command("what time is it")["command"] == "time"
+    assert handler.parse_command("lights on") is None
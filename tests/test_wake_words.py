@@ -0,0 +1,49 @@
+"""Wake word location and commands spoken in the same phrase."""
+
+import pytest
+
+pytest.importorskip("speech_recognition")
+pytest.importorskip("pyttsx3")
+
+from voice.wake_words import WakeDetection, command_after_wake_word, find_wake_word  # noqa: E402
+
+
+def test_longest_wake_word_wins():
+    assert find_wake_word("Hey Glenn, what time is it") == ("hey glenn", 0)
+    assert find_wake_word("so, glenn") == ("glenn", 4)
+
+
+def test_wake_word_must_be_a_whole_word():
+    assert find_wake_word("glennis is here") is None
+    assert find_wake_word("") is None
+
+
+def test_possessive_is_not_a_wake_word():
+    assert find_wake_word("Glenn's code is great") is None
+    assert find_wake_word("Glenn’s code is great") is None
+    assert command_after_wake_word("Glenn's code is great") == ""
+
+
+@pytest.mark.parametrize("phrase, command", [
+    ("Hey Glenn, what time is it?", "what time is it"),
+    ("Glenn add a task buy milk", "add a task buy milk"),
+    ("um, ok Glenn, status", "status"),
+    ("okay glenn who are you", "who are you"),
+])
+def test_command_after_a_leading_wake_word(phrase, command):
+    assert command_after_wake_word(phrase) == command
+
+
+@pytest.mark.parametrize("phrase", [
+    "I was telling Glenn about my day, goodbye everyone",
+    "so then glenn said add a task",
+    "Glenn",
+])
+def test_mentions_carry_no_command(phrase):
+    assert command_after_wake_word(phrase) == ""
+
+
+def test_locally_spotted_detection_has_no_command():
+    detection = WakeDetection("glenn")
+    assert not detection.addressed
+    assert detection.command_text == ""
@@ -4,7 +4,7 @@ Modular voice assistant system for Glenn.AI
 """
 
 __version__ = "1.0.0"
-__all__ = ["assistant", "wake_words", "speech_to_text", "text_to_speech", "voice_commands"]
+__all__ = ["assistant", "wake_words", "speech_to_text", "text_to_speech", "voice_commands", "fuzzy_match"]
 
 from .assistant import GlennVoiceAssistant
 from .wake_words import WakeWordDetector
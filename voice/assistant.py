@@ -7,15 +7,24 @@ import logging
 import time
 import threading
 from pathlib import Path
-from typing import Optional
+from typing import Any, Dict, Optional, Iterable, Union
 
+from core import metrics
+from core.file_watcher import FileWatcher
+from core.profile_cache import load_json
+from core.response_cache import MISSING
 from .wake_words import WakeWordDetector
 from .speech_to_text import SpeechToText  
 from .text_to_speech import TextToSpeech
-from .voice_commands import VoiceCommandHandler
+from .voice_commands import CommandSpeculation, VoiceCommandHandler
+from .pipeline import VoicePipeline
+from . import vad
 
 logger = logging.getLogger(__name__)
 
+TURNAROUND_SECONDS = metrics.histogram("glenn_voice_turnaround_seconds",
+                                       "End of the user's speech to the start of the spoken response")
+
 class GlennVoiceAssistant:
     """Main voice assistant orchestrating all voice components."""
     
@@ -25,10 +34,17 @@ class GlennVoiceAssistant:
         self.speech_to_text = SpeechToText()
         self.text_to_speech = TextToSpeech()
         self.command_handler = VoiceCommandHandler()
+        # Phrases that already form a whole command end after a short pause
+        self.speech_to_text.intent_complete = self.command_handler.is_complete_command
+        
+        # Manifest "voiceCommands" are reloaded on save, without restarting
+        self.manifest_path = Path(__file__).parent.parent / "manifests" / "glenn_manifest.json"
+        self.file_watcher = FileWatcher()
         
         self.is_running = False
         self.is_listening = False
-        self.voice_thread = None
+        self.pipeline: Optional[VoicePipeline] = None
+        self.unconfirmed: Optional[Dict[str, Any]] = None  # Near-miss command awaiting "yes"
         
         # Configuration
         self.wake_timeout = 1.0  # Seconds to listen for wake word
@@ -59,13 +75,29 @@ class GlennVoiceAssistant:
         # Setup command handlers
         self._setup_command_handlers()
         
+        try:
+            self.reload_manifest()
+        except FileNotFoundError:
+            logger.info("No manifest found - using built-in voice commands")
+        except Exception as e:
+            logger.error(f"Failed to load manifest voice commands: {e}")
+        
         if success:
             logger.info("Voice assistant initialized successfully")
+            # Opt-in Prometheus endpoint (GLENN_METRICS_PORT)
+            metrics.start_from_env()
+            self.file_watcher.watch(self.manifest_path, self.reload_manifest)
+            self.file_watcher.start()
         else:
             logger.error("Voice assistant initialization failed")
             
         return success
     
+    def reload_manifest(self, path=None) -> int:
+        """Apply the manifest's "voiceCommands" section; called again whenever the file changes."""
+        manifest = load_json(self.manifest_path)
+        return self.command_handler.load_manifest_commands(manifest.get('voiceCommands') or {})
+    
     def _setup_command_handlers(self):
         """Setup command handlers for voice commands."""
         # Register handlers for integration with Glenn's command system
@@ -112,11 +144,23 @@ class GlennVoiceAssistant:
             except Exception:
                 return "Memory backup functionality is being processed."
         
+        def handle_kunda_query(command_info):
+            """Stream Kunda's answer so speech starts at the first sentence."""
+            parameters = command_info.get('parameters', [])
+            if not parameters or not parameters[0]:
+                return "What would you like Kunda to look into?"
+            try:
+                from commands.kunda import process_query
+                return process_query(parameters[0])
+            except ImportError:
+                return "Kunda is not available right now."
+
         # Register the handlers
-        self.command_handler.register_handler("status", handle_status)
-        self.command_handler.register_handler("identity", handle_identity)
+        self.command_handler.register_handler("status", handle_status, cache_ttl=30.0, speculative=True)
+        self.command_handler.register_handler("identity", handle_identity, cache_ttl=300.0, speculative=True)
         self.command_handler.register_handler("add_task", handle_add_task)
         self.command_handler.register_handler("memory_backup", handle_memory_backup)
+        self.command_handler.register_handler("kunda_query", handle_kunda_query)
     
     def start(self):
         """Start the voice assistant."""
@@ -131,13 +175,13 @@ class GlennVoiceAssistant:
         self.is_running = True
         self.is_listening = True
         
-        # Start voice processing in a separate thread
-        self.voice_thread = threading.Thread(target=self._voice_loop, daemon=True)
-        self.voice_thread.start()
+        # Listening, recognition, execution and speech run as separate stages
+        self.pipeline = VoicePipeline(self)
+        self.pipeline.start()
         
         # Initial greeting
-        self.speak("Hello! Glenn's voice assistant is now active.")
-        self.speak(self._get_introduction())
+        self.pipeline.say("Hello! Glenn's voice assistant is now active.")
+        self.pipeline.say(self._get_introduction())
         
         logger.info("Voice assistant started")
     
@@ -159,80 +203,56 @@ class GlennVoiceAssistant:
         print("  - Say 'stop listening' to exit voice mode")
         print("  - Try: 'status', 'add task', 'who are you'\n")
         
+        self.pipeline = VoicePipeline(self)
+        self.pipeline.start()
         try:
-            self._voice_loop()
+            self.pipeline.wait()
         except KeyboardInterrupt:
             print("\n🎤 Voice assistant interrupted")
-            self.speak("Voice assistant shutting down. Goodbye!")
+            self.pipeline.interrupt()
+            self.pipeline.say("Voice assistant shutting down. Goodbye!").wait(5.0)
             self.stop()
     
-    def _voice_loop(self):
-        """Main voice processing loop."""
-        logger.info("Starting voice processing loop")
-        
-        while self.is_running:
-            try:
-                # Listen for wake word
-                if self.is_listening:
-                    self._process_wake_word()
-                
-                # Small delay to prevent CPU overuse
-                time.sleep(0.1)
-                
-            except Exception as e:
-                logger.error(f"Voice loop error: {e}")
-                time.sleep(1.0)  # Longer delay on error
-    
-    def _process_wake_word(self):
-        """Process wake word detection."""
-        wake_word = self.wake_detector.listen_for_wake_word(timeout=self.wake_timeout)
-        
-        if wake_word:
-            logger.info(f"Wake word detected: {wake_word}")
-            print(f"🎧 Wake word detected: {wake_word}")
-            
-            # Process the command
-            self._process_voice_command()
+    def _observe_turnaround(self, speech_end: Optional[float]):
+        """Record end-of-speech to response latency."""
+        if speech_end is not None:
+            turnaround = time.monotonic() - speech_end
+            TURNAROUND_SECONDS.observe(turnaround)
+            logger.info(f"Response ready {turnaround * 1000:.0f} ms after speech ended")
     
-    def _process_voice_command(self):
-        """Process voice command after wake word."""
-        # Acknowledge wake word
-        self.speak("Yes? I'm listening.")
-        
-        # Listen for command
-        command_text = self.speech_to_text.listen_for_speech(
-            timeout=self.command_timeout,
-            phrase_time_limit=10.0
-        )
-        
-        if command_text:
-            print(f"[You 🎤]: {command_text}")
-            logger.info(f"Command received: {command_text}")
-            
-            # Parse and execute command
-            response = self._execute_voice_command(command_text)
-            
-            # Respond
-            if response:
-                if response == "VOICE_EXIT":
-                    self.speak("Voice assistant deactivated. Goodbye!")
-                    self.stop()
-                    return
-                else:
-                    self.speak(response)
-            
-            # Log interaction
-            self._log_interaction(command_text, response)
-            
-        else:
-            self.speak("I didn't hear anything. Try again when you're ready.")
+    def _timed_fragments(self, fragments: Iterable[str], speech_end: Optional[float]) -> Iterable[str]:
+        """Pass a streamed response through, timing its first fragment."""
+        first = True
+        for fragment in fragments:
+            if first:
+                self._observe_turnaround(speech_end)
+                first = False
+            yield fragment
     
-    def _execute_voice_command(self, command_text: str) -> str:
-        """Execute a voice command and return response."""
+    def _execute_voice_command(self, command_text: str,
+                               speculation: Optional[CommandSpeculation] = None) -> Union[str, Iterable[str]]:
+        """Execute a voice command and return response text or a stream of fragments."""
+        # A near miss asked about last turn runs only on "yes"; anything else drops it
+        unconfirmed, self.unconfirmed = self.unconfirmed, None
+        if unconfirmed is not None and self.command_handler.is_confirmation(command_text):
+            if speculation is not None:
+                speculation.take(None)
+            return self.command_handler.execute_command(unconfirmed)
+        
         # Parse command
         command_info = self.command_handler.parse_command(command_text)
         
+        # Answers prepared while the user was still talking
+        if speculation is not None:
+            response = speculation.take(command_info)
+            if response is not MISSING:
+                return response
+        
         if command_info:
+            # Ask before a misheard command exits or writes
+            if self.command_handler.needs_confirmation(command_info):
+                self.unconfirmed = command_info
+                return self.command_handler.confirmation_prompt(command_info)
             # Execute parsed command
             return self.command_handler.execute_command(command_info)
         else:
@@ -288,6 +308,20 @@ class GlennVoiceAssistant:
         
         # Fallback to text output
         print(f"[Glenn 🎤]: {text}")
+
+    def speak_stream(self, fragments: Iterable[str], cancel: Optional[threading.Event] = None) -> str:
+        """Speak a streamed response sentence by sentence; returns the text spoken."""
+        if self.text_to_speech.is_available:
+            return self.text_to_speech.speak_stream(fragments, cancel)
+
+        from .text_to_speech import iter_sentences
+        spoken = []
+        for sentence in iter_sentences(fragments):
+            if cancel is not None and cancel.is_set():
+                break
+            print(f"[Glenn 🎤]: {sentence}")
+            spoken.append(sentence)
+        return " ".join(spoken)
     
     def stop(self):
         """Stop the voice assistant."""
@@ -295,14 +329,16 @@ class GlennVoiceAssistant:
         
         self.is_running = False
         self.is_listening = False
+        self.file_watcher.stop()
         
-        # Wait for voice thread to finish
-        if self.voice_thread and self.voice_thread.is_alive():
-            self.voice_thread.join(timeout=2.0)
+        # Stop the pipeline stages (this may be called from one of them)
+        if self.pipeline is not None:
+            self.pipeline.stop()
         
         # Cleanup components
         self.text_to_speech.cleanup()
         self.speech_to_text.cleanup()
+        self.wake_detector.cleanup()
         
         logger.info("Voice assistant stopped")
     
@@ -329,7 +365,10 @@ class GlennVoiceAssistant:
             'speech_to_text_available': self.speech_to_text.recognizer is not None,
             'text_to_speech_available': self.text_to_speech.is_available,
             'wake_words': self.wake_detector.get_wake_words(),
-            'command_count': len(self.command_handler.get_command_list())
+            'command_count': len(self.command_handler.get_command_list()),
+            'vad': vad.report() if self.speech_to_text.vad else None,
+            'stt_backends': self.speech_to_text.backends.get_status() if self.speech_to_text.backends else None,
+            'pipeline': self.pipeline.get_status() if self.pipeline else None
         }
 
 def main():
@@ -0,0 +1,292 @@
+"""
+🎙️ Glenn.AI Shared Audio Capture
+One open microphone stream feeding a ring buffer that every listener reads from
+"""
+
+import logging
+import math
+import threading
+import time
+from array import array
+from collections import deque
+from typing import Deque, Dict, Optional, Tuple
+
+import speech_recognition as sr
+
+from core import metrics
+
+logger = logging.getLogger(__name__)
+
+BUFFER_SECONDS = 15.0      # Audio kept for readers that fall behind or seek back
+REOPEN_DELAY = 0.5         # First retry delay after the device fails
+MAX_REOPEN_DELAY = 10.0    # Retry delay ceiling
+CALIBRATION_SECONDS = 1.0  # Ambient noise sampling when no saved calibration exists
+
+CAPTURE_ERRORS = metrics.counter("glenn_audio_capture_errors_total", "Microphone read/open failures")
+READER_OVERRUNS = metrics.counter("glenn_audio_reader_overruns_total",
+                                  "Reads that fell out of the ring buffer and skipped ahead")
+
+_SAMPLE_TYPECODES = {1: "b", 2: "h", 4: "i"}
+
+_captures: Dict[Optional[int], "AudioCapture"] = {}
+_captures_lock = threading.Lock()
+
+def frame_rms(frame: bytes, sample_width: int = 2) -> float:
+    """
+    Root-mean-square energy of a PCM frame (same scale as audioop.rms).
+
+    Args:
+        frame: Raw little-endian PCM bytes
+        sample_width: Bytes per sample (1, 2 or 4)
+
+    Returns:
+        RMS amplitude
+    """
+    samples = array(_SAMPLE_TYPECODES[sample_width], frame[:len(frame) - len(frame) % sample_width])
+    if not samples:
+        return 0.0
+    return math.sqrt(sum(s * s for s in samples) / len(samples))
+
+def acquire_capture(device_index: Optional[int] = None) -> "AudioCapture":
+    """
+    Shared, running capture for a device (opened on first use).
+
+    Each acquire must be paired with AudioCapture.release(); the device is
+    closed when the last user releases it.
+
+    Args:
+        device_index: PyAudio device index (None = system default)
+
+    Returns:
+        Started AudioCapture
+    """
+    with _captures_lock:
+        capture = _captures.get(device_index)
+        if capture is None:
+            capture = AudioCapture(device_index)
+            capture.start()  # Raises if the device cannot be opened
+            _captures[device_index] = capture
+        capture._users += 1
+        return capture
+
+class _ReaderStream:
+    """File-like stream that speech_recognition reads chunks from."""
+
+    def __init__(self, source: "CaptureSource"):
+        self._source = source
+
+    def read(self, size: int) -> bytes:
+        chunk, self._source.position = self._source.capture.read(self._source.position)
+        return chunk
+
+class CaptureSource(sr.AudioSource):
+    """
+    AudioSource view over a shared capture, usable wherever sr.Microphone is.
+
+    Entering the source starts reading from live audio; seek() moves it back
+    to an earlier position (e.g. the end of the wake word) while the audio is
+    still in the ring buffer.
+    """
+
+    def __init__(self, capture: "AudioCapture"):
+        self.capture = capture
+        self.SAMPLE_RATE = capture.sample_rate
+        self.SAMPLE_WIDTH = capture.sample_width
+        self.CHUNK = capture.chunk_size
+        self.stream = None
+        self.position = capture.head
+
+    def __enter__(self):
+        self.position = self.capture.head
+        self.stream = _ReaderStream(self)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stream = None
+
+    def seek(self, position: int):
+        """Continue reading from a position returned by an earlier read."""
+        self.position = position
+
+class AudioCapture:
+    """Keeps one input stream open and buffers its chunks for any number of readers."""
+
+    def __init__(self, device_index: Optional[int] = None, buffer_seconds: float = BUFFER_SECONDS):
+        """
+        Initialize capture (call start() to open the device).
+
+        Args:
+            device_index: PyAudio device index (None = system default)
+            buffer_seconds: Seconds of audio kept in the ring buffer
+        """
+        self.device_index = device_index
+        self.buffer_seconds = buffer_seconds
+        self.microphone = None
+        self.sample_rate = 16000
+        self.sample_width = 2
+        self.chunk_size = 1024
+        self.calibrator = None  # Shared AmbientCalibrator, created by calibrate()
+
+        self._chunks: Deque[bytes] = deque()
+        self._next_seq = 0  # Sequence number of the next chunk captured
+        self._cond = threading.Condition()
+        self._calibration_lock = threading.Lock()
+        self._running = False
+        self._thread: Optional[threading.Thread] = None
+        self._users = 0
+
+    def start(self):
+        """Open the device and start the capture thread."""
+        if self._running:
+            return
+        self.microphone = sr.Microphone(device_index=self.device_index)
+        self.sample_rate = self.microphone.SAMPLE_RATE
+        self.sample_width = self.microphone.SAMPLE_WIDTH
+        self.chunk_size = self.microphone.CHUNK
+        max_chunks = max(1, int(self.buffer_seconds * self.sample_rate / self.chunk_size))
+        self._chunks = deque(maxlen=max_chunks)
+
+        source = self.microphone.__enter__()  # Open now so failures reach the caller
+        self._running = True
+        self._thread = threading.Thread(target=self._run, args=(source,), name="glenn-audio-capture", daemon=True)
+        self._thread.start()
+        logger.info(f"Audio capture started ({self.sample_rate} Hz, {self.chunk_size}-sample chunks)")
+
+    def stop(self):
+        """Stop capturing and close the device."""
+        if self.calibrator is not None:
+            self.calibrator.stop()  # Persists the latest threshold
+            self.calibrator = None
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=2.0)
+        self._thread = None
+        logger.info("Audio capture stopped")
+
+    def release(self):
+        """Drop one acquire_capture() reference; the last one stops the capture."""
+        with _captures_lock:
+            self._users -= 1
+            if self._users > 0:
+                return
+            if _captures.get(self.device_index) is self:
+                del _captures[self.device_index]
+        self.stop()
+
+    @property
+    def is_running(self) -> bool:
+        return self._running
+
+    @property
+    def head(self) -> int:
+        """Position of the next chunk to be captured (i.e. "now")."""
+        return self._next_seq
+
+    def _run(self, source):
+        delay = REOPEN_DELAY
+        while self._running:
+            try:
+                chunk = source.stream.read(source.CHUNK)
+            except Exception as e:
+                if not self._running:
+                    break
+                CAPTURE_ERRORS.inc()
+                logger.error(f"Audio capture error, reopening device in {delay:.1f}s: {e}")
+                time.sleep(delay)
+                delay = min(delay * 2, MAX_REOPEN_DELAY)
+                source = self._reopen()
+                continue
+            delay = REOPEN_DELAY
+            with self._cond:
+                self._chunks.append(chunk)
+                self._next_seq += 1
+                self._cond.notify_all()
+
+        try:
+            self.microphone.__exit__(None, None, None)
+        except Exception as e:
+            logger.debug(f"Closing microphone failed: {e}")
+
+    def _reopen(self):
+        try:
+            self.microphone.__exit__(None, None, None)
+        except Exception:
+            pass
+        try:
+            return self.microphone.__enter__()
+        except Exception as e:
+            CAPTURE_ERRORS.inc()
+            logger.error(f"Failed to reopen microphone: {e}")
+            return self.microphone
+
+    def read(self, position: int) -> Tuple[bytes, int]:
+        """
+        Chunk at `position`, waiting for it to be captured.
+
+        Args:
+            position: Sequence number to read
+
+        Returns:
+            (chunk, next position); chunk is b"" once the capture has stopped
+        """
+        with self._cond:
+            while position >= self._next_seq:
+                if not self._running:
+                    return b"", position
+                self._cond.wait(0.5)
+            oldest = self._next_seq - len(self._chunks)
+            if position < oldest:
+                # Reader fell behind the ring buffer; resume at the oldest audio
+                READER_OVERRUNS.inc()
+                position = oldest
+            return self._chunks[position - oldest], position + 1
+
+    def source(self) -> CaptureSource:
+        """New AudioSource reading from this capture."""
+        return CaptureSource(self)
+
+    @property
+    def energy_threshold(self) -> Optional[float]:
+        """Current calibrated speech threshold (None before calibrate())."""
+        return self.calibrator.threshold if self.calibrator is not None else None
+
+    def calibrate(self, recognizer, duration: float = CALIBRATION_SECONDS) -> float:
+        """
+        Keep a recognizer's energy threshold on the shared ambient calibration.
+
+        The first caller loads the device's saved threshold (sampling
+        `duration` seconds only if there is none); from then on it adapts in
+        the background from non-speech audio (see voice/calibration.py).
+
+        Args:
+            recognizer: sr.Recognizer to configure
+            duration: Seconds of ambient noise to sample without a saved value
+
+        Returns:
+            Energy threshold
+        """
+        with self._calibration_lock:
+            if self.calibrator is None:
+                from .calibration import AmbientCalibrator
+                calibrator = AmbientCalibrator(self)
+                calibrator.start(duration)
+                self.calibrator = calibrator
+        return self.calibrator.attach(recognizer)
+
+    def has_speech_since(self, position: int, energy_threshold: float) -> bool:
+        """
+        Whether any buffered chunk from `position` on is louder than the threshold.
+
+        Args:
+            position: Sequence number to start from
+            energy_threshold: RMS level counted as speech
+
+        Returns:
+            True if speech was captured since `position`
+        """
+        with self._cond:
+            oldest = self._next_seq - len(self._chunks)
+            chunks = list(self._chunks)[max(0, position - oldest):]
+        return any(frame_rms(chunk, self.sample_width) > energy_threshold for chunk in chunks)
@@ -0,0 +1,216 @@
+"""
+🎚️ Glenn.AI Ambient Noise Calibration
+Persisted per-device energy threshold, adapted continuously from non-speech audio
+"""
+
+import json
+import logging
+import math
+import os
+import threading
+import time
+from pathlib import Path
+from typing import List, Optional
+
+from core import metrics
+from .audio_capture import frame_rms
+
+logger = logging.getLogger(__name__)
+
+CALIBRATION_PATH = Path(__file__).parent.parent / "data" / "voice_calibration.json"
+
+ENERGY_RATIO = 1.5        # Threshold = noise floor x ratio (speech_recognition's default)
+MIN_THRESHOLD = 50.0      # Never treat near-silence as speech
+EMA_SECONDS = 5.0         # Time constant of the noise floor average
+SUSTAINED_SECONDS = 15.0  # Loudness lasting this long is noise, not speech
+PERSIST_SECONDS = 60.0    # Minimum time between saves
+PERSIST_CHANGE = 0.1      # Relative change worth saving
+
+ENERGY_THRESHOLD = metrics.gauge("glenn_voice_energy_threshold", "Current speech energy threshold")
+
+def device_key(capture) -> str:
+    """
+    Stable name for the capture's input device.
+
+    Args:
+        capture: AudioCapture with an opened microphone
+
+    Returns:
+        "<index or default>:<device name>"
+    """
+    name = "unknown"
+    try:
+        audio = capture.microphone.pyaudio_module.PyAudio()
+        try:
+            if capture.device_index is None:
+                info = audio.get_default_input_device_info()
+            else:
+                info = audio.get_device_info_by_index(capture.device_index)
+            name = info.get("name") or name
+        finally:
+            audio.terminate()
+    except Exception as e:
+        logger.debug(f"Could not read input device name: {e}")
+    index = "default" if capture.device_index is None else capture.device_index
+    return f"{index}:{name}"
+
+def load_threshold(key: str, path: Path = CALIBRATION_PATH) -> Optional[float]:
+    """Persisted energy threshold for a device, or None."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            entry = json.load(f).get("devices", {}).get(key)
+        return float(entry["energy_threshold"]) if entry else None
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable calibration file {path}: {e}")
+        return None
+
+def save_threshold(key: str, threshold: float, path: Path = CALIBRATION_PATH):
+    """Persist a device's energy threshold (atomic replace)."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except Exception:
+        data = {}
+    data.setdefault("devices", {})[key] = {
+        "energy_threshold": round(threshold, 1),
+        "updated": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp, path)
+    except OSError as e:
+        logger.warning(f"Failed to save voice calibration: {e}")
+
+class AmbientCalibrator:
+    """Keeps recognizers' energy threshold tracking the room's noise floor."""
+
+    def __init__(self, capture, path: Path = CALIBRATION_PATH):
+        """
+        Initialize calibrator for a running capture.
+
+        Args:
+            capture: AudioCapture to measure
+            path: Calibration file
+        """
+        self.capture = capture
+        self.path = path
+        self.key = device_key(capture)
+        self.threshold: Optional[float] = None
+        self.noise_floor = 0.0
+        self._recognizers: List = []
+        self._saved_threshold: Optional[float] = None
+        self._saved_at = 0.0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self, duration: float = 1.0) -> float:
+        """
+        Load the persisted threshold (or measure `duration` seconds once) and
+        start adapting in the background.
+
+        Returns:
+            Starting energy threshold
+        """
+        threshold = load_threshold(self.key, self.path)
+        if threshold is not None:
+            logger.info(f"Using saved ambient calibration for {self.key}: {threshold:.0f}")
+            self._saved_threshold = threshold
+        else:
+            logger.info("Calibrating microphone for ambient noise...")
+            threshold = self._measure(duration)
+            save_threshold(self.key, threshold, self.path)
+            self._saved_threshold = threshold
+        self._saved_at = time.monotonic()
+        self._set(threshold)
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="glenn-calibration", daemon=True)
+        self._thread.start()
+        return threshold
+
+    def stop(self):
+        """Stop adapting and persist the latest threshold."""
+        self._stop.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=2.0)
+        self._thread = None
+        if self.threshold is not None and self.threshold != self._saved_threshold:
+            save_threshold(self.key, self.threshold, self.path)
+            self._saved_threshold = self.threshold
+
+    def attach(self, recognizer) -> float:
+        """
+        Keep a recognizer's energy_threshold in sync with this calibrator.
+
+        The recognizer's own dynamic adjustment is turned off so there is a
+        single source of truth.
+
+        Returns:
+            Current energy threshold
+        """
+        recognizer.dynamic_energy_threshold = False
+        recognizer.energy_threshold = self.threshold
+        if recognizer not in self._recognizers:
+            self._recognizers.append(recognizer)
+        return self.threshold
+
+    def _measure(self, duration: float) -> float:
+        position = self.capture.head
+        seconds_per_chunk = self.capture.chunk_size / self.capture.sample_rate
+        energies = []
+        while len(energies) * seconds_per_chunk < duration:
+            chunk, position = self.capture.read(position)
+            if not chunk:
+                break
+            energies.append(frame_rms(chunk, self.capture.sample_width))
+        noise = sum(energies) / len(energies) if energies else MIN_THRESHOLD / ENERGY_RATIO
+        self.noise_floor = noise
+        return max(MIN_THRESHOLD, noise * ENERGY_RATIO)
+
+    def _set(self, threshold: float):
+        self.threshold = threshold
+        for recognizer in self._recognizers:
+            recognizer.energy_threshold = threshold
+        ENERGY_THRESHOLD.set(threshold)
+
+    def _run(self):
+        seconds_per_chunk = self.capture.chunk_size / self.capture.sample_rate
+        alpha = 1.0 - math.exp(-seconds_per_chunk / EMA_SECONDS)
+        if not self.noise_floor:
+            self.noise_floor = self.threshold / ENERGY_RATIO
+        loud_seconds = 0.0
+        position = self.capture.head
+
+        while not self._stop.is_set():
+            chunk, position = self.capture.read(position)
+            if not chunk:
+                break  # Capture stopped
+            energy = frame_rms(chunk, self.capture.sample_width)
+
+            if energy > self.threshold:
+                # Probably speech: leave the floor alone, unless the room has
+                # simply become louder for longer than anyone talks
+                loud_seconds += seconds_per_chunk
+                if loud_seconds < SUSTAINED_SECONDS:
+                    continue
+            else:
+                loud_seconds = 0.0
+
+            self.noise_floor += alpha * (energy - self.noise_floor)
+            self._set(max(MIN_THRESHOLD, self.noise_floor * ENERGY_RATIO))
+            self._maybe_persist()
+
+    def _maybe_persist(self):
+        now = time.monotonic()
+        if now - self._saved_at < PERSIST_SECONDS:
+            return
+        self._saved_at = now
+        saved = self._saved_threshold or 0.0
+        if abs(self.threshold - saved) > PERSIST_CHANGE * max(saved, 1.0):
+            save_threshold(self.key, self.threshold, self.path)
+            self._saved_threshold = self.threshold
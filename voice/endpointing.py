@@ -0,0 +1,233 @@
+"""
+⏱️ Glenn.AI Endpointing
+Decides when the speaker has finished, from VAD frames and partial transcripts
+"""
+
+import logging
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from typing import Callable, Optional
+
+from core import metrics
+from .vad import VoiceActivityDetector, smooth
+
+logger = logging.getLogger(__name__)
+
+TRAILING_SILENCE = 0.5    # Starting end-of-utterance silence (speech_recognition waits 0.8 s)
+MIN_SILENCE = 0.35        # Adaptation range for the trailing silence
+MAX_SILENCE = 1.0
+INTENT_SILENCE = 0.2      # Enough silence once the words so far form a complete command
+PAUSE_MARGIN = 1.5        # Trailing silence aims at the speaker's longest mid-phrase pause x margin
+ADAPT_RATE = 0.3          # Weight of the latest utterance when adapting
+PRE_ROLL = 0.3            # Seconds kept from before speech starts
+
+ENDPOINT_SECONDS = metrics.histogram("glenn_voice_endpoint_seconds",
+                                     "Silence waited after the last speech frame before ending the phrase",
+                                     ["reason"])
+
+class Utterance:
+    """One endpointed phrase."""
+
+    __slots__ = ("frame_data", "speech_end", "reason", "transcript")
+
+    def __init__(self, frame_data: bytes, speech_end: float, reason: str, transcript: Optional[str] = None):
+        self.frame_data = frame_data    # PCM from just before speech start to the endpoint
+        self.speech_end = speech_end    # time.monotonic() when the last speech frame was captured
+        self.reason = reason            # "silence", "intent", "limit" or "closed"
+        self.transcript = transcript    # Partial transcript covering the whole phrase, if one was made
+
+class Endpointer:
+    """Reads an audio source until the speaker has finished a phrase."""
+
+    def __init__(self, vad: VoiceActivityDetector, trailing_silence: float = TRAILING_SILENCE,
+                 intent_silence: float = INTENT_SILENCE):
+        """
+        Initialize endpointer.
+
+        Args:
+            vad: Voice activity detector for the source's format
+            trailing_silence: Starting silence that ends a phrase (adapts per speaker)
+            intent_silence: Silence that ends a phrase whose partial transcript is complete
+        """
+        self.vad = vad
+        self.trailing_silence = trailing_silence
+        self.intent_silence = intent_silence
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def listen(self, source, energy_threshold: float, timeout: Optional[float] = None,
+               phrase_time_limit: Optional[float] = None,
+               transcribe: Optional[Callable[[bytes], Optional[str]]] = None,
+               is_complete: Optional[Callable[[str], bool]] = None, decoder=None,
+               on_partial: Optional[Callable[[str], None]] = None) -> Optional[Utterance]:
+        """
+        Capture one phrase from an entered audio source.
+
+        The phrase ends after `trailing_silence` seconds without speech
+        frames. With `transcribe` and `is_complete`, a partial transcript is
+        requested once the speaker pauses for `intent_silence`; if it already
+        forms a complete command the phrase ends right there. Either way, a
+        partial made during the final pause already covers every spoken word,
+        so it is returned as the transcript instead of recognizing again.
+
+        With a streaming `decoder` every chunk is decoded as it arrives: its
+        hypotheses replace the partial requests and its final result is the
+        transcript. Each new hypothesis is passed to `on_partial`, so work
+        can start before the speaker has finished.
+
+        Args:
+            source: Entered AudioSource (e.g. voice.audio_capture.CaptureSource)
+            energy_threshold: RMS speech threshold (recognizer scale)
+            timeout: Seconds to wait for speech to start (None = forever)
+            phrase_time_limit: Maximum seconds of phrase
+            transcribe: Partial recognizer, PCM bytes -> text or None
+            is_complete: Whether a partial transcript is a whole command
+            decoder: Streaming DecodeSession (voice.streaming_stt) for this phrase
+            on_partial: Called with each partial transcript while listening
+
+        Returns:
+            Utterance, or None if no speech started before the timeout
+        """
+        seconds_per_chunk = source.CHUNK / source.SAMPLE_RATE
+        frame_seconds = self.vad.frame_ms / 1000
+        self.vad.reset()
+
+        pre_roll = deque(maxlen=int(PRE_ROLL / seconds_per_chunk) + 1)
+        waited = 0.0
+        run = remaining = 0
+        while True:
+            chunk = source.stream.read(source.CHUNK)
+            if not chunk:
+                return None
+            pre_roll.append(chunk)
+            smoothed, run, remaining = smooth(self.vad.speech_frames(chunk, energy_threshold),
+                                              run=run, remaining=remaining)
+            if any(smoothed):
+                break
+            waited += seconds_per_chunk
+            if timeout and waited >= timeout:
+                return None
+
+        chunks = list(pre_roll)
+        hypothesis = None
+        if decoder is not None:
+            for chunk in chunks:
+                hypothesis = self._decode(decoder, chunk, on_partial) or hypothesis
+        spoken = 0.0
+        silence = longest_pause = 0.0
+        speech_end = self._captured_at(source)
+        partial = None
+        announced = False  # Whether on_partial has seen the current partial
+        transcript = None
+        reason = "closed"
+        while True:
+            chunk = source.stream.read(source.CHUNK)
+            if not chunk:
+                break
+            chunks.append(chunk)
+            spoken += seconds_per_chunk
+            if decoder is not None:
+                hypothesis = self._decode(decoder, chunk, on_partial) or hypothesis
+
+            frames = self.vad.speech_frames(chunk, energy_threshold)
+            for speech in frames:
+                if speech:
+                    longest_pause = max(longest_pause, silence)
+                    silence = 0.0
+                else:
+                    silence += frame_seconds
+            if frames.any():
+                speech_end = self._captured_at(source) - silence
+                partial = None  # Still talking; an earlier partial is stale
+
+            if silence >= self.trailing_silence:
+                reason = "silence"
+                break
+            if phrase_time_limit and spoken >= phrase_time_limit:
+                reason = "limit"
+                break
+            if decoder is not None:
+                if is_complete and hypothesis and silence >= self.intent_silence and is_complete(hypothesis):
+                    reason = "intent"
+                    break
+            elif transcribe and (is_complete or on_partial) and silence >= self.intent_silence:
+                if partial is None:
+                    partial = self._submit(transcribe, b"".join(chunks))
+                    announced = False
+                elif partial.done():
+                    text = partial.result()
+                    if text and on_partial and not announced:
+                        announced = True
+                        self._announce(on_partial, text)
+                    if text and is_complete and is_complete(text):
+                        transcript = text
+                        reason = "intent"
+                        break
+
+        if decoder is not None:
+            try:
+                transcript = decoder.finish() or None
+            except Exception as e:
+                logger.debug(f"Streaming decode failed: {e}")
+        elif reason == "silence" and partial is not None:
+            # Nothing but silence since it was taken; a slow partial is not
+            # worth more than another pause, the phrase is recognized instead
+            try:
+                transcript = partial.result(timeout=self.trailing_silence)
+            except FutureTimeout:
+                logger.debug("Partial transcript too slow; recognizing the whole phrase")
+        ENDPOINT_SECONDS.labels(reason=reason).observe(silence)
+        if reason in ("silence", "intent"):
+            self._adapt(longest_pause)
+        return Utterance(b"".join(chunks), speech_end, reason, transcript)
+
+    def _submit(self, transcribe, pcm: bytes):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="glenn-partial")
+
+        def run():
+            try:
+                return transcribe(pcm)
+            except Exception as e:
+                logger.debug(f"Partial transcription failed: {e}")
+                return None
+
+        return self._executor.submit(run)
+
+    def _decode(self, decoder, chunk: bytes, on_partial) -> Optional[str]:
+        """Feed the streaming decoder; returns its hypothesis when it changed."""
+        try:
+            hypothesis = decoder.accept(chunk)
+        except Exception as e:
+            logger.debug(f"Streaming decode failed: {e}")
+            return None
+        if hypothesis and on_partial:
+            self._announce(on_partial, hypothesis)
+        return hypothesis
+
+    @staticmethod
+    def _announce(on_partial, text: str):
+        try:
+            on_partial(text)
+        except Exception as e:
+            logger.error(f"Partial transcript callback failed: {e}")
+
+    def _adapt(self, longest_pause: float):
+        """Move the trailing silence towards what this speaker's pauses need."""
+        target = min(MAX_SILENCE, max(MIN_SILENCE, longest_pause * PAUSE_MARGIN))
+        self.trailing_silence += ADAPT_RATE * (target - self.trailing_silence)
+
+    @staticmethod
+    def _captured_at(source) -> float:
+        """Approximate capture time of the audio just read (sources may lag live audio)."""
+        now = time.monotonic()
+        capture = getattr(source, "capture", None)
+        if capture is None:
+            return now
+        return now - (capture.head - source.position) * source.CHUNK / source.SAMPLE_RATE
+
+    def close(self):
+        """Stop the partial-transcription worker."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
@@ -0,0 +1,227 @@
+"""
+🎤 Glenn.AI Fuzzy Command Matching
+Confidence-scored matching of misrecognized speech against command patterns
+"""
+
+import logging
+from collections import Counter
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+try:
+    from re import _parser as sre_parse  # Python 3.11+
+except ImportError:
+    import sre_parse
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_THRESHOLD = 0.75   # Minimum confidence for a fuzzy match
+MAX_INPUT_CHARS = 120      # Longer utterances are truncated before scoring
+MAX_CANDIDATES = 8         # Phrases scored with edit distance per utterance
+MAX_VARIANTS = 8           # Literal expansions kept per pattern
+MIN_PHRASE_CHARS = 5       # Shorter phrases are too ambiguous to fuzz
+MIN_TRIGRAM_OVERLAP = 0.3  # Shared-trigram ratio needed to be shortlisted
+MAX_POSTINGS = 250         # Trigrams shared by more phrases are ignored
+
+
+class _Phrase:
+    """One literal expansion of a command pattern."""
+
+    __slots__ = ("command", "pattern", "text", "has_slot", "trigrams")
+
+    def __init__(self, command: str, pattern: Any, text: str, has_slot: bool):
+        self.command = command
+        self.pattern = pattern
+        self.text = text
+        self.has_slot = has_slot
+        self.trigrams = _trigrams(text)
+
+
+def _trigrams(text: str) -> set:
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+@lru_cache(maxsize=None)
+def expand_literals(pattern: str, flags: int = 0, limit: int = MAX_VARIANTS) -> Tuple[Tuple[str, bool], ...]:
+    """
+    Expand a regex into the literal phrases it accepts.
+
+    Optional parts and alternations are expanded (up to `limit` variants).
+    Expansion stops at the first non-literal element, such as a `(.+)` capture,
+    which becomes the slot for the command parameter.
+
+    Args:
+        pattern: Regex source
+        flags: Regex flags
+        limit: Maximum number of variants
+
+    Returns:
+        Tuple of (phrase, has_slot) pairs (cached per pattern)
+    """
+    try:
+        parsed = sre_parse.parse(pattern, flags)
+    except Exception:
+        return ()
+
+    def expand(items, prefixes):
+        # prefixes: list of (text, stopped_at_slot)
+        for op, av in items:
+            if all(stopped for _, stopped in prefixes):
+                break
+            if op is sre_parse.LITERAL:
+                prefixes = [(t if s else t + chr(av).lower(), s) for t, s in prefixes]
+            elif op is sre_parse.SUBPATTERN:
+                prefixes = expand(av[-1], prefixes)
+            elif op is sre_parse.BRANCH:
+                branched = []
+                for branch in av[1]:
+                    branched.extend(expand(branch, prefixes))
+                prefixes = branched[:limit]
+            elif op in (sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT) and av[1] == 1:
+                with_item = expand(av[2], prefixes)
+                prefixes = (prefixes + with_item)[:limit] if av[0] == 0 else with_item
+            elif op is sre_parse.AT:
+                continue
+            else:
+                prefixes = [(t, True) for t, _ in prefixes]
+        return prefixes
+
+    phrases = []
+    for text, has_slot in expand(parsed, [("", False)]):
+        text = " ".join(text.split())
+        if text and (text, has_slot) not in phrases:
+            phrases.append((text, has_slot))
+    return tuple(phrases)
+
+
+def substring_distance(phrase: str, text: str, max_distance: int) -> Tuple[int, int]:
+    """
+    Smallest edit distance between `phrase` and any substring of `text`.
+
+    This is Sellers' algorithm with Ukkonen's cut-off: only rows that can still
+    end within `max_distance` are computed, so the cost is about
+    O(max_distance * len(text)).
+
+    Returns:
+        (distance, end index in text), or (max_distance + 1, -1) if no
+        substring is within the bound
+    """
+    m = len(phrase)
+    over = max_distance + 1
+    # column[i] is the cost of phrase[:i] ending at the current text position,
+    # capped at `over`; rows past `last` are known to exceed the bound
+    column = [min(i, over) for i in range(m + 1)]
+    last = min(max_distance, m)
+    best, best_end = (m, 0) if m <= max_distance else (over, -1)
+
+    for j, ch in enumerate(text, 1):
+        diagonal = 0  # Row 0 is free: a match may start anywhere in text
+        top = min(last + 1, m)
+        for i in range(1, top + 1):
+            left = column[i]
+            value = diagonal if phrase[i - 1] == ch else diagonal + 1
+            if left + 1 < value:
+                value = left + 1
+            if column[i - 1] + 1 < value:
+                value = column[i - 1] + 1
+            diagonal = left
+            column[i] = value if value < over else over
+        last = top
+        while last > 0 and column[last] > max_distance:
+            last -= 1
+        if last == m and column[m] < best:
+            best, best_end = column[m], j
+    return best, best_end
+
+
+class FuzzyMatcher:
+    """Trigram-shortlisted, edit-distance-scored matching over pattern literals."""
+
+    def __init__(self, entries: List[Tuple[str, Any]], threshold: float = DEFAULT_THRESHOLD):
+        """
+        Build the phrase list and trigram index.
+
+        Args:
+            entries: (command_name, compiled_pattern) pairs in priority order
+            threshold: Minimum confidence to accept a match
+        """
+        self.threshold = threshold
+        self.phrases: List[_Phrase] = []
+        self._index: Dict[str, List[int]] = {}
+        for command_name, pattern in entries:
+            for text, has_slot in expand_literals(pattern.pattern, pattern.flags):
+                if len(text) < MIN_PHRASE_CHARS:
+                    continue
+                phrase_id = len(self.phrases)
+                phrase = _Phrase(command_name, pattern, text, has_slot)
+                self.phrases.append(phrase)
+                for gram in phrase.trigrams:
+                    self._index.setdefault(gram, []).append(phrase_id)
+
+    def shortlist(self, text: str) -> List[int]:
+        """Phrase ids sharing the most trigrams with `text` (at most MAX_CANDIDATES)."""
+        shared: Counter = Counter()
+        for gram in _trigrams(text):
+            postings = self._index.get(gram)
+            if postings and len(postings) <= MAX_POSTINGS:
+                shared.update(postings)
+        ranked = []
+        for phrase_id, count in shared.items():
+            overlap = count / len(self.phrases[phrase_id].trigrams)
+            if overlap >= MIN_TRIGRAM_OVERLAP:
+                ranked.append((-overlap, phrase_id))
+        ranked.sort()
+        return [phrase_id for _, phrase_id in ranked[:MAX_CANDIDATES]]
+
+    def match(self, spoken_text: str, threshold: Optional[float] = None,
+              threshold_for: Optional[Callable[[str], float]] = None) -> Optional[Dict[str, Any]]:
+        """
+        Find the best fuzzy match for an utterance.
+
+        Args:
+            spoken_text: Recognized speech (lowercased)
+            threshold: Override for the minimum confidence
+            threshold_for: Minimum confidence per command name (default: `threshold` for all)
+
+        Returns:
+            Command information dict (as parse_command) or None
+        """
+        threshold = self.threshold if threshold is None else threshold
+        text = " ".join(spoken_text.lower().split())[:MAX_INPUT_CHARS]
+        if not text or not self.phrases:
+            return None
+
+        best = None  # (confidence, -phrase_id, phrase, end)
+        for phrase_id in self.shortlist(text):
+            phrase = self.phrases[phrase_id]
+            minimum = threshold if threshold_for is None else threshold_for(phrase.command)
+            budget = int(len(phrase.text) * (1.0 - minimum))
+            distance, end = substring_distance(phrase.text, text, budget)
+            if end < 0:
+                continue
+            if phrase.has_slot:
+                end = text.find(" ", end) if text.find(" ", end) >= 0 else len(text)
+                if not text[end:].strip():
+                    continue  # Nothing left over for the parameter
+            confidence = 1.0 - distance / len(phrase.text)
+            if confidence < minimum:
+                continue
+            key = (confidence, -phrase_id)
+            if best is None or key > best[:2]:
+                best = (confidence, -phrase_id, phrase, end)
+
+        if best is None:
+            return None
+        confidence, _, phrase, end = best
+        params = [text[end:].strip()] if phrase.has_slot else []
+        logger.info(f"Fuzzy match: {phrase.command} ('{phrase.text}', confidence {confidence:.2f})")
+        return {
+            'command': phrase.command,
+            'original_text': spoken_text,
+            'matched_pattern': phrase.pattern.pattern,
+            'matched_phrase': phrase.text,
+            'parameters': params,
+            'confidence': round(confidence, 3),
+            'fuzzy': True
+        }
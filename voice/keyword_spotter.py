@@ -0,0 +1,418 @@
+"""
+🔑 Glenn.AI Offline Keyword Spotter
+Local wake-word detection: streaming MFCC features matched to enrolled templates with DTW
+"""
+
+import logging
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # Optional: without NumPy wake words go through the recognizer
+    np = None
+
+logger = logging.getLogger(__name__)
+
+TEMPLATE_PATH = Path(__file__).parent.parent / "data" / "wake_templates.npz"
+
+FRAME_MS = 25             # Analysis window
+HOP_MS = 10               # Frame step
+N_MELS = 26               # Mel filterbank size
+N_MFCC = 13               # Cepstral coefficients kept (c0 is dropped before matching)
+PRE_EMPHASIS = 0.97
+DYNAMIC_RANGE_DB = 30.0   # Mel bands are floored this far below the frame's loudest band
+MEL_LOW_HZ = 80.0
+MEL_HIGH_HZ = 7600.0
+MEL_FLOOR = 10 ** (-DYNAMIC_RANGE_DB / 10)
+CHECK_EVERY = 5           # Frames between template matches (5 x 10 ms)
+WINDOW_SLACK = 1.5        # Stream window length relative to the longest template
+DEFAULT_THRESHOLD = 0.9   # Mean per-frame DTW distance accepted as a match
+THRESHOLD_MARGIN = 2.5    # Enrolled threshold = worst template-to-template distance x margin
+                          # (recordings from one session agree more closely than later use)
+SILENCE_DB = 35.0         # Frames this far below a recording's peak are trimmed at enrollment
+
+def is_available() -> bool:
+    """True when NumPy is installed."""
+    return np is not None
+
+@lru_cache(maxsize=8)
+def _mel_filterbank(sample_rate: int, n_fft: int, n_mels: int):
+    def hz_to_mel(hz):
+        return 2595.0 * np.log10(1.0 + hz / 700.0)
+
+    def mel_to_hz(mel):
+        return 700.0 * (10 ** (mel / 2595.0) - 1.0)
+
+    high = min(MEL_HIGH_HZ, sample_rate / 2)
+    mels = np.linspace(hz_to_mel(MEL_LOW_HZ), hz_to_mel(high), n_mels + 2)
+    bins = np.floor((n_fft + 1) * mel_to_hz(mels) / sample_rate).astype(int)
+    bank = np.zeros((n_mels, n_fft // 2 + 1))
+    for m in range(1, n_mels + 1):
+        left, center, right = bins[m - 1], bins[m], bins[m + 1]
+        if center > left:
+            bank[m - 1, left:center] = (np.arange(left, center) - left) / (center - left)
+        if right > center:
+            bank[m - 1, center:right] = (right - np.arange(center, right)) / (right - center)
+    return bank
+
+@lru_cache(maxsize=8)
+def _dct_matrix(n_mels: int, n_mfcc: int):
+    n = np.arange(n_mels)
+    k = np.arange(n_mfcc)[:, None]
+    matrix = np.cos(np.pi / n_mels * (n + 0.5) * k) * np.sqrt(2.0 / n_mels)
+    matrix[0] /= np.sqrt(2.0)
+    return matrix.T  # (n_mels, n_mfcc)
+
+@lru_cache(maxsize=8)
+def _window(frame_length: int):
+    return np.hamming(frame_length)
+
+def frame_geometry(sample_rate: int) -> Tuple[int, int, int]:
+    """(frame length, hop, FFT size) in samples for a sample rate."""
+    frame_length = int(sample_rate * FRAME_MS / 1000)
+    hop = int(sample_rate * HOP_MS / 1000)
+    n_fft = 1 << (frame_length - 1).bit_length()
+    return frame_length, hop, n_fft
+
+def pcm_to_float(pcm: bytes, sample_width: int = 2):
+    """Little-endian PCM bytes -> float32 samples in [-1, 1)."""
+    dtype = {1: np.int8, 2: np.int16, 4: np.int32}[sample_width]
+    usable = len(pcm) - len(pcm) % sample_width
+    return np.frombuffer(pcm[:usable], dtype=dtype).astype(np.float32) / float(2 ** (8 * sample_width - 1))
+
+def mfcc(samples, sample_rate: int, previous: float = 0.0):
+    """
+    MFCC features for every complete frame of `samples`.
+
+    Args:
+        samples: float samples (1-D array)
+        sample_rate: Samples per second
+        previous: Sample preceding `samples`, for continuous pre-emphasis
+
+    Returns:
+        (features (frames, N_MFCC), log frame energies (frames,))
+    """
+    frame_length, hop, n_fft = frame_geometry(sample_rate)
+    if len(samples) < frame_length:
+        return np.empty((0, N_MFCC)), np.empty(0)
+    emphasized = np.append(samples[0] - PRE_EMPHASIS * previous, samples[1:] - PRE_EMPHASIS * samples[:-1])
+    count = 1 + (len(emphasized) - frame_length) // hop
+    frames = np.lib.stride_tricks.as_strided(
+        emphasized, shape=(count, frame_length),
+        strides=(emphasized.strides[0] * hop, emphasized.strides[0]))
+    power = np.abs(np.fft.rfft(frames * _window(frame_length), n_fft)) ** 2 / n_fft
+    mel_energy = np.maximum(power @ _mel_filterbank(sample_rate, n_fft, N_MELS).T, 1e-10)
+    # Clamp spectral valleys to a fixed range below each frame's peak so the
+    # room's noise floor (quiet enrollment vs. noisy use) does not dominate
+    mel_energy = np.maximum(mel_energy, mel_energy.max(axis=1, keepdims=True) * MEL_FLOOR)
+    features = np.log(mel_energy) @ _dct_matrix(N_MELS, N_MFCC)
+    log_energy = np.log(np.maximum(power.sum(axis=1), 1e-10))
+    return features, log_energy
+
+def _normalize(features):
+    """
+    Drop c0 so the match ignores loudness.
+
+    Mean normalization is left out on purpose: a stream window also holds
+    silence, so its mean would not match the template's.
+    """
+    return features[:, 1:]
+
+def subsequence_dtw(template, stream) -> Tuple[float, int]:
+    """
+    Best alignment of a whole template against any stretch of a stream.
+
+    Each row of the DTW recurrence is computed with NumPy: the horizontal
+    dependency D[j] = min(t[j], D[j-1] + c[j]) is resolved with a running
+    minimum over cumulative costs, so only the template axis is a Python loop.
+
+    Args:
+        template: (n, d) template features
+        stream: (m, d) stream features
+
+    Returns:
+        (mean per-template-frame distance, stream frame where the match ends)
+    """
+    sq = (template ** 2).sum(axis=1)[:, None] + (stream ** 2).sum(axis=1)[None, :] - 2.0 * template @ stream.T
+    cost = np.sqrt(np.maximum(sq, 0.0)) / np.sqrt(template.shape[1])
+    row = cost[0].copy()  # Free start anywhere in the stream
+    for i in range(1, len(template)):
+        c = cost[i]
+        diagonal = np.empty_like(row)
+        diagonal[0] = np.inf
+        diagonal[1:] = row[:-1]
+        step = c + np.minimum(row, diagonal)
+        cumulative = np.cumsum(c)
+        row = np.minimum.accumulate(step - cumulative) + cumulative
+    end = int(np.argmin(row))
+    return float(row[end] / len(template)), end
+
+class KeywordSpotter:
+    """Streams audio through MFCC extraction and DTW-matches it to enrolled wake words."""
+
+    def __init__(self, sample_rate: int = 16000, sample_width: int = 2,
+                 templates: Optional[Dict[str, list]] = None, threshold: Optional[float] = None):
+        """
+        Initialize keyword spotter.
+
+        Args:
+            sample_rate: Input sample rate (templates must use the same rate)
+            sample_width: Input bytes per sample
+            templates: keyword -> list of (frames, N_MFCC) feature arrays
+            threshold: Match threshold (None = derive from templates)
+        """
+        if np is None:
+            raise RuntimeError("NumPy is required for local wake-word detection")
+        self.sample_rate = sample_rate
+        self.sample_width = sample_width
+        self.templates: Dict[str, List] = {k: list(v) for k, v in (templates or {}).items()}
+        self.threshold = threshold if threshold is not None else self._derived_threshold()
+        self.last_check_seconds = 0.0  # Compute time of the most recent match
+        self.last_distance = float("inf")
+        self.reset()
+
+    @property
+    def keywords(self) -> List[str]:
+        return list(self.templates)
+
+    def reset(self):
+        """Forget buffered audio (e.g. after a detection or when listening restarts)."""
+        self._pending = np.empty(0, dtype=np.float32)
+        self._previous = 0.0
+        self._features = np.empty((0, N_MFCC))
+        self._since_check = 0
+        self._quiet_frames = 0  # Frames since the last chunk above the energy threshold
+
+    def features_for(self, pcm: bytes):
+        """Trimmed MFCC features of a complete recording (for enrollment)."""
+        features, energy = mfcc(pcm_to_float(pcm, self.sample_width), self.sample_rate)
+        if not len(features):
+            return features
+        voiced = np.nonzero(energy > energy.max() - SILENCE_DB * np.log(10) / 10)[0]
+        return features[voiced[0]:voiced[-1] + 1]
+
+    def enroll(self, keyword: str, pcm: bytes) -> int:
+        """
+        Add a recording of `keyword` as a template.
+
+        Args:
+            keyword: Wake word the recording contains
+            pcm: Raw PCM bytes at this spotter's rate and width
+
+        Returns:
+            Number of templates for the keyword
+        """
+        features = self.features_for(pcm)
+        if len(features) < 10:
+            raise ValueError("Recording too short to enroll")
+        self.templates.setdefault(keyword, []).append(features)
+        self.threshold = self._derived_threshold()
+        return len(self.templates[keyword])
+
+    def _derived_threshold(self) -> float:
+        """Worst distance between templates of the same keyword, plus margin."""
+        worst = 0.0
+        for templates in self.templates.values():
+            for i, a in enumerate(templates):
+                for b in templates[i + 1:]:
+                    worst = max(worst, subsequence_dtw(_normalize(a), _normalize(b))[0])
+        return worst * THRESHOLD_MARGIN if worst else DEFAULT_THRESHOLD
+
+    def process(self, pcm: bytes, energy_threshold: Optional[float] = None, vad=None) -> Optional[Tuple[str, float]]:
+        """
+        Feed captured audio; returns (keyword, distance) when a wake word ends in it.
+
+        Args:
+            pcm: Raw PCM bytes
+            energy_threshold: RMS speech threshold (recognizer scale); template
+                matching is skipped while the whole window stays below it
+            vad: Optional VoiceActivityDetector; when given, matching is
+                skipped while the window holds no speech frames instead
+
+        Returns:
+            Detection or None
+        """
+        chunk = pcm_to_float(pcm, self.sample_width)
+        samples = np.concatenate((self._pending, chunk))
+        frame_length, hop, _ = frame_geometry(self.sample_rate)
+        features, _ = mfcc(samples, self.sample_rate, self._previous)
+        if not len(features):
+            self._pending = samples
+            return None
+        consumed = len(features) * hop
+        self._previous = float(samples[consumed - 1])
+        self._pending = samples[consumed:]
+
+        longest = max((len(t) for ts in self.templates.values() for t in ts), default=0)
+        window = int(longest * WINDOW_SLACK) or 1
+        self._features = np.concatenate((self._features, features))[-window:]
+        if vad is not None:
+            speaking = vad.is_speech(pcm, energy_threshold or 0.0)
+        elif energy_threshold is not None and len(chunk):
+            speaking = float(np.sqrt(np.mean(chunk * chunk))) * 2 ** (8 * self.sample_width - 1) > energy_threshold
+        else:
+            speaking = True
+        self._quiet_frames = 0 if speaking else self._quiet_frames + len(features)
+        self._since_check += len(features)
+        if self._since_check < CHECK_EVERY or len(self._features) < longest:
+            return None
+        self._since_check = 0
+        if self._quiet_frames > window:
+            return None  # Nothing but background noise in the window
+
+        started = time.perf_counter()
+        stream = _normalize(self._features)
+        best = (float("inf"), None)
+        for keyword, templates in self.templates.items():
+            for template in templates:
+                distance, _ = subsequence_dtw(_normalize(template), stream)
+                if distance < best[0]:
+                    best = (distance, keyword)
+        self.last_check_seconds = time.perf_counter() - started
+        self.last_distance = best[0]
+
+        if best[1] is not None and best[0] <= self.threshold:
+            self.reset()  # One detection per utterance
+            return best[1], best[0]
+        return None
+
+    def listen(self, source, timeout: float, energy_threshold: Optional[float] = None,
+               vad=None) -> Optional[Tuple[str, float]]:
+        """
+        Read an entered audio source until a wake word or `timeout` seconds of audio.
+
+        Args:
+            source: Entered AudioSource (e.g. voice.audio_capture.CaptureSource)
+            timeout: Seconds of audio to examine
+            energy_threshold: Passed to process()
+            vad: Passed to process()
+
+        Returns:
+            (keyword, distance) or None
+        """
+        seconds_per_chunk = source.CHUNK / source.SAMPLE_RATE
+        elapsed = 0.0
+        while elapsed < timeout:
+            chunk = source.stream.read(source.CHUNK)
+            if not chunk:
+                return None
+            elapsed += seconds_per_chunk
+            hit = self.process(chunk, energy_threshold, vad)
+            if hit:
+                return hit
+        return None
+
+    def save(self, path: Path = TEMPLATE_PATH):
+        """Write templates and threshold to an .npz file."""
+        arrays = {}
+        names = []
+        for keyword, templates in self.templates.items():
+            for template in templates:
+                arrays[f"template_{len(names)}"] = template
+                names.append(keyword)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        np.savez(path, names=np.array(names), threshold=np.array(self.threshold),
+                 sample_rate=np.array(self.sample_rate), **arrays)
+        logger.info(f"Saved {len(names)} wake-word templates to {path}")
+
+    @classmethod
+    def load(cls, sample_rate: int, sample_width: int = 2, path: Path = TEMPLATE_PATH) -> Optional["KeywordSpotter"]:
+        """
+        Spotter with the enrolled templates, or None if there are none (or no NumPy).
+
+        Args:
+            sample_rate: Rate of the audio that will be fed in
+            sample_width: Bytes per sample of that audio
+            path: Template file
+
+        Returns:
+            KeywordSpotter or None
+        """
+        if np is None or not path.exists():
+            return None
+        try:
+            with np.load(path) as data:
+                if int(data["sample_rate"]) != sample_rate:
+                    logger.warning(f"Wake-word templates were enrolled at {int(data['sample_rate'])} Hz, "
+                                   f"microphone runs at {sample_rate} Hz - re-enroll to use local detection")
+                    return None
+                templates: Dict[str, list] = {}
+                for i, keyword in enumerate(data["names"]):
+                    templates.setdefault(str(keyword), []).append(data[f"template_{i}"])
+                threshold = float(data["threshold"])
+        except Exception as e:
+            logger.error(f"Failed to load wake-word templates: {e}")
+            return None
+        return cls(sample_rate, sample_width, templates, threshold)
+
+def _enroll(keyword: str, samples: int):
+    """Record `samples` utterances of a wake word from the microphone and save them."""
+    import speech_recognition as sr
+    from .audio_capture import acquire_capture
+
+    capture = acquire_capture()
+    try:
+        recognizer = sr.Recognizer()
+        capture.calibrate(recognizer)
+        spotter = KeywordSpotter.load(capture.sample_rate, capture.sample_width) \
+            or KeywordSpotter(capture.sample_rate, capture.sample_width)
+        for n in range(samples):
+            print(f"🎤 Say '{keyword}' ({n + 1}/{samples})...")
+            with capture.source() as source:
+                audio = recognizer.listen(source, timeout=10, phrase_time_limit=3)
+            count = spotter.enroll(keyword, audio.frame_data)
+            print(f"   ✅ Recorded ({count} templates)")
+        spotter.save()
+        print(f"Threshold: {spotter.threshold:.3f}")
+    finally:
+        capture.release()
+
+def _benchmark():
+    """Detection latency on synthetic audio (python -m voice.keyword_spotter bench)."""
+    rng = np.random.default_rng(3)
+    rate = 16000
+
+    def word(formants, seconds, tempo=1.0):
+        # Crude vowel-like glides standing in for a spoken keyword
+        t = np.arange(int(rate * seconds / tempo)) / rate
+        track = np.interp(np.linspace(0, 1, len(t)), np.linspace(0, 1, len(formants)), formants)
+        signal = np.sin(2 * np.pi * np.cumsum(track) / rate) + 0.5 * np.sin(4 * np.pi * np.cumsum(track) / rate)
+        return (signal * np.hanning(len(t)) * 8000).astype(np.int16)
+
+    def noisy(signal):
+        return (signal + rng.normal(0, 150, len(signal))).astype(np.int16)
+
+    glenn = [300, 900, 700, 400]
+    spotter = KeywordSpotter(rate)
+    for tempo in (0.9, 1.0, 1.1):
+        spotter.enroll("glenn", noisy(word(glenn, 0.6, tempo)).tobytes())
+
+    silence = noisy(np.zeros(rate, dtype=np.int16))
+    cases = {"glenn (slow)": word(glenn, 0.6, 0.85), "other word": word([800, 300, 1200, 600], 0.6)}
+    chunk = 1024 * 2
+    print(f"threshold {spotter.threshold:.3f}")
+    for name, signal in cases.items():
+        spotter.reset()
+        audio = np.concatenate((silence, noisy(signal), silence)).tobytes()
+        checks, distances, hit = [], [], None
+        for offset in range(0, len(audio), chunk):
+            spotter.last_check_seconds = 0.0
+            hit = spotter.process(audio[offset:offset + chunk], energy_threshold=300) or hit
+            if spotter.last_check_seconds:
+                checks.append(spotter.last_check_seconds)
+                distances.append(spotter.last_distance)
+        print(f"{name:>14}: detected={hit is not None} min distance={min(distances):.3f} "
+              f"worst check {max(checks) * 1000:.1f} ms")
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) > 2 and sys.argv[1] == "enroll":
+        _enroll(sys.argv[2], int(sys.argv[3]) if len(sys.argv) > 3 else 3)
+    elif len(sys.argv) > 1 and sys.argv[1] == "bench":
+        _benchmark()
+    else:
+        print("Usage: python -m voice.keyword_spotter enroll <wake word> [samples] | bench")
@@ -0,0 +1,458 @@
+"""
+🔀 Glenn.AI Voice Pipeline
+Listening, recognition, command execution, speech output and logging as concurrent stages
+"""
+
+import concurrent.futures
+import logging
+import queue
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from core import metrics
+from . import vad
+from .audio_capture import frame_rms
+from .voice_commands import CommandSpeculation
+
+logger = logging.getLogger(__name__)
+
+QUEUE_SIZE = 4            # Items waiting between two stages
+HANDLER_WORKERS = 4       # Command handlers that may run at once
+HANDLER_TIMEOUT = 15.0    # Seconds before the user is told a command is taking long
+PROMPT_WAIT = 5.0         # Longest wait for the listening prompt before capturing anyway
+POLL_SECONDS = 0.2        # How often idle stages check for shutdown
+BARGE_IN_RATIO = 2.0      # While we talk, the user must be this much louder than the
+                          # ambient threshold (our own voice leaks into the microphone)
+
+PROMPT = "Yes? I'm listening."
+NOT_HEARD = "I didn't hear anything. Try again when you're ready."
+TOO_SLOW = "Sorry, that is taking too long. Please try again."
+STILL_WORKING = "That is taking a while. I'll tell you when it's done."
+FAILED = "Sorry, something went wrong with that command."
+
+STAGE_DROPS = metrics.counter("glenn_voice_pipeline_dropped_total",
+                              "Stale items dropped because the next stage was full", ["stage"])
+STAGE_WAITS = metrics.counter("glenn_voice_pipeline_waits_total",
+                              "Times a stage waited for room in the next stage's queue", ["stage"])
+HANDLER_TIMEOUTS = metrics.counter("glenn_voice_handler_timeouts_total", "Command handlers that missed their deadline")
+BARGE_INS = metrics.counter("glenn_voice_barge_ins_total", "Spoken responses cut off because the user spoke")
+INLINE_COMMANDS = metrics.counter("glenn_voice_inline_commands_total",
+                                  "Commands said in the same phrase as the wake word")
+
+class _Speech:
+    """Something for the speech stage to say (a command response or a system prompt)."""
+
+    __slots__ = ("response", "command_text", "speech_end", "exit", "done")
+
+    def __init__(self, response: Any, command_text: Optional[str] = None, speech_end: Optional[float] = None,
+                 exit: bool = False):
+        self.response = response          # Text, or an iterable of fragments
+        self.command_text = command_text  # What the user said (None for prompts)
+        self.speech_end = speech_end      # When the user stopped speaking
+        self.exit = exit                  # Stop the assistant once spoken
+        self.done = threading.Event()
+
+class _Job:
+    """A command handler running on the pool."""
+
+    __slots__ = ("command_text", "speech_end", "writes", "timer", "timed_out", "finished", "lock")
+
+    def __init__(self, command_text: str, speech_end: Optional[float], writes: bool):
+        self.command_text = command_text
+        self.speech_end = speech_end
+        self.writes = writes            # May have side effects, so it is never abandoned
+        self.timer: Optional[threading.Timer] = None
+        self.timed_out = False
+        self.finished = False
+        self.lock = threading.Lock()
+
+class VoicePipeline:
+    """
+    Runs the assistant's voice loop as stages joined by bounded queues.
+
+    listen -> recognize -> execute -> speak -> log
+
+    While a response is spoken, a watcher runs the VAD over the microphone
+    and the user starting to talk cuts the response off (barge-in). A full
+    speak queue drops its oldest item, since a stale answer is worse than
+    none; the other stages wait for room, so commands and log entries are
+    never lost and a backlog slows capture down instead.
+
+    Command handlers run concurrently. A read-only command that misses its
+    deadline is answered with an apology and its late answer is dropped;
+    a command that may write is never abandoned, so the user is told it is
+    still running and hears its answer when it finishes.
+    """
+
+    def __init__(self, assistant, queue_size: int = QUEUE_SIZE, handler_workers: int = HANDLER_WORKERS,
+                 handler_timeout: float = HANDLER_TIMEOUT):
+        """
+        Initialize pipeline.
+
+        Args:
+            assistant: GlennVoiceAssistant whose components the stages use
+            queue_size: Capacity of each inter-stage queue
+            handler_workers: Thread pool size for command handlers
+            handler_timeout: Seconds a handler may run before a fallback answer
+        """
+        self.assistant = assistant
+        self.handler_workers = handler_workers
+        self.handler_timeout = handler_timeout
+        self.recognize_queue: "queue.Queue" = queue.Queue(maxsize=queue_size)
+        self.execute_queue: "queue.Queue" = queue.Queue(maxsize=queue_size)
+        self.speak_queue: "queue.Queue" = queue.Queue(maxsize=queue_size)
+        self.log_queue: "queue.Queue" = queue.Queue(maxsize=queue_size * 4)
+        self.executor: Optional[concurrent.futures.ThreadPoolExecutor] = None
+
+        self._running = False
+        self._threads = []
+        self._speaking = threading.Event()
+        self._cancel = threading.Event()
+        self._speaking_text = ""  # Response being spoken, to tell our own voice from the user's
+
+    def start(self):
+        """Start all stages."""
+        if self._running:
+            return
+        self._running = True
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=self.handler_workers,
+                                                              thread_name_prefix="glenn-voice-handler")
+        stages = (("listen", self._listen_stage), ("recognize", self._recognize_stage),
+                  ("execute", self._execute_stage), ("speak", self._speak_stage), ("log", self._log_stage),
+                  ("barge-in", self._barge_in_stage))
+        self._threads = [threading.Thread(target=target, name=f"glenn-voice-{name}", daemon=True)
+                         for name, target in stages]
+        for thread in self._threads:
+            thread.start()
+        logger.info("Voice pipeline started")
+
+    def stop(self, timeout: float = 2.0):
+        """Stop all stages (pending items are discarded)."""
+        if not self._running:
+            return
+        self._running = False
+        self.interrupt()
+        for thread in self._threads:
+            if thread is not threading.current_thread():
+                thread.join(timeout)
+        if self.executor is not None:
+            self.executor.shutdown(wait=False)
+        logger.info("Voice pipeline stopped")
+
+    def wait(self):
+        """Block until the pipeline is stopped."""
+        while self._running:
+            time.sleep(POLL_SECONDS)
+
+    @property
+    def is_running(self) -> bool:
+        return self._running
+
+    @property
+    def is_speaking(self) -> bool:
+        return self._speaking.is_set()
+
+    def say(self, text: str) -> threading.Event:
+        """
+        Queue a system message for the speech stage.
+
+        Returns:
+            Event set once it has been spoken (or dropped)
+        """
+        speech = _Speech(text)
+        self._put(self.speak_queue, speech, "speak")
+        return speech.done
+
+    def interrupt(self) -> bool:
+        """
+        Cut off the response being spoken and drop queued ones (barge-in).
+
+        Returns:
+            True if something was being spoken
+        """
+        while True:
+            try:
+                speech = self.speak_queue.get_nowait()
+            except queue.Empty:
+                break
+            speech.done.set()
+            if speech.command_text is not None:
+                self._put(self.log_queue, (speech.command_text, None), "log")  # Heard, never answered
+        if not self._speaking.is_set():
+            return False
+        self._cancel.set()
+        self.assistant.text_to_speech.stop()
+        BARGE_INS.inc()
+        logger.info("Response interrupted")
+        return True
+
+    def _put(self, stage_queue: "queue.Queue", item, stage: str):
+        """
+        Queue an item for a stage. When the queue is full, speech drops its
+        oldest waiting item; other stages wait for room (until stopped).
+        """
+        if stage_queue is not self.speak_queue:
+            try:
+                stage_queue.put_nowait(item)
+                return
+            except queue.Full:
+                STAGE_WAITS.labels(stage=stage).inc()
+                logger.warning(f"Voice pipeline {stage} stage is behind; waiting for room")
+            while self._running:
+                try:
+                    stage_queue.put(item, timeout=POLL_SECONDS)
+                    return
+                except queue.Full:
+                    continue
+            return
+        while True:
+            try:
+                stage_queue.put_nowait(item)
+                return
+            except queue.Full:
+                try:
+                    dropped = stage_queue.get_nowait()
+                except queue.Empty:
+                    continue
+                if isinstance(dropped, _Speech):
+                    dropped.done.set()
+                STAGE_DROPS.labels(stage=stage).inc()
+                logger.warning(f"Voice pipeline {stage} stage is behind; dropped its oldest item")
+
+    def _get(self, stage_queue: "queue.Queue"):
+        try:
+            return stage_queue.get(timeout=POLL_SECONDS)
+        except queue.Empty:
+            return None
+
+    def _listen_stage(self):
+        assistant = self.assistant
+        while self._running:
+            if not assistant.is_listening:
+                time.sleep(POLL_SECONDS)
+                continue
+            try:
+                detection = assistant.wake_detector.detect(timeout=assistant.wake_timeout)
+                if not detection or not self._running:
+                    continue
+                if self._speaking.is_set() and assistant.wake_detector.is_wake_word(self._speaking_text):
+                    continue  # Our own voice saying the wake word
+
+                logger.info(f"Wake word detected: {detection.wake_word}")
+                print(f"🎧 Wake word detected: {detection.wake_word}")
+                self.interrupt()  # Usually the barge-in watcher already has
+
+                # "Hey Glenn, what time is it": the command is already recognized,
+                # so there is no prompt and no second capture (a phrase that only
+                # mentions Glenn carries no command and gets the prompt)
+                if detection.command_text:
+                    INLINE_COMMANDS.inc()
+                    self._put(self.execute_queue, (detection.command_text, detection.speech_end, None), "execute")
+                    continue
+
+                # Safe commands are answered from partial transcripts while the user talks
+                speculation = CommandSpeculation(assistant.command_handler)
+                utterance = assistant.speech_to_text.capture_phrase(
+                    timeout=assistant.command_timeout,
+                    phrase_time_limit=10.0,
+                    start_position=self._command_start(),
+                    on_partial=speculation.hypothesis
+                )
+                if utterance is None:
+                    speculation.take(None)
+                    self.say(NOT_HEARD)
+                    continue
+                self._put(self.recognize_queue, (utterance, speculation), "recognize")
+            except Exception as e:
+                logger.error(f"Voice listen stage error: {e}")
+                time.sleep(1.0)  # Longer delay on error
+
+    def _command_start(self) -> Optional[int]:
+        """Capture position the command starts from, prompting if nothing was said yet."""
+        # Speech that followed the wake word while it was being detected is
+        # already in the capture buffer; use it instead of prompting
+        start = self.assistant.wake_detector.last_position
+        stt = self.assistant.speech_to_text
+        capture = stt.capture
+        if start is not None and capture is not None and capture.has_speech_since(
+                start, stt.recognizer.energy_threshold):
+            return start
+        # Capture from the end of the prompt so it is not heard as the command
+        self.say(PROMPT).wait(PROMPT_WAIT)
+        return capture.head if capture is not None else None
+
+    def _recognize_stage(self):
+        while self._running:
+            item = self._get(self.recognize_queue)
+            if item is None:
+                continue
+            utterance, speculation = item
+            try:
+                text = self.assistant.speech_to_text.transcribe(utterance)
+            except Exception as e:
+                logger.error(f"Voice recognize stage error: {e}")
+                text = None
+            if text:
+                self._put(self.execute_queue, (text, utterance.speech_end, speculation), "execute")
+            else:
+                speculation.take(None)
+                self.say(NOT_HEARD)
+
+    def _execute_stage(self):
+        while self._running:
+            item = self._get(self.execute_queue)
+            if item is None:
+                continue
+            command_text, speech_end, speculation = item
+            print(f"[You 🎤]: {command_text}")
+            logger.info(f"Command received: {command_text}")
+
+            # Handlers run on the pool; the stage moves on to the next command
+            job = _Job(command_text, speech_end, self._may_write(command_text))
+            job.timer = threading.Timer(self.handler_timeout, self._handler_slow, args=(job,))
+            job.timer.daemon = True
+            job.timer.start()
+            future = self.executor.submit(self.assistant._execute_voice_command, command_text, speculation)
+            future.add_done_callback(lambda f, job=job: self._handler_done(job, f))
+
+    def _may_write(self, command_text: str) -> bool:
+        """Whether the command may have side effects (only read-only commands are abandoned)."""
+        handler = self.assistant.command_handler
+        if self.assistant.unconfirmed is not None and handler.is_confirmation(command_text):
+            return True  # Runs the command asked about
+        command_info = handler.parse_command(command_text)
+        return command_info is not None and not handler.is_speculative(command_info['command'])
+
+    def _handler_slow(self, job: _Job):
+        with job.lock:
+            if job.finished:
+                return
+            job.timed_out = True
+        HANDLER_TIMEOUTS.inc()
+        logger.warning(f"Command '{job.command_text}' exceeded {self.handler_timeout:g}s")
+        if job.writes:
+            # Retrying a write that is still running would repeat it
+            self.say(STILL_WORKING)
+        else:
+            self._put(self.speak_queue, _Speech(TOO_SLOW, job.command_text, job.speech_end), "speak")
+
+    def _handler_done(self, job: _Job, future: concurrent.futures.Future):
+        job.timer.cancel()
+        with job.lock:
+            job.finished = True
+            abandoned = job.timed_out and not job.writes
+        if abandoned or not self._running:
+            logger.info(f"Dropped the late answer to '{job.command_text}'")
+            return
+        try:
+            response = future.result()
+        except Exception as e:
+            logger.error(f"Command '{job.command_text}' failed: {e}")
+            response = FAILED
+
+        if response == "VOICE_EXIT":
+            self._put(self.speak_queue, _Speech("Voice assistant deactivated. Goodbye!", exit=True), "speak")
+        elif response:
+            self._put(self.speak_queue, _Speech(response, job.command_text, job.speech_end), "speak")
+        else:
+            self._put(self.log_queue, (job.command_text, response), "log")
+
+    def _speak_stage(self):
+        assistant = self.assistant
+        while self._running:
+            speech = self._get(self.speak_queue)
+            if speech is None:
+                continue
+            self._cancel.clear()
+            self._speaking_text = speech.response if isinstance(speech.response, str) else ""
+            self._speaking.set()
+            try:
+                if speech.command_text is None:
+                    assistant.speak(speech.response)
+                    spoken = speech.response
+                elif isinstance(speech.response, str):
+                    assistant._observe_turnaround(speech.speech_end)
+                    assistant.speak(speech.response)
+                    spoken = speech.response
+                else:
+                    # Streaming response: speak each sentence as it is generated
+                    spoken = assistant.speak_stream(
+                        assistant._timed_fragments(speech.response, speech.speech_end), cancel=self._cancel)
+            except Exception as e:
+                logger.error(f"Voice speak stage error: {e}")
+                spoken = None
+            finally:
+                self._speaking.clear()
+                self._speaking_text = ""
+                speech.done.set()
+
+            if speech.command_text is not None:
+                self._put(self.log_queue, (speech.command_text, spoken), "log")
+            if speech.exit:
+                assistant.stop()
+
+    def _barge_in_stage(self):
+        while self._running:
+            if not self._speaking.wait(POLL_SECONDS):
+                continue
+            stt = self.assistant.speech_to_text
+            capture = stt.capture
+            if capture is None or not capture.is_running:
+                time.sleep(POLL_SECONDS)
+                continue
+            try:
+                self._watch_for_barge_in(capture, stt.recognizer.energy_threshold * BARGE_IN_RATIO)
+            except Exception as e:
+                logger.error(f"Voice barge-in stage error: {e}")
+            # One check per response: wait for it to end
+            while self._speaking.is_set() and self._running:
+                time.sleep(POLL_SECONDS / 4)
+
+    def _watch_for_barge_in(self, capture, energy_threshold: float) -> bool:
+        """
+        Read the microphone while a response is spoken; interrupt it when speech starts.
+
+        Args:
+            capture: Shared AudioCapture to read from its head
+            energy_threshold: RMS level counted as the user talking
+
+        Returns:
+            True if the response was interrupted
+        """
+        detector = vad.VoiceActivityDetector(capture.sample_rate, capture.sample_width) if vad.is_available() else None
+        position = capture.head
+        loud = 0
+        while self._speaking.is_set() and self._running:
+            chunk, position = capture.read(position)
+            if not chunk:
+                return False
+            if detector is not None:
+                started = detector.is_speech(chunk, energy_threshold)
+            else:
+                # Without NumPy: consecutive loud chunks, like the VAD's onset
+                loud = loud + 1 if frame_rms(chunk, capture.sample_width) > energy_threshold else 0
+                started = loud >= vad.ONSET_FRAMES
+            if started:
+                logger.info("User started speaking over the response")
+                return self.interrupt()
+        return False
+
+    def _log_stage(self):
+        while self._running or not self.log_queue.empty():
+            item = self._get(self.log_queue)
+            if item is not None:
+                self.assistant._log_interaction(*item)
+
+    def get_status(self) -> Dict[str, Any]:
+        """Queue depths and speaking state."""
+        return {
+            'running': self._running,
+            'speaking': self._speaking.is_set(),
+            'queued': {
+                'recognize': self.recognize_queue.qsize(),
+                'execute': self.execute_queue.qsize(),
+                'speak': self.speak_queue.qsize(),
+                'log': self.log_queue.qsize(),
+            },
+        }
@@ -4,29 +4,50 @@ Converts spoken audio to text
 """
 
 import logging
+import time
 import speech_recognition as sr
-from typing import Optional
+from typing import Callable, Optional
+
+from core import metrics
+from .audio_capture import acquire_capture
+from . import streaming_stt, vad
+from .stt_backends import BackendManager
+from .endpointing import Endpointer, Utterance
 
 logger = logging.getLogger(__name__)
 
+LISTEN_SECONDS = metrics.histogram("glenn_stt_listen_seconds", "Time spent capturing a phrase from the microphone")
+LISTEN_TIMEOUTS = metrics.counter("glenn_stt_listen_timeouts_total", "Listens that heard no speech before the timeout")
 class SpeechToText:
     """Converts speech to text using various recognition engines."""
     
     def __init__(self):
         """Initialize speech to text system."""
         self.recognizer = None
+        self.backends: Optional[BackendManager] = None  # Google, then Sphinx, behind circuit breakers
         self.microphone = None
+        self.capture = None
+        self.vad = None  # Trims captured phrases to their speech; None without NumPy
+        self.endpointer = None  # VAD-driven end of phrase; None falls back to the recognizer's pause
+        self.intent_complete: Optional[Callable[[str], bool]] = None  # Ends phrases early when set
+        self.streaming = None  # On-device incremental decoder; None re-recognizes at pauses instead
+        self.last_speech_end: Optional[float] = None  # time.monotonic() the last phrase's speech ended
         
     def initialize(self) -> bool:
         """Initialize speech recognition components."""
         try:
             self.recognizer = sr.Recognizer()
-            self.microphone = sr.Microphone()
+            if self.backends is not None:
+                self.backends.close()
+            self.backends = BackendManager(self.recognizer)
+            if self.capture is None:
+                self.capture = acquire_capture()
+            self.microphone = self.capture.source()
             
-            # Adjust for ambient noise
-            with self.microphone as source:
-                logger.info("Calibrating microphone for ambient noise...")
-                self.recognizer.adjust_for_ambient_noise(source, duration=1)
+            # Shared with the wake detector; saved per device and adapted in the background
+            self.capture.calibrate(self.recognizer)
+            self._create_vad()
+            self._create_streaming()
                 
             logger.info("Speech to text initialized")
             return True
@@ -35,17 +56,42 @@ class SpeechToText:
             logger.error(f"Failed to initialize speech to text: {e}")
             return False
     
-    def listen_for_speech(self, timeout: float = 5.0, phrase_time_limit: float = 10.0) -> Optional[str]:
+    def listen_for_speech(self, timeout: float = 5.0, phrase_time_limit: float = 10.0,
+                          start_position: Optional[int] = None) -> Optional[str]:
         """
         Listen for speech and convert to text.
         
         Args:
             timeout: Maximum time to wait for speech start
             phrase_time_limit: Maximum time for a complete phrase
+            start_position: Capture position to start from (e.g. the end of
+                the wake word) instead of live audio
             
         Returns:
             Recognized text or None if failed
         """
+        utterance = self.capture_phrase(timeout, phrase_time_limit, start_position)
+        if utterance is None:
+            return None
+        self.last_speech_end = utterance.speech_end
+        return self.transcribe(utterance)
+    
+    def capture_phrase(self, timeout: float = 5.0, phrase_time_limit: float = 10.0,
+                       start_position: Optional[int] = None,
+                       on_partial: Optional[Callable[[str], None]] = None) -> Optional[Utterance]:
+        """
+        Capture one spoken phrase without recognizing it (see transcribe()).
+        
+        Args:
+            timeout: Maximum time to wait for speech start
+            phrase_time_limit: Maximum time for a complete phrase
+            start_position: Capture position to start from instead of live audio
+            on_partial: Called with partial transcripts while the user speaks
+                (needs the endpointer)
+            
+        Returns:
+            Utterance or None if nothing was said
+        """
         if not self.recognizer or not self.microphone:
             logger.error("Speech recognition not initialized")
             return None
@@ -53,74 +99,122 @@ class SpeechToText:
         try:
             logger.info("Listening for speech...")
             
-            with self.microphone as source:
+            with self.microphone as source, LISTEN_SECONDS.time():
+                if start_position is not None:
+                    source.seek(start_position)
+                if self.endpointer:
+                    # Ends on the speaker's own pause length, or sooner once
+                    # the words so far are a complete command
+                    utterance = self.endpointer.listen(
+                        source,
+                        self.recognizer.energy_threshold,
+                        timeout=timeout,
+                        phrase_time_limit=phrase_time_limit,
+                        transcribe=self._partial_transcript if self.intent_complete or on_partial else None,
+                        is_complete=self.intent_complete,
+                        decoder=self.streaming.start() if self.streaming else None,
+                        on_partial=on_partial
+                    )
+                    if utterance is None:
+                        raise sr.WaitTimeoutError("listening timed out while waiting for phrase to start")
+                    return utterance
+                
                 # Listen for audio
                 audio = self.recognizer.listen(
                     source, 
                     timeout=timeout, 
                     phrase_time_limit=phrase_time_limit
                 )
-            
-            logger.info("Processing speech...")
-            
-            # Try Google Speech Recognition first
-            try:
-                text = self.recognizer.recognize_google(audio, language='en-US')
-                logger.info(f"Recognized (Google): {text}")
-                return text
-                
-            except sr.UnknownValueError:
-                logger.warning("Google Speech Recognition could not understand audio")
-                
-            except sr.RequestError as e:
-                logger.warning(f"Google Speech Recognition error: {e}")
-                
-                # Fallback to offline recognition if available
-                try:
-                    text = self.recognizer.recognize_sphinx(audio)
-                    logger.info(f"Recognized (Sphinx): {text}")
-                    return text
-                    
-                except sr.UnknownValueError:
-                    logger.warning("Sphinx could not understand audio")
-                except sr.RequestError as e:
-                    logger.warning(f"Sphinx error: {e}")
-            
-            return None
+                return Utterance(audio.frame_data, time.monotonic() - self.recognizer.pause_threshold, "silence")
             
         except sr.WaitTimeoutError:
             logger.info("No speech detected within timeout period")
+            LISTEN_TIMEOUTS.inc()
             return None
             
         except Exception as e:
             logger.error(f"Speech recognition error: {e}")
             return None
     
-    def recognize_from_audio_data(self, audio_data) -> Optional[str]:
+    def transcribe(self, utterance: Utterance) -> Optional[str]:
         """
-        Recognize speech from audio data.
+        Recognize a phrase from capture_phrase().
         
         Args:
-            audio_data: Audio data to process
+            utterance: Captured phrase
             
         Returns:
-            Recognized text or None
+            Recognized text or None if failed
         """
-        if not self.recognizer:
+        if utterance.transcript:
+            # A streamed or partial transcript that covers the whole phrase
+            logger.info(f"Recognized (partial): {utterance.transcript}")
+            self._record_recognition(True)
+            return utterance.transcript
+        if not self.backends:
             return None
-            
+        
+        audio = sr.AudioData(utterance.frame_data, self.capture.sample_rate, self.capture.sample_width)
+        
+        # Only the speech segment goes to the recognizer; noise alone skips it
+        if self.vad:
+            audio = self.vad.trim(audio, self.recognizer.energy_threshold)
+            if audio is None:
+                logger.info("No speech in captured audio, skipping recognition")
+                return None
+        
+        logger.info("Processing speech...")
+        
+        # Backends known to be down are skipped instead of timing out again
+        text = self.backends.recognize(audio)
+        if self.backends.last_backend:
+            self._record_recognition(bool(text))
+        return text
+    
+    def _create_vad(self):
+        if vad.is_available():
+            self.vad = vad.VoiceActivityDetector(self.capture.sample_rate, self.capture.sample_width)
+            if self.endpointer is not None:
+                self.endpointer.close()
+            self.endpointer = Endpointer(self.vad)
+    
+    def _create_streaming(self):
+        if self.streaming is not None or not streaming_stt.is_available():
+            return
+        if self.endpointer is None or self.capture.sample_width != 2:
+            logger.info("Streaming recognition needs NumPy and 16-bit audio; using pause-time partials")
+            return
         try:
-            # Try Google Speech Recognition
-            text = self.recognizer.recognize_google(audio_data, language='en-US')
-            return text
-            
-        except sr.UnknownValueError:
-            logger.warning("Could not understand audio")
+            self.streaming = streaming_stt.StreamingRecognizer(self.capture.sample_rate)
+        except Exception as e:
+            logger.warning(f"Streaming recognition unavailable: {e}")
+    
+    def _partial_transcript(self, pcm: bytes) -> Optional[str]:
+        """Transcript of the phrase so far, for early endpointing."""
+        if not self.backends:
             return None
+        audio = sr.AudioData(pcm, self.capture.sample_rate, self.capture.sample_width)
+        # Preferred backend only, and not at all while its circuit is open
+        return self.backends.recognize_one(self.backends.backends[0], audio)
+    
+    def _record_recognition(self, recognized: bool):
+        if self.vad:
+            vad.record_recognition(recognized)
+    
+    def recognize_from_audio_data(self, audio_data) -> Optional[str]:
+        """
+        Recognize speech from audio data.
+        
+        Args:
+            audio_data: Audio data to process
             
-        except sr.RequestError as e:
-            logger.error(f"Recognition service error: {e}")
+        Returns:
+            Recognized text or None
+        """
+        if not self.backends:
             return None
+        
+        return self.backends.recognize(audio_data)
     
     def test_microphone(self) -> bool:
         """Test if microphone is working."""
@@ -160,7 +254,18 @@ class SpeechToText:
     def set_microphone(self, device_index: Optional[int] = None):
         """Set specific microphone device."""
         try:
-            self.microphone = sr.Microphone(device_index=device_index)
+            capture = acquire_capture(device_index)
+            if self.capture is not None:
+                self.capture.release()
+            self.capture = capture
+            self.microphone = capture.source()
+            if self.recognizer is not None:
+                capture.calibrate(self.recognizer)
+                self._create_vad()
+                if self.streaming is not None and (self.streaming.sample_rate != capture.sample_rate
+                                                   or capture.sample_width != 2):
+                    self.streaming = None
+                self._create_streaming()
             logger.info(f"Set microphone to device index: {device_index}")
             
         except Exception as e:
@@ -168,6 +273,17 @@ class SpeechToText:
             
     def cleanup(self):
         """Clean up resources."""
+        if self.capture is not None:
+            self.capture.release()
+            self.capture = None
+        if self.endpointer is not None:
+            self.endpointer.close()
+            self.endpointer = None
+        self.streaming = None
+        if self.backends is not None:
+            self.backends.close()
+            self.backends = None
         self.recognizer = None
         self.microphone = None
+        self.vad = None
         logger.info("Speech to text cleaned up")
@@ -0,0 +1,91 @@
+"""
+📝 Glenn.AI Streaming Recognition
+On-device incremental decoding: partial transcripts while the user is still speaking
+"""
+
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Optional
+
+try:
+    import vosk
+except ImportError:  # Optional: without Vosk partials come from re-recognizing at pauses
+    vosk = None
+
+logger = logging.getLogger(__name__)
+
+MODEL_ENV = "GLENN_VOSK_MODEL"
+MODEL_PATH = Path(__file__).parent.parent / "data" / "vosk-model"
+
+def model_path() -> Path:
+    """Vosk model directory ($GLENN_VOSK_MODEL, else data/vosk-model)."""
+    return Path(os.environ.get(MODEL_ENV) or MODEL_PATH)
+
+def is_available() -> bool:
+    """True when Vosk is installed and a model has been downloaded."""
+    return vosk is not None and model_path().is_dir()
+
+class DecodeSession:
+    """Decodes one phrase chunk by chunk."""
+
+    def __init__(self, recognizer):
+        self._recognizer = recognizer
+        self._final = []   # Segments Vosk has already finalized
+        self._partial = ""
+        self._emitted = ""  # Last hypothesis returned by accept()
+
+    def accept(self, pcm: bytes) -> Optional[str]:
+        """
+        Decode a chunk of 16-bit mono PCM.
+
+        Returns:
+            The hypothesis so far when it changed, else None
+        """
+        if self._recognizer.AcceptWaveform(pcm):
+            text = json.loads(self._recognizer.Result()).get("text", "")
+            if text:
+                self._final.append(text)
+            self._partial = ""
+        else:
+            self._partial = json.loads(self._recognizer.PartialResult()).get("partial", "")
+        hypothesis = self.hypothesis
+        if not hypothesis or hypothesis == self._emitted:
+            return None
+        self._emitted = hypothesis
+        return hypothesis
+
+    @property
+    def hypothesis(self) -> str:
+        return " ".join(self._final + ([self._partial] if self._partial else []))
+
+    def finish(self) -> str:
+        """Flush the decoder and return the whole transcript."""
+        text = json.loads(self._recognizer.FinalResult()).get("text", "")
+        if text:
+            self._final.append(text)
+        self._partial = ""
+        return self.hypothesis
+
+class StreamingRecognizer:
+    """Loads a Vosk model once and starts a decode session per phrase."""
+
+    def __init__(self, sample_rate: int = 16000, path: Optional[Path] = None):
+        """
+        Initialize streaming recognizer.
+
+        Args:
+            sample_rate: Capture sample rate (audio must be 16-bit mono)
+            path: Model directory (defaults to model_path())
+        """
+        if vosk is None:
+            raise RuntimeError("Vosk is required for streaming recognition")
+        vosk.SetLogLevel(-1)
+        self.sample_rate = sample_rate
+        self.model = vosk.Model(str(path or model_path()))
+        logger.info(f"Streaming recognition model loaded from {path or model_path()}")
+
+    def start(self) -> DecodeSession:
+        """New decode session for one phrase."""
+        return DecodeSession(vosk.KaldiRecognizer(self.model, self.sample_rate))
@@ -0,0 +1,308 @@
+"""
+🔌 Glenn.AI Speech Recognition Backends
+Recognizer registry with per-backend circuit breakers and hedged requests
+"""
+
+import logging
+import threading
+import time
+from concurrent import futures
+from typing import Callable, Dict, List, Optional, Tuple
+
+import speech_recognition as sr
+
+from core import metrics
+
+logger = logging.getLogger(__name__)
+
+FAILURE_THRESHOLD = 3     # Consecutive failures that open a backend's circuit
+COOLDOWN_SECONDS = 30.0   # Open circuits let one trial request through after this long
+REQUEST_TIMEOUT = 5.0     # Longest wait for one backend before failing over
+WORKERS_PER_BACKEND = 2   # Requests one backend may have running at once
+HEDGE_DELAY = None        # Seconds before also asking the next backend (None = only on failure, 0 = race)
+
+RECOGNIZE_SECONDS = metrics.histogram("glenn_stt_recognize_seconds", "Speech recognition latency", ["engine"])
+RECOGNIZE_TOTAL = metrics.counter("glenn_stt_recognitions_total", "Speech recognition results", ["engine", "outcome"])
+BACKEND_UP = metrics.gauge("glenn_stt_backend_up", "1 while a recognition backend's circuit is closed", ["backend"])
+BACKEND_SKIPS = metrics.counter("glenn_stt_backend_skipped_total", "Requests not sent to a backend known to be down",
+                                ["backend"])
+HEDGED_TOTAL = metrics.counter("glenn_stt_hedged_requests_total", "Backends asked because an earlier one was slow")
+
+def timed_recognize(engine: str, recognize, audio, **kwargs) -> str:
+    """Run one recognizer call, recording its latency and outcome."""
+    started = time.perf_counter()
+    outcome = "error"
+    try:
+        text = recognize(audio, **kwargs)
+        outcome = "recognized"
+        return text
+    except sr.UnknownValueError:
+        outcome = "unknown"
+        raise
+    finally:
+        RECOGNIZE_SECONDS.labels(engine=engine).observe(time.perf_counter() - started)
+        RECOGNIZE_TOTAL.labels(engine=engine, outcome=outcome).inc()
+
+# name -> (recognize(recognizer, audio) -> text, online)
+_REGISTRY: Dict[str, Tuple[Callable, bool]] = {}
+
+def register_backend(name: str, recognize: Callable, online: bool = True):
+    """
+    Register a recognition backend.
+
+    Args:
+        name: Backend name (used in metrics and configuration)
+        recognize: Function (sr.Recognizer, sr.AudioData) -> text; raises
+            sr.UnknownValueError when there were no words and
+            sr.RequestError when the backend itself failed
+        online: Whether the backend needs the network
+    """
+    _REGISTRY[name] = (recognize, online)
+
+def registered_backends() -> List[str]:
+    """Backend names in registration (default preference) order."""
+    return list(_REGISTRY)
+
+register_backend("google", lambda recognizer, audio: recognizer.recognize_google(audio, language='en-US'))
+register_backend("sphinx", lambda recognizer, audio: recognizer.recognize_sphinx(audio), online=False)
+
+class CircuitBreaker:
+    """
+    Health of one backend.
+
+    Closed: requests go through. After `failure_threshold` consecutive
+    failures it opens and the backend is skipped without waiting on it.
+    After `cooldown` seconds one trial request is let through (half-open),
+    but only once earlier requests have finished; success closes the
+    circuit, failure opens it for another cooldown.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = FAILURE_THRESHOLD, cooldown: float = COOLDOWN_SECONDS):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.in_flight = 0  # Allowed requests not yet released
+        self._trial = False
+        self._lock = threading.Lock()
+        BACKEND_UP.labels(backend=name).set(1)
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.cooldown:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        """
+        Whether a request may be sent now (claims the trial when half-open).
+
+        An allowed request counts as in flight until release() is called.
+        """
+        with self._lock:
+            if self.opened_at is not None:
+                if self._trial or self.in_flight or time.monotonic() - self.opened_at < self.cooldown:
+                    return False
+                self._trial = True
+            self.in_flight += 1
+            return True
+
+    def release(self):
+        """An allowed request has finished (or was never started)."""
+        with self._lock:
+            self.in_flight -= 1
+
+    def record_success(self):
+        with self._lock:
+            recovered = self.opened_at is not None
+            self.failures = 0
+            self.opened_at = None
+            self._trial = False
+        if recovered:
+            BACKEND_UP.labels(backend=self.name).set(1)
+            logger.info(f"Speech backend '{self.name}' is back")
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            opened = self._trial or (self.opened_at is None and self.failures >= self.failure_threshold)
+            if opened:
+                self.opened_at = time.monotonic()
+            self._trial = False
+        if opened:
+            BACKEND_UP.labels(backend=self.name).set(0)
+            logger.warning(f"Speech backend '{self.name}' is failing; skipping it for {self.cooldown:g}s")
+
+class BackendManager:
+    """Sends each utterance to the healthy backends, in order or hedged."""
+
+    def __init__(self, recognizer, backends: Optional[List[str]] = None, hedge_delay: Optional[float] = HEDGE_DELAY,
+                 timeout: float = REQUEST_TIMEOUT):
+        """
+        Initialize backend manager.
+
+        Args:
+            recognizer: sr.Recognizer the backends call
+            backends: Backend names in order of preference (default: all registered)
+            hedge_delay: Seconds to wait on a backend before also asking the
+                next one; None asks the next only after a failure, 0 races them all
+            timeout: Seconds to wait for one backend before counting it as failed
+        """
+        self.recognizer = recognizer
+        self.hedge_delay = hedge_delay
+        self.timeout = timeout
+        # Online recognizers give up on their own instead of leaving a thread hung
+        if getattr(recognizer, "operation_timeout", None) is None:
+            recognizer.operation_timeout = timeout
+        names = backends or registered_backends()
+        unknown = [name for name in names if name not in _REGISTRY]
+        if unknown:
+            raise ValueError(f"Unknown speech backends: {', '.join(unknown)}")
+        self.backends = names
+        self.breakers = {name: CircuitBreaker(name) for name in names}
+        self.last_backend: Optional[str] = None  # Backend that answered the last request
+        # One pool per backend, so a backend that hangs cannot starve the others
+        self._executors = {
+            name: futures.ThreadPoolExecutor(max_workers=WORKERS_PER_BACKEND, thread_name_prefix=f"glenn-stt-{name}")
+            for name in names
+        }
+
+    def recognize(self, audio) -> Optional[str]:
+        """
+        Recognize an utterance with the first backend that answers.
+
+        A backend answers with text or with "no words"; failures and open
+        circuits pass the utterance on to the next backend. With a hedge
+        delay, a backend that is merely slow is raced by the next one.
+        A request's deadline starts when it starts running; one still
+        queued at its deadline is withdrawn without counting against its
+        backend.
+
+        Args:
+            audio: sr.AudioData
+
+        Returns:
+            Recognized text, or None
+        """
+        waiting = list(self.backends)
+        # future -> (name, submitted at, [started at], abandoned)
+        pending: Dict[futures.Future, Tuple[str, float, list, threading.Event]] = {}
+
+        def ask_next() -> bool:
+            while waiting:
+                name = waiting.pop(0)
+                breaker = self.breakers[name]
+                # A backend with every worker busy would only queue the request
+                if breaker.in_flight < WORKERS_PER_BACKEND and breaker.allow():
+                    started, abandoned = [None], threading.Event()
+                    future = self._executors[name].submit(self._call, name, audio, abandoned, started)
+                    pending[future] = (name, time.monotonic(), started, abandoned)
+                    return True
+                BACKEND_SKIPS.labels(backend=name).inc()
+            return False
+
+        def deadline(entry) -> float:
+            _, submitted, started, _ = entry
+            return (started[0] or submitted) + self.timeout
+
+        ask_next()
+        while pending:
+            wait = min(deadline(entry) for entry in pending.values()) - time.monotonic()
+            if self.hedge_delay is not None and waiting:
+                wait = min(wait, self.hedge_delay)
+            done, _ = futures.wait(pending, timeout=max(0.0, wait), return_when=futures.FIRST_COMPLETED)
+            for future in done:
+                name = pending.pop(future)[0]
+                answered, text = future.result()
+                if answered:
+                    self.last_backend = name
+                    return text  # Slower requests still finish and update their backend's health
+                ask_next()  # Failed: fail over
+            if done:
+                continue
+            now = time.monotonic()
+            expired = 0
+            for future, entry in list(pending.items()):
+                if deadline(entry) > now:
+                    continue
+                name, _, started, abandoned = entry
+                if started[0] is None:
+                    if not future.cancel():
+                        continue  # Just started; its own deadline applies
+                    # Never ran: the backend was busy, not failing
+                    self.breakers[name].release()
+                    logger.warning(f"{name} was too busy to take the request")
+                else:
+                    # Counts as a failure whatever it returns later
+                    abandoned.set()
+                    self.breakers[name].record_failure()
+                    logger.warning(f"{name} did not answer within {self.timeout:g}s")
+                del pending[future]
+                expired += 1
+            if expired:
+                ask_next()
+            elif ask_next():
+                HEDGED_TOTAL.inc()
+        self.last_backend = None
+        return None
+
+    def recognize_one(self, name: str, audio) -> Optional[str]:
+        """
+        Ask a single backend, without failover (e.g. for partial transcripts).
+
+        Args:
+            name: Backend name
+            audio: sr.AudioData
+
+        Returns:
+            Recognized text, or None (also when the backend's circuit is open)
+        """
+        if not self.breakers[name].allow():
+            BACKEND_SKIPS.labels(backend=name).inc()
+            return None
+        _, text = self._call(name, audio, threading.Event(), [None])
+        return text
+
+    def _call(self, name: str, audio, abandoned: threading.Event, started: list) -> Tuple[bool, Optional[str]]:
+        """One backend request; returns (answered, text) and records the backend's health."""
+        started[0] = time.monotonic()
+        recognize, _ = _REGISTRY[name]
+        breaker = self.breakers[name]
+        try:
+            text = timed_recognize(name, lambda a: recognize(self.recognizer, a), audio)
+            logger.info(f"Recognized ({name}): {text}")
+            answered = True
+        except sr.UnknownValueError:
+            logger.info(f"{name} could not understand audio")
+            text, answered = None, True
+        except Exception as e:  # sr.RequestError, or a backend that is not installed
+            logger.warning(f"{name} recognition error: {e}")
+            text, answered = None, False
+        finally:
+            breaker.release()
+        if not abandoned.is_set():
+            if answered:
+                breaker.record_success()
+            else:
+                breaker.record_failure()
+        return answered, text or None
+
+    def get_status(self) -> Dict[str, Dict]:
+        """Circuit state per backend."""
+        return {
+            name: {
+                'state': breaker.state,
+                'failures': breaker.failures,
+                'in_flight': breaker.in_flight,
+                'online': _REGISTRY[name][1],
+            }
+            for name, breaker in self.breakers.items()
+        }
+
+    def close(self):
+        """Stop the request threads (requests in flight finish on their own)."""
+        for executor in self._executors.values():
+            executor.shutdown(wait=False)
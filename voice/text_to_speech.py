@@ -4,11 +4,77 @@ Converts text to spoken audio
 """
 
 import logging
+import queue
+import re
+import threading
+import time
 import pyttsx3
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, Iterable, Iterator
+
+from core import metrics
 
 logger = logging.getLogger(__name__)
 
+SPEAK_TOTAL = metrics.counter("glenn_tts_utterances_total", "Text-to-speech requests", ["outcome"])
+SPEAK_SECONDS = metrics.histogram("glenn_tts_speak_seconds", "Blocking text-to-speech time")
+
+# Sentence end: terminal punctuation (plus closing quotes/brackets) followed by whitespace
+_SENTENCE_END = re.compile(r'[.!?]+["\')\]]*\s+|\n+')
+
+# Words ending in '.' that do not end a sentence
+_ABBREVIATIONS = {"mr", "mrs", "ms", "dr", "st", "vs", "etc", "e.g", "i.e", "approx"}
+# ... and words that are abbreviations only before a number ("No. 5", but "I said no. Then...")
+_NUMBER_ABBREVIATIONS = {"no"}
+
+def iter_sentences(fragments: Iterable[str], max_chars: int = 240) -> Iterator[str]:
+    """
+    Group a stream of text fragments into sentences.
+
+    A sentence is emitted as soon as its boundary has been seen, so the first
+    sentence is available while later fragments are still being generated.
+    Very long runs without punctuation are flushed at a word boundary once
+    they exceed `max_chars`.
+
+    Args:
+        fragments: Iterable of text fragments (tokens, words, partial lines)
+        max_chars: Flush threshold for unpunctuated text
+
+    Yields:
+        Complete sentences, stripped of surrounding whitespace
+    """
+    buffer = ""
+    for fragment in fragments:
+        if not fragment:
+            continue
+        buffer += fragment
+        start = 0
+        for match in _SENTENCE_END.finditer(buffer):
+            candidate = buffer[start:match.start()]
+            last_word = candidate.rsplit(None, 1)[-1].lower() if candidate.strip() else ""
+            if buffer[match.start()] == ".":
+                word = last_word.rstrip(".")
+                if word in _ABBREVIATIONS:
+                    continue
+                if word in _NUMBER_ABBREVIATIONS:
+                    following = buffer[match.end():match.end() + 1]
+                    if not following:
+                        break  # Decided by the next fragment (or the end of the stream)
+                    if following.isdigit():
+                        continue
+            sentence = buffer[start:match.end()].strip()
+            if sentence:
+                yield sentence
+            start = match.end()
+        buffer = buffer[start:]
+        while len(buffer) > max_chars:
+            cut = buffer.rfind(" ", 0, max_chars)
+            if cut <= 0:
+                break
+            yield buffer[:cut].strip()
+            buffer = buffer[cut + 1:]
+    if buffer.strip():
+        yield buffer.strip()
+
 class TextToSpeech:
     """Converts text to speech using various TTS engines."""
     
@@ -91,24 +157,79 @@ class TextToSpeech:
         if not self.is_available or not self.engine:
             logger.warning("TTS not available, falling back to text output")
             print(f"[Glenn 🔊]: {text}")
+            SPEAK_TOTAL.labels(outcome="fallback").inc()
             return False
             
         try:
             logger.info(f"Speaking: {text[:50]}{'...' if len(text) > 50 else ''}")
             
+            started = time.perf_counter()
             self.engine.say(text)
             
             if blocking:
                 self.engine.runAndWait()
+                SPEAK_SECONDS.observe(time.perf_counter() - started)
             
+            SPEAK_TOTAL.labels(outcome="spoken").inc()
             return True
             
         except Exception as e:
             logger.error(f"TTS error: {e}")
+            SPEAK_TOTAL.labels(outcome="error").inc()
             # Fallback to text output
             print(f"[Glenn]: {text}")
             return False
     
+    def speak_stream(self, fragments: Iterable[str], cancel: Optional[threading.Event] = None) -> str:
+        """
+        Speak a stream of text fragments sentence by sentence.
+
+        Fragments are consumed on a background thread and split into
+        sentences; each sentence is spoken as soon as it is complete, while
+        the producer keeps generating the rest of the response.
+
+        Args:
+            fragments: Iterable of text fragments (e.g. a generator)
+            cancel: Event that cuts the response off (barge-in); pair it with
+                stop() to end the sentence being spoken
+
+        Returns:
+            The text that was spoken
+        """
+        sentences: "queue.Queue[Optional[str]]" = queue.Queue()
+        errors = []
+
+        def produce():
+            try:
+                for sentence in iter_sentences(fragments):
+                    if cancel is not None and cancel.is_set():
+                        break
+                    sentences.put(sentence)
+            except Exception as e:
+                logger.error(f"Response stream error: {e}")
+                errors.append(e)
+            finally:
+                sentences.put(None)
+
+        producer = threading.Thread(target=produce, daemon=True)
+        producer.start()
+
+        spoken = []
+        while True:
+            sentence = sentences.get()
+            if sentence is None:
+                break
+            if cancel is not None and cancel.is_set():
+                SPEAK_TOTAL.labels(outcome="interrupted").inc()
+                return " ".join(spoken)  # The producer stops at its next sentence
+            spoken.append(sentence)
+            self.speak(sentence)
+
+        producer.join()
+        if errors and not spoken:
+            self.speak("Sorry, I had trouble generating that response.")
+        return " ".join(spoken)
+
     def speak_async(self, text: str) -> bool:
         """Speak text asynchronously (non-blocking)."""
         return self.speak(text, blocking=False)
@@ -3,19 +3,178 @@
 Pre-built spoken command handling and routing
 """
 
+import heapq
 import logging
-from typing import Dict, Optional, Any, Callable
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Dict, Optional, Any, Callable, List, Mapping, Set, Tuple
 import re
 
+try:
+    from re import _parser as sre_parse  # Python 3.11+
+except ImportError:
+    import sre_parse
+
+from core import metrics
+from core.intent_matcher import IntentMatcher
+from core.response_cache import MISSING, ResponseCache, normalize_utterance
+from .fuzzy_match import DEFAULT_THRESHOLD, FuzzyMatcher
+
 logger = logging.getLogger(__name__)
 
+PARSE_TOTAL = metrics.counter("glenn_voice_parse_total", "Voice command parse attempts", ["result"])
+PARSE_SECONDS = metrics.histogram("glenn_voice_parse_seconds", "Time to match spoken text to a command",
+                                  buckets=(0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.05))
+EXECUTE_TOTAL = metrics.counter("glenn_voice_commands_total", "Voice commands executed", ["command", "outcome"])
+EXECUTE_SECONDS = metrics.histogram("glenn_voice_command_seconds", "Voice command handler time", ["command"])
+
+# Seconds a built-in response may be reused; time/date and parameterized
+# commands are deliberately absent
+BUILTIN_CACHE_TTLS = {
+    "status": 30.0,
+    "identity": 300.0,
+    "list_tasks": 10.0,
+    "memory_status": 30.0,
+    "help": 300.0,
+}
+
+# Cached answers that describe data other commands change; dropped whenever a
+# command with possible side effects runs ("add task X" -> "what are my tasks")
+STATE_COMMANDS = frozenset({"list_tasks", "memory_status"})
+
+# Read-only built-ins whose answers may be prepared from a partial transcript
+SPECULATIVE_COMMANDS = frozenset({"status", "identity", "list_tasks", "memory_status", "time", "date", "help"})
+SPECULATION_MAX_AGE = 2.0  # Seconds a prepared answer stays usable (the time goes stale)
+
+# Near misses of commands that exit or write must be closer than read-only
+# ones, and are only run once the user confirms them
+WRITE_FUZZY_THRESHOLD = 0.85
+CONFIRM_PATTERN = re.compile(r"^(?:yes|yeah|yep|sure|correct|confirm|do it|go ahead)\b", re.IGNORECASE)
+
+SPECULATION_TOTAL = metrics.counter("glenn_voice_speculations_total",
+                                    "Answers prepared from partial transcripts", ["outcome"])
+
+def _command_key(command_info: Dict[str, Any]) -> Tuple[str, tuple]:
+    """Command name and normalized parameters (same answer for the same key)."""
+    parameters = command_info.get('parameters', [])
+    return command_info.get('command'), tuple(normalize_utterance(str(p)) for p in parameters)
+
+def _required_literals(items) -> Optional[Set[str]]:
+    """
+    Strings of which at least one must appear in any match of a parsed pattern.
+
+    Args:
+        items: A parsed (sre) pattern sequence
+
+    Returns:
+        The alternatives with the longest guaranteed literal, or None if the
+        pattern has no usable literal (it must then always be tried)
+    """
+    options: List[Set[str]] = []
+    run: List[str] = []
+
+    def end_run():
+        if run:
+            options.append({"".join(run)})
+            run.clear()
+
+    for op, av in items:
+        if op is sre_parse.LITERAL and av < 128:
+            run.append(chr(av).lower())
+            continue
+        end_run()
+        if op is sre_parse.SUBPATTERN:
+            sub = _required_literals(av[-1])
+        elif op is sre_parse.BRANCH:
+            alternatives = [_required_literals(branch) for branch in av[1]]
+            sub = None if None in alternatives else set().union(*alternatives)
+        elif op in (sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT) and av[0] >= 1:
+            sub = _required_literals(av[2])
+        else:
+            sub = None
+        if sub:
+            options.append(sub)
+    end_run()
+
+    # Prefer the option whose shortest alternative is longest (fewest false hits)
+    best = max(options, key=lambda option: min(len(s) for s in option), default=None)
+    return best
+
+
+@lru_cache(maxsize=None)
+def _pattern_literals(source: str, flags: int) -> Optional[frozenset]:
+    """Required literals of a pattern (cached, so index rebuilds only parse new patterns)."""
+    try:
+        literals = _required_literals(sre_parse.parse(source, flags))
+    except Exception:
+        return None
+    return frozenset(literals) if literals else None
+
+
+class _PatternIndex:
+    """
+    Immutable snapshot of the registered patterns for parse_command.
+
+    An Aho-Corasick automaton over each pattern's required literals narrows
+    the candidates to patterns that can possibly match; only those run their
+    regex, in registration order, so priority and captures are unchanged.
+    """
+
+    def __init__(self, command_patterns: Dict[str, list]):
+        self.entries: List[Tuple[str, Any]] = [
+            (command_name, pattern)
+            for command_name, patterns in command_patterns.items()
+            for pattern in patterns
+        ]
+        table = []
+        self.always: List[int] = []  # Patterns without a literal to filter on
+        for position, (_, pattern) in enumerate(self.entries):
+            literals = _pattern_literals(pattern.pattern, pattern.flags)
+            if literals:
+                table.append((position, literals))
+            else:
+                self.always.append(position)
+                table.append((position, ()))
+        self.matcher = IntentMatcher(table)
+        self._fuzzy: Optional[FuzzyMatcher] = None
+
+    @property
+    def fuzzy(self) -> FuzzyMatcher:
+        """Fuzzy matcher over the same patterns, built on first use."""
+        if self._fuzzy is None:
+            self._fuzzy = FuzzyMatcher(self.entries)
+        return self._fuzzy
+
+    def candidates(self, text: str):
+        """(command_name, pattern) pairs worth trying on `text`, in priority order."""
+        if not text.isascii():
+            # Case-insensitive matching can map non-ASCII letters onto ASCII
+            # literals (e.g. the long s), so skip the prefilter
+            return iter(self.entries)
+        positions = heapq.merge(self.matcher.match_indexes(text), self.always)
+        return (self.entries[position] for position in positions)
+
+
 class VoiceCommandHandler:
     """Handles voice command parsing and routing."""
     
     def __init__(self):
         """Initialize voice command handler."""
-        self.command_patterns = {}
+        self.command_patterns = {}  # Replaced, never mutated, so readers see a consistent set
         self.command_handlers = {}
+        self.manifest_responses: Dict[str, str] = {}
+        self._registered_patterns: Dict[str, list] = {}
+        self._manifest_patterns: Dict[str, list] = {}
+        self._index: Optional[_PatternIndex] = None  # Rebuilt after registrations
+        self._publish_lock = threading.Lock()
+        self.fuzzy_threshold = DEFAULT_THRESHOLD  # Minimum confidence for near misses
+        self.write_fuzzy_threshold = WRITE_FUZZY_THRESHOLD  # ... of commands with side effects
+        self.cache_ttls: Dict[str, float] = dict(BUILTIN_CACHE_TTLS)
+        self.response_cache = ResponseCache("voice")
+        self.speculative_commands: Set[str] = set(SPECULATIVE_COMMANDS)
+        self._speculation_executor: Optional[ThreadPoolExecutor] = None
         self._setup_default_patterns()
     
     def _setup_default_patterns(self):
@@ -83,6 +242,11 @@ class VoiceCommandHandler:
             r"see you later"
         ])
         
+        # Kunda AI queries (streamed response)
+        self.register_pattern("kunda_query", [
+            r"(?:ask )?kunda (?:to )?(?:analyze |about )?(.+)"
+        ])
+        
         # Help
         self.register_pattern("help", [
             r"help",
@@ -99,25 +263,93 @@ class VoiceCommandHandler:
             command_name: Name of the command
             patterns: List of regex patterns to match
         """
+        compiled_patterns = self._compile_patterns(patterns)
+        with self._publish_lock:
+            self._registered_patterns[command_name] = compiled_patterns
+            self._publish_patterns()
+        logger.info(f"Registered {len(compiled_patterns)} patterns for command '{command_name}'")
+    
+    def load_manifest_commands(self, voice_commands: Mapping[str, Any]) -> int:
+        """
+        Replace the commands defined by the manifest's "voiceCommands" section.
+        
+        Each entry maps a command name to {"patterns": [...], "response": "..."}.
+        Patterns for a built-in or registered command override its own until
+        the entry is removed; "response" answers with fixed text.
+        The new pattern index is built before the swap, so utterances parsed
+        during a reload see either the old or the new commands, never a mix.
+        
+        Args:
+            voice_commands: The "voiceCommands" mapping (empty to clear)
+            
+        Returns:
+            Number of manifest commands now active
+        """
+        patterns, responses = {}, {}
+        for command_name, spec in voice_commands.items():
+            if not isinstance(spec, Mapping) or not spec.get('patterns'):
+                logger.error(f"Manifest voice command '{command_name}' needs a 'patterns' list")
+                continue
+            compiled_patterns = self._compile_patterns(spec['patterns'])
+            if compiled_patterns:
+                patterns[command_name] = compiled_patterns
+                if spec.get('response'):
+                    responses[command_name] = str(spec['response'])
+        
+        with self._publish_lock:
+            # Old and new answers stay available until the new patterns are live
+            self.manifest_responses = {**self.manifest_responses, **responses}
+            self._manifest_patterns = patterns
+            self._publish_patterns(build_index=True)
+            self.manifest_responses = responses
+        logger.info(f"Loaded {len(patterns)} voice commands from manifest")
+        return len(patterns)
+    
+    def _compile_patterns(self, patterns: list) -> list:
         compiled_patterns = []
         for pattern in patterns:
             try:
                 compiled_patterns.append(re.compile(pattern, re.IGNORECASE))
             except re.error as e:
                 logger.error(f"Invalid regex pattern '{pattern}': {e}")
-        
-        self.command_patterns[command_name] = compiled_patterns
-        logger.info(f"Registered {len(compiled_patterns)} patterns for command '{command_name}'")
+        return compiled_patterns
+    
+    def _publish_patterns(self, build_index: bool = False):
+        """Swap in registered + manifest patterns (caller holds _publish_lock)."""
+        command_patterns = dict(self._registered_patterns)
+        command_patterns.update(self._manifest_patterns)
+        index = None
+        if build_index:
+            # Built up front so the first utterance after a reload is not slowed
+            index = _PatternIndex(command_patterns)
+            index.fuzzy  # Also build the lazy fuzzy matcher
+        self.command_patterns = command_patterns
+        self._index = index
+        self.response_cache.invalidate()  # Help text lists the commands
     
-    def register_handler(self, command_name: str, handler: Callable):
+    def register_handler(self, command_name: str, handler: Callable, cache_ttl: Optional[float] = None,
+                         speculative: bool = False):
         """
         Register a handler function for a command.
         
         Args:
             command_name: Name of the command
             handler: Function to handle the command
+            cache_ttl: Seconds the handler's text response may be reused for
+                the same command and parameters (None = never cached)
+            speculative: The handler has no side effects, so it may run on a
+                partial transcript before the user has finished speaking
         """
         self.command_handlers[command_name] = handler
+        if cache_ttl:
+            self.cache_ttls[command_name] = cache_ttl
+        else:
+            self.cache_ttls.pop(command_name, None)
+        if speculative:
+            self.speculative_commands.add(command_name)
+        else:
+            self.speculative_commands.discard(command_name)
+        self.response_cache.invalidate()
         logger.info(f"Registered handler for command '{command_name}'")
     
     def parse_command(self, spoken_text: str) -> Optional[Dict[str, Any]]:
@@ -133,32 +365,114 @@ class VoiceCommandHandler:
         if not spoken_text:
             return None
         
+        started = time.perf_counter()
         spoken_text = spoken_text.strip().lower()
         logger.info(f"Parsing command: '{spoken_text}'")
         
-        # Check each command pattern
-        for command_name, patterns in self.command_patterns.items():
-            for pattern in patterns:
-                match = pattern.search(spoken_text)
-                if match:
-                    # Extract any captured groups as parameters
-                    params = list(match.groups()) if match.groups() else []
-                    
-                    command_info = {
-                        'command': command_name,
-                        'original_text': spoken_text,
-                        'matched_pattern': pattern.pattern,
-                        'parameters': params,
-                        'confidence': 1.0  # Could be enhanced with fuzzy matching
-                    }
-                    
-                    logger.info(f"Command matched: {command_name}")
-                    return command_info
+        # One index for the whole parse, even if a reload swaps it meanwhile
+        index = self._pattern_index()
+        
+        # Check each command pattern that could match, in registration order
+        for command_name, pattern in index.candidates(spoken_text):
+            match = pattern.search(spoken_text)
+            if match:
+                # Extract any captured groups as parameters
+                params = list(match.groups()) if match.groups() else []
+                
+                command_info = {
+                    'command': command_name,
+                    'original_text': spoken_text,
+                    'matched_pattern': pattern.pattern,
+                    'parameters': params,
+                    'confidence': 1.0  # Exact pattern match
+                }
+                
+                logger.info(f"Command matched: {command_name}")
+                PARSE_SECONDS.observe(time.perf_counter() - started)
+                PARSE_TOTAL.labels(result="matched").inc()
+                return command_info
+        
+        # No exact match; tolerate recognition slips ("what's the tyme"). Near
+        # misses that exit or write need a closer match, and confirmation
+        command_info = index.fuzzy.match(spoken_text, threshold_for=self._fuzzy_threshold)
+        if command_info:
+            PARSE_SECONDS.observe(time.perf_counter() - started)
+            PARSE_TOTAL.labels(result="fuzzy").inc()
+            return command_info
         
         # No pattern matched
         logger.info("No command pattern matched")
+        PARSE_SECONDS.observe(time.perf_counter() - started)
+        PARSE_TOTAL.labels(result="unmatched").inc()
         return None
     
+    def is_complete_command(self, spoken_text: str) -> bool:
+        """
+        Check whether an utterance (e.g. a partial transcript) is already a whole command.
+        
+        True when a pattern without parameters matches up to the end of the
+        text. Commands that take free text ("add task ...") never count, since
+        the speaker may still be dictating.
+        
+        Args:
+            spoken_text: Text recognized so far
+            
+        Returns:
+            True if listening can stop
+        """
+        text = spoken_text.strip().lower() if spoken_text else ""
+        if not text:
+            return False
+        for _, pattern in self._pattern_index().candidates(text):
+            if pattern.groups:
+                continue
+            match = pattern.search(text)
+            if match and match.end() == len(text):
+                return True
+        return False
+    
+    def is_speculative(self, command_name: str) -> bool:
+        """Whether a command's answer may be prepared before the user has finished."""
+        return command_name in self.manifest_responses or command_name in self.speculative_commands
+    
+    def _fuzzy_threshold(self, command_name: str) -> float:
+        """Minimum fuzzy confidence for a command (higher when it has side effects)."""
+        if self.is_speculative(command_name):
+            return self.fuzzy_threshold
+        return max(self.fuzzy_threshold, self.write_fuzzy_threshold)
+    
+    def needs_confirmation(self, command_info: Optional[Dict[str, Any]]) -> bool:
+        """Whether a parsed command is a near miss that would exit or write."""
+        return bool(command_info and command_info.get('fuzzy')
+                    and not self.is_speculative(command_info['command']))
+    
+    def confirmation_prompt(self, command_info: Dict[str, Any]) -> str:
+        """Question asking the user to confirm a near-miss command."""
+        heard = " ".join([command_info.get('matched_phrase', command_info['command'])]
+                         + command_info.get('parameters', []))
+        return f"Did you mean '{heard}'? Say yes to go ahead."
+    
+    @staticmethod
+    def is_confirmation(spoken_text: str) -> bool:
+        """Whether an utterance confirms the command asked about."""
+        return bool(spoken_text and CONFIRM_PATTERN.match(spoken_text.strip()))
+    
+    def prepare(self, command_info: Dict[str, Any]):
+        """Start executing a side-effect-free command in the background; returns its future."""
+        if self._speculation_executor is None:
+            self._speculation_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="glenn-speculate")
+        return self._speculation_executor.submit(self.execute_command, command_info)
+    
+    def _pattern_index(self) -> _PatternIndex:
+        """Current pattern index, rebuilt once after any registration."""
+        index = self._index
+        if index is None:
+            with self._publish_lock:
+                index = self._index
+                if index is None:
+                    index = self._index = _PatternIndex(self.command_patterns)
+        return index
+    
     def execute_command(self, command_info: Dict[str, Any]) -> str:
         """
         Execute a parsed command.
@@ -167,7 +481,7 @@ class VoiceCommandHandler:
             command_info: Command information from parse_command
             
         Returns:
-            Response text
+            Response text, or a generator of text fragments for streamed responses
         """
         if not command_info:
             return "I didn't understand that command."
@@ -175,16 +489,42 @@ class VoiceCommandHandler:
         command_name = command_info.get('command')
         parameters = command_info.get('parameters', [])
         
-        # Check if we have a registered handler
-        if command_name in self.command_handlers:
-            try:
-                return self.command_handlers[command_name](command_info)
-            except Exception as e:
-                logger.error(f"Handler error for {command_name}: {e}")
-                return f"Sorry, I had trouble executing that command."
-        
-        # Default responses for built-in commands
-        return self._handle_builtin_command(command_name, parameters)
+        # Repeated questions reuse the last answer while it is fresh
+        ttl = self.cache_ttls.get(command_name)
+        if ttl:
+            cache_key = _command_key(command_info)
+            cached = self.response_cache.get(cache_key)
+            if cached is not MISSING:
+                EXECUTE_TOTAL.labels(command=command_name, outcome="cached").inc()
+                return cached
+        
+        # Streamed responses are timed until the generator is returned
+        started = time.perf_counter()
+        outcome = "ok"
+        try:
+            # Fixed answers from the manifest win over code handlers
+            if command_name in self.manifest_responses:
+                response = self.manifest_responses[command_name]
+            # Check if we have a registered handler
+            elif command_name in self.command_handlers:
+                try:
+                    response = self.command_handlers[command_name](command_info)
+                except Exception as e:
+                    logger.error(f"Handler error for {command_name}: {e}")
+                    outcome = "error"
+                    return f"Sorry, I had trouble executing that command."
+            else:
+                # Default responses for built-in commands
+                response = self._handle_builtin_command(command_name, parameters)
+            
+            if ttl and isinstance(response, str):
+                self.response_cache.put(cache_key, response, ttl)
+            return response
+        finally:
+            if not ttl and not self.is_speculative(command_name):
+                self.response_cache.invalidate_where(lambda key: key[0] in STATE_COMMANDS)
+            EXECUTE_SECONDS.labels(command=command_name).observe(time.perf_counter() - started)
+            EXECUTE_TOTAL.labels(command=command_name, outcome=outcome).inc()
     
     def _handle_builtin_command(self, command_name: str, parameters: list) -> str:
         """Handle built-in commands with default responses."""
@@ -226,6 +566,12 @@ class VoiceCommandHandler:
         elif command_name == "help":
             return self._get_help_text()
         
+        elif command_name == "kunda_query":
+            if parameters:
+                from commands.kunda import process_query
+                return process_query(parameters[0])
+            return "What would you like Kunda to look into?"
+        
         else:
             return f"I recognized the command '{command_name}' but don't know how to handle it yet."
     
@@ -240,7 +586,8 @@ class VoiceCommandHandler:
         """Get list of available commands."""
         return list(self.command_patterns.keys())
     
-    def add_custom_command(self, name: str, patterns: list, handler: Optional[Callable] = None):
+    def add_custom_command(self, name: str, patterns: list, handler: Optional[Callable] = None,
+                           cache_ttl: Optional[float] = None, speculative: bool = False):
         """
         Add a custom voice command.
         
@@ -248,10 +595,12 @@ class VoiceCommandHandler:
             name: Command name
             patterns: List of regex patterns
             handler: Optional handler function
+            cache_ttl: Seconds the handler's response may be reused
+            speculative: The handler is side-effect free (see register_handler)
         """
         self.register_pattern(name, patterns)
         if handler:
-            self.register_handler(name, handler)
+            self.register_handler(name, handler, cache_ttl=cache_ttl, speculative=speculative)
         
         logger.info(f"Added custom command: {name}")
     
@@ -278,3 +627,115 @@ class VoiceCommandHandler:
         for command_name, patterns in self.command_patterns.items():
             examples[command_name] = [pattern.pattern for pattern in patterns]
         return examples
+
+
+class CommandSpeculation:
+    """
+    Answers prepared from the partial transcripts of one utterance.
+
+    Each partial hypothesis is parsed; when it is a side-effect-free command
+    its answer starts computing in the background. The final transcript then
+    takes the prepared answer for the same command and parameters, and the
+    rest are discarded.
+    """
+
+    def __init__(self, handler: VoiceCommandHandler, max_age: float = SPECULATION_MAX_AGE):
+        """
+        Initialize speculation.
+
+        Args:
+            handler: Command handler that parses and executes
+            max_age: Seconds a prepared answer stays usable
+        """
+        self.handler = handler
+        self.max_age = max_age
+        self._prepared: Dict[Tuple[str, tuple], Tuple[float, Any]] = {}
+        self._lock = threading.Lock()
+
+    def hypothesis(self, partial_text: str):
+        """Partial transcript callback: prepare the answer if it is a safe command."""
+        command_info = self.handler.parse_command(partial_text)
+        if not command_info or not self.handler.is_speculative(command_info['command']):
+            return
+        key = _command_key(command_info)
+        with self._lock:
+            if key in self._prepared:
+                return
+            self._prepared[key] = (time.monotonic(), self.handler.prepare(command_info))
+        SPECULATION_TOTAL.labels(outcome="prepared").inc()
+        logger.debug(f"Prepared '{command_info['command']}' from partial '{partial_text}'")
+
+    def take(self, command_info: Optional[Dict[str, Any]]) -> Any:
+        """
+        Commit the prepared answer for the final command and discard the rest.
+
+        Args:
+            command_info: parse_command() result for the final transcript
+
+        Returns:
+            The prepared response, or MISSING when the command has to run now
+        """
+        with self._lock:
+            prepared, self._prepared = self._prepared, {}
+        entry = prepared.pop(_command_key(command_info), None) if command_info else None
+        if prepared:
+            SPECULATION_TOTAL.labels(outcome="discarded").inc(len(prepared))
+        if entry is None:
+            return MISSING
+
+        started, future = entry
+        if time.monotonic() - started > self.max_age:
+            SPECULATION_TOTAL.labels(outcome="discarded").inc()
+            return MISSING
+        try:
+            response = future.result()  # Usually done; if not, it is still ahead of a fresh run
+        except Exception as e:
+            logger.error(f"Prepared command failed: {e}")
+            SPECULATION_TOTAL.labels(outcome="discarded").inc()
+            return MISSING
+        SPECULATION_TOTAL.labels(outcome="used").inc()
+        return response
+
+
+def _benchmark():
+    """Parse latency as custom commands are added (python -m voice.voice_commands)."""
+    import random
+    import string
+
+    logging.disable(logging.INFO)
+    rng = random.Random(11)
+    phrases = ["what time is it", "remind me to water the plants", "ask kunda about the logs",
+               "play some music", "turn on the living room lights"]
+
+    def linear_parse(handler, text):
+        for command_name, patterns in handler.command_patterns.items():
+            for pattern in patterns:
+                if pattern.search(text):
+                    return command_name
+        return None
+
+    print(f"{'commands':>9} {'patterns':>9} {'linear us':>10} {'indexed us':>11}")
+    for count in (10, 100, 1000, 10000):
+        handler = VoiceCommandHandler()
+        for n in range(count):
+            word = "".join(rng.choice(string.ascii_lowercase) for _ in range(8))
+            handler.add_custom_command(f"custom_{n}", [rf"(?:start|run) {word} (.+)", rf"{word} status"])
+        handler.parse_command("warm up")  # Build the index outside the timing
+
+        for text in phrases:  # Same winner as the old linear scan
+            info = handler.parse_command(text)
+            assert (info or {}).get('command') == linear_parse(handler, text), text
+
+        timings = []
+        for parse in (lambda t: linear_parse(handler, t), handler.parse_command):
+            started = time.perf_counter()
+            for _ in range(20):
+                for text in phrases:
+                    parse(text)
+            timings.append((time.perf_counter() - started) / (20 * len(phrases)) * 1e6)
+        patterns = sum(len(p) for p in handler.command_patterns.values())
+        print(f"{len(handler.command_patterns):>9} {patterns:>9} {timings[0]:>10.1f} {timings[1]:>11.1f}")
+
+
+if __name__ == "__main__":
+    _benchmark()
@@ -4,11 +4,90 @@ Handles wake word detection for voice activation
 """
 
 import logging
+import re
+import time
 import speech_recognition as sr
-from typing import Optional, List
+from typing import Iterable, Optional, List, Tuple
+
+from .audio_capture import acquire_capture
+from .keyword_spotter import KeywordSpotter
+from . import vad
 
 logger = logging.getLogger(__name__)
 
+GAPLESS_SECONDS = 1.0  # Resume from the last position if it is at most this far behind live audio
+WAKE_PHRASE_LIMIT = 6.0  # Long enough for a command in the same breath ("Hey Glenn, what time is it")
+DEFAULT_WAKE_WORDS = ("glenn", "hey glenn", "ok glenn")
+
+# Words that may come before the wake word in a phrase addressed to Glenn
+LEAD_IN_WORDS = frozenset({"hey", "hi", "ok", "okay", "oh", "um", "uh", "yo"})
+MAX_LEAD_IN_WORDS = 2
+
+_TRAILING_PUNCTUATION = " ,.!?;:-"
+
+def find_wake_word(text: str, wake_words: Iterable[str] = DEFAULT_WAKE_WORDS) -> Optional[Tuple[str, int]]:
+    """
+    Locate the first wake word in a transcript.
+
+    The longest wake word wins where several start at the same place
+    ("hey glenn" over "glenn"). A possessive ("Glenn's code") is talk about
+    Glenn, not to Glenn, so it does not count.
+
+    Args:
+        text: Recognized phrase
+        wake_words: Lower-case wake words
+
+    Returns:
+        (wake_word, character offset) or None
+    """
+    words = sorted(wake_words, key=len, reverse=True)
+    if not text or not words:
+        return None
+    match = re.search(r"\b(?:" + "|".join(re.escape(w) for w in words) + r")\b(?!['’]s\b)", text, re.IGNORECASE)
+    if not match:
+        return None
+    return match.group(0).lower(), match.start()
+
+def command_after_wake_word(text: str, wake_words: Iterable[str] = DEFAULT_WAKE_WORDS) -> str:
+    """Whatever follows the wake word in a transcript ("" if nothing does)."""
+    found = find_wake_word(text, wake_words)
+    if not found:
+        return ""
+    wake_word, offset = found
+    return WakeDetection(wake_word, text, offset).command_text
+
+class WakeDetection:
+    """A detected wake word and the phrase it was heard in."""
+
+    __slots__ = ("wake_word", "transcript", "offset", "speech_end")
+
+    def __init__(self, wake_word: str, transcript: Optional[str] = None, offset: Optional[int] = None,
+                 speech_end: Optional[float] = None):
+        self.wake_word = wake_word      # The wake word as configured
+        self.transcript = transcript    # Whole recognized phrase (None when spotted locally)
+        self.offset = offset            # Character offset of the wake word in the transcript
+        self.speech_end = speech_end    # time.monotonic() the phrase ended, if known
+
+    @property
+    def addressed(self) -> bool:
+        """Whether the phrase starts with the wake word (after at most a short lead-in like "hey")."""
+        if not self.transcript or self.offset is None:
+            return False
+        lead_in = re.findall(r"[\w']+", self.transcript[:self.offset].lower())
+        return len(lead_in) <= MAX_LEAD_IN_WORDS and all(word in LEAD_IN_WORDS for word in lead_in)
+
+    @property
+    def command_text(self) -> str:
+        """
+        Command spoken in the same phrase, after the wake word ("" if none).
+
+        Only a phrase that starts with the wake word carries a command;
+        "I was telling Glenn about my day" merely mentions it.
+        """
+        if not self.addressed:
+            return ""
+        return self.transcript[self.offset + len(self.wake_word):].strip(_TRAILING_PUNCTUATION)
+
 class WakeWordDetector:
     """Detects wake words to activate voice assistant."""
     
@@ -19,21 +98,32 @@ class WakeWordDetector:
         Args:
             wake_words: List of wake words to detect
         """
-        self.wake_words = wake_words or ["glenn", "hey glenn", "ok glenn"]
+        self.wake_words = wake_words or list(DEFAULT_WAKE_WORDS)
         self.recognizer = None
         self.microphone = None
+        self.capture = None
+        self.last_position = None  # Capture position where the last wake phrase ended
+        self.spotter = None  # Local KeywordSpotter when wake words are enrolled
+        self.vad = None  # Keeps non-speech audio away from the recognizer and spotter
         self.is_listening = False
         
     def initialize(self) -> bool:
         """Initialize speech recognition components."""
         try:
             self.recognizer = sr.Recognizer()
-            self.microphone = sr.Microphone()
+            if self.capture is None:
+                self.capture = acquire_capture()
+            self.microphone = self.capture.source()
             
-            # Adjust for ambient noise
-            with self.microphone as source:
-                logger.info("Adjusting for ambient noise...")
-                self.recognizer.adjust_for_ambient_noise(source, duration=1)
+            # Saved per device, shared with speech to text, adapted in the background
+            self.capture.calibrate(self.recognizer)
+            
+            # Enrolled templates make detection local; otherwise fall back to the recognizer
+            self.spotter = KeywordSpotter.load(self.capture.sample_rate, self.capture.sample_width)
+            if vad.is_available():
+                self.vad = vad.VoiceActivityDetector(self.capture.sample_rate, self.capture.sample_width)
+            if self.spotter:
+                logger.info(f"Local wake-word detection enabled: {', '.join(self.spotter.keywords)}")
                 
             logger.info("Wake word detector initialized")
             return True
@@ -52,28 +142,62 @@ class WakeWordDetector:
         Returns:
             Detected wake word or None
         """
+        detection = self.detect(timeout)
+        return detection.wake_word if detection else None
+    
+    def detect(self, timeout: float = 1.0) -> Optional[WakeDetection]:
+        """
+        Listen for wake words, keeping the phrase they were said in.
+        
+        With the recognizer the whole phrase is transcribed, so a command
+        said in the same breath ("Hey Glenn, what time is it") is available
+        as WakeDetection.command_text. The local spotter has no transcript;
+        its trailing speech stays in the capture buffer after last_position.
+        
+        Args:
+            timeout: Timeout in seconds for listening
+            
+        Returns:
+            WakeDetection or None
+        """
         if not self.recognizer or not self.microphone:
             return None
+        if self.spotter:
+            keyword = self._spot_wake_word(timeout)
+            return WakeDetection(keyword) if keyword else None
             
         try:
             with self.microphone as source:
                 # Listen for audio with timeout
-                audio = self.recognizer.listen(source, timeout=timeout, phrase_time_limit=3)
+                audio = self.recognizer.listen(source, timeout=timeout, phrase_time_limit=WAKE_PHRASE_LIMIT)
+                self.last_position = source.position
+            speech_end = time.monotonic() - self.recognizer.pause_threshold
+            
+            # Noise that crossed the energy threshold is not worth a recognizer call
+            if self.vad:
+                audio = self.vad.trim(audio, self.recognizer.energy_threshold)
+                if audio is None:
+                    return None
             
             # Try to recognize speech
             try:
-                text = self.recognizer.recognize_google(audio, language='en-US').lower()
+                text = self.recognizer.recognize_google(audio, language='en-US')
+                if self.vad:
+                    vad.record_recognition(bool(text))
                 
                 # Check if any wake word is detected
-                for wake_word in self.wake_words:
-                    if wake_word in text:
-                        logger.info(f"Wake word detected: {wake_word}")
-                        return wake_word
+                found = find_wake_word(text, self.wake_words)
+                if found:
+                    wake_word, offset = found
+                    logger.info(f"Wake word detected: {wake_word}")
+                    return WakeDetection(wake_word, text, offset, speech_end)
                         
                 return None
                 
             except sr.UnknownValueError:
                 # Speech was unintelligible
+                if self.vad:
+                    vad.record_recognition(False)
                 return None
                 
         except sr.WaitTimeoutError:
@@ -83,6 +207,33 @@ class WakeWordDetector:
             logger.error(f"Wake word detection error: {e}")
             return None
     
+    def _spot_wake_word(self, timeout: float) -> Optional[str]:
+        """Listen for enrolled wake words with the local keyword spotter."""
+        try:
+            with self.microphone as source:
+                # Carry on from where the last call stopped so a wake word
+                # spoken between calls is not cut in half
+                chunks_behind = GAPLESS_SECONDS * source.SAMPLE_RATE / source.CHUNK
+                if self.last_position is not None and source.position - self.last_position <= chunks_behind:
+                    source.seek(self.last_position)
+                else:
+                    self.spotter.reset()
+                    if self.vad:
+                        self.vad.reset()
+                hit = self.spotter.listen(source, timeout, energy_threshold=self.recognizer.energy_threshold,
+                                          vad=self.vad)
+                self.last_position = source.position
+        except Exception as e:
+            logger.error(f"Wake word detection error: {e}")
+            return None
+        
+        if hit:
+            keyword, distance = hit
+            logger.info(f"Wake word detected: {keyword} (distance {distance:.3f}, "
+                        f"{self.spotter.last_check_seconds * 1000:.1f} ms)")
+            return keyword
+        return None
+    
     def is_wake_word(self, text: str) -> bool:
         """
         Check if text contains a wake word.
@@ -122,3 +273,13 @@ class WakeWordDetector:
         """Stop continuous listening mode."""
         self.is_listening = False
         logger.info("Stopped wake word listening")
+    
+    def cleanup(self):
+        """Release the shared audio capture."""
+        if self.capture is not None:
+            self.capture.release()
+            self.capture = None
+        self.recognizer = None
+        self.microphone = None
+        self.spotter = None
+        self.vad = None